@@ -0,0 +1,222 @@
+import json
+import math
+import os
+import pickle
+import platform
+import sys
+import time
+import concurrent.futures as ftres
+from pathlib import Path
+
+from integrate import integrate, np
+from concurrent_integrate import Integrator
+
+try:
+    from cy_integrate_nogil import integrate_builtin, match_builtin
+except ImportError:  # расширение не собрано (python setup_cy.py build_ext --inplace)
+    integrate_builtin = match_builtin = None
+
+
+BACKENDS = ("cython", "vectorized", "process", "serial")
+
+# Файл с результатами калибровки. Можно переопределить переменной окружения.
+DEFAULT_CALIBRATION_PATH = Path(
+    os.environ.get(
+        "INTEGRATE_CALIBRATION",
+        Path.home() / ".cache" / "lab_10" / "integrate_calibration.json",
+    )
+)
+
+
+def calibrate(path: Path | None = None, *, force: bool = False) -> dict:
+    """
+    Измеряет стоимость одной точки в integrate() и запуска пула процессов.
+
+    Результат сохраняется в JSON (по умолчанию DEFAULT_CALIBRATION_PATH)
+    и при повторных вызовах читается с диска, если совпадают машина,
+    версия Python и число ядер. force=True — перемерить заново.
+
+    Возвращает словарь с ключами:
+    - point_cost — секунд на одну точку integrate(math.sin, ...);
+    - pool_overhead — секунд на запуск пула процессов и сбор результата;
+    - process_threshold — n_iter, начиная с которого пул процессов выгоднее
+      последовательного цикла (math.inf, если ядро одно).
+    """
+    path = Path(path) if path is not None else DEFAULT_CALIBRATION_PATH
+    key = _machine_key()
+
+    if not force:
+        try:
+            cached = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cached = None
+        if isinstance(cached, dict) and cached.get("machine") == key:
+            return _decode(cached)
+
+    n_points = 50_000
+    start = time.perf_counter()
+    integrate(math.sin, 0.0, 1.0, n_iter=n_points)
+    point_cost = (time.perf_counter() - start) / n_points
+
+    n_cores = key["cpu_count"]
+    start = time.perf_counter()
+    with ftres.ProcessPoolExecutor(max_workers=n_cores) as executor:
+        list(executor.map(abs, range(n_cores)))
+    pool_overhead = time.perf_counter() - start
+
+    # n * cost > overhead + n * cost / cores  =>  n > overhead / (cost * (1 - 1/cores))
+    if n_cores > 1:
+        process_threshold = pool_overhead / (point_cost * (1 - 1 / n_cores))
+    else:
+        process_threshold = math.inf
+
+    result = {
+        "machine": key,
+        "point_cost": point_cost,
+        "pool_overhead": pool_overhead,
+        "process_threshold": process_threshold,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(_encode(result), indent=2), encoding="utf-8")
+    except OSError:
+        pass  # нет прав на запись — просто не кэшируем
+    return result
+
+
+def choose_backend(
+    f,
+    a: float,
+    b: float,
+    n_iter: int,
+    *,
+    method: str = "left",
+    calibration: dict | None = None,
+) -> str:
+    """
+    Выбирает способ вычисления интеграла f на [a, b] с n_iter точками.
+
+    Порядок предпочтения:
+    1. "cython" — f есть в реестре C-функций cy_integrate_nogil (только
+       для method="left");
+    2. "vectorized" — f является ufunc numpy или принимает массивы;
+    3. "process" — f сериализуется pickle, ядер больше одного и n_iter
+       выше порога из калибровки;
+    4. "serial" — обычный integrate().
+
+    Потоки не рассматриваются: для Python-функции GIL делает их медленнее
+    последовательного цикла.
+    """
+    if match_builtin is not None and method == "left" and match_builtin(f)[0] is not None:
+        return "cython"
+    if _accepts_arrays(f, a, b):
+        return "vectorized"
+    if (os.cpu_count() or 1) > 1 and _is_picklable(f):
+        if calibration is None:
+            calibration = calibrate()
+        if n_iter >= calibration["process_threshold"]:
+            return "process"
+    return "serial"
+
+
+def integrate_auto(
+    f,
+    a: float,
+    b: float,
+    *,
+    n_iter: int = 100_000,
+    method: str = "left",
+    backend: str | None = None,
+) -> float:
+    """
+    Интеграл f на [a, b] самым быстрым доступным способом.
+
+    Способ выбирает choose_backend(); его можно задать явно через backend
+    (одно из BACKENDS). Параметры n_iter и method — как у integrate().
+
+    >>> import math
+    >>> round(integrate_auto(math.cos, 0.0, math.pi / 2, n_iter=10_000, backend="serial"), 3)
+    1.0
+    """
+    if backend is None:
+        backend = choose_backend(f, a, b, n_iter, method=method)
+
+    if backend == "cython":
+        if integrate_builtin is None:
+            raise ImportError("backend='cython' requires the cy_integrate_nogil extension")
+        name, coeffs = match_builtin(f)
+        if name is None:
+            raise ValueError("f is not a built-in C integrand")
+        return integrate_builtin(name, a, b, n_iter, coeffs=coeffs)
+    if backend == "vectorized":
+        return integrate(f, a, b, n_iter=n_iter, method=method, vectorized=True)
+    if backend == "process":
+        return _integrate_processes(f, a, b, n_iter, method)
+    if backend == "serial":
+        return integrate(f, a, b, n_iter=n_iter, method=method)
+    raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+
+
+def _integrate_processes(f, a: float, b: float, n_iter: int, method: str) -> float:
+    """Делит [a, b] на части по числу ядер, сохраняя шаг сетки и все n_iter точек."""
+    n_jobs = min(os.cpu_count() or 1, n_iter)
+    step = (b - a) / n_iter
+    bounds = [k * n_iter // n_jobs for k in range(n_jobs + 1)]
+    # Части отличаются числом точек не больше чем на одну; все они идут
+    # в один пул, иначе на каждый размер запускался бы свой пул процессов
+    with Integrator("process", max_workers=n_jobs) as integrator:
+        futures = [
+            integrator.executor.submit(
+                integrate, f, a + lo * step, a + hi * step, n_iter=hi - lo, method=method
+            )
+            for lo, hi in zip(bounds, bounds[1:])
+        ]
+        return math.fsum(fut.result() for fut in futures)
+
+
+def _accepts_arrays(f, a: float, b: float) -> bool:
+    if np is None:
+        return False
+    if isinstance(f, np.ufunc):
+        return True
+    x = np.array([a, b], dtype=np.float64)
+    try:
+        y = np.asarray(f(x))
+    except Exception:
+        return False
+    return y.shape in ((), x.shape) and np.issubdtype(y.dtype, np.number)
+
+
+def _is_picklable(f) -> bool:
+    try:
+        pickle.dumps(f)
+    except Exception:
+        return False
+    return True
+
+
+def _machine_key() -> dict:
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "executable": sys.executable,
+        "cpu_count": os.cpu_count() or 1,
+    }
+
+
+def _encode(result: dict) -> dict:
+    # В JSON нет бесконечности — храним её как null.
+    threshold = result["process_threshold"]
+    return {**result, "process_threshold": None if math.isinf(threshold) else threshold}
+
+
+def _decode(cached: dict) -> dict:
+    threshold = cached.get("process_threshold")
+    return {**cached, "process_threshold": math.inf if threshold is None else threshold}
+
+
+if __name__ == "__main__":
+    print("Калибровка:", calibrate(force=True))
+    for f in (math.sin, lambda x: x * x):
+        print(choose_backend(f, 0.0, math.pi, 1_000_000), integrate_auto(f, 0.0, math.pi))
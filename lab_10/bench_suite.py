@@ -0,0 +1,364 @@
+"""
+Единый набор бенчмарков для всех способов интегрирования из lab_10
+(заменяет прежние bench_timeit.py, bench_concurrent.py и cy_bench.py).
+
+Запуск сетки параметров с сохранением в JSON:
+
+    python bench_suite.py run -o results.json
+    python bench_suite.py run --n-iter 100000 1000000 --n-jobs 2 4 --backends serial processes
+
+Сравнение двух прогонов (код возврата 1, если есть регрессии):
+
+    python bench_suite.py compare base.json results.json --threshold 0.1
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from integrate import integrate, np
+from concurrent_integrate import Integrator, integrate_async, integrate_process
+from auto_integrate import integrate_auto
+import cy_integrate
+
+try:
+    from cy_integrate_nogil import integrate_builtin
+except ImportError:  # расширение не собрано (python setup_cy.py build_ext --inplace)
+    integrate_builtin = None
+
+# cy_integrate.py — заглушка для IDE, настоящая integrate_cy есть только
+# в собранном расширении
+integrate_cy = None if cy_integrate.__file__.endswith(".py") else cy_integrate.integrate_cy
+
+
+def square(x):
+    return x * x
+
+
+def peaked(x):
+    return math.exp(-100.0 * x * x)
+
+
+def _np_peaked(x):
+    return np.exp(-100.0 * x * x)
+
+
+def skewed(x):
+    """
+    Вся стоимость на [0.75, 1]: при одной части на работника её считает
+    один работник, при динамической раздаче мелких частей — все
+    (сравните processes_static и processes).
+    """
+    if x < 0.75:
+        return x
+    s = 0.0
+    for k in range(1, 200):
+        s += math.sin(k * x) / k
+    return s
+
+
+# имя -> (Python-функция, numpy-версия, имя в реестре Cython, a, b)
+INTEGRANDS = {
+    "sin": (math.sin, np and np.sin, "sin", 0.0, math.pi),
+    "square": (square, square, "square", 0.0, 1.0),
+    "peaked": (peaked, np and _np_peaked, None, -1.0, 1.0),
+    "skewed": (skewed, None, None, 0.0, 1.0),
+}
+
+
+def _serial(spec, n_iter, n_jobs):
+    f, _, _, a, b = spec
+    return integrate(f, a, b, n_iter=n_iter)
+
+
+def _simpson(spec, n_iter, n_jobs):
+    f, _, _, a, b = spec
+    return integrate(f, a, b, n_iter=n_iter, method="simpson")
+
+
+def _kahan(spec, n_iter, n_jobs):
+    f, _, _, a, b = spec
+    return integrate(f, a, b, n_iter=n_iter, summation="kahan")
+
+
+def _pairwise(spec, n_iter, n_jobs):
+    f, _, _, a, b = spec
+    return integrate(f, a, b, n_iter=n_iter, summation="pairwise")
+
+
+def _vectorized(spec, n_iter, n_jobs):
+    _, f_np, _, a, b = spec
+    return integrate(f_np, a, b, n_iter=n_iter, vectorized=True)
+
+
+def _threads(spec, n_iter, n_jobs):
+    f, _, _, a, b = spec
+    return integrate_async(f, a, b, n_jobs=n_jobs, n_iter=n_iter)
+
+
+def _processes(spec, n_iter, n_jobs):
+    f, _, _, a, b = spec
+    return integrate_process(f, a, b, n_jobs=n_jobs, n_iter=n_iter)
+
+
+def _processes_static(spec, n_iter, n_jobs):
+    # Одна часть на работника — прежнее статическое разбиение, для сравнения.
+    f, _, _, a, b = spec
+    return integrate_process(f, a, b, n_jobs=n_jobs, n_iter=n_iter, n_chunks=n_jobs)
+
+
+def _processes_shm(spec, n_iter, n_jobs):
+    f, _, _, a, b = spec
+    return integrate_process(f, a, b, n_jobs=n_jobs, n_iter=n_iter, shared_memory=True)
+
+
+def _integrator(spec, n_iter, n_jobs):
+    # Пул создаётся один раз на прогон в run_suite().
+    f, _, _, a, b = spec
+    return _POOLS[n_jobs].integrate(f, a, b, n_iter=n_iter)
+
+
+def _cython(spec, n_iter, n_jobs):
+    _, _, name, a, b = spec
+    return integrate_builtin(name, a, b, n_iter, num_threads=n_jobs)
+
+
+def _cython_kahan(spec, n_iter, n_jobs):
+    _, _, name, a, b = spec
+    return integrate_builtin(name, a, b, n_iter, summation="kahan", num_threads=n_jobs)
+
+
+def _cython_python(spec, n_iter, n_jobs):
+    # Цикл на Cython, но f — обычная Python-функция
+    f, _, _, a, b = spec
+    return integrate_cy(f, a, b, n_iter)
+
+
+def _auto(spec, n_iter, n_jobs):
+    f, _, _, a, b = spec
+    return integrate_auto(f, a, b, n_iter=n_iter)
+
+
+# имя -> (функция, зависит ли от n_jobs)
+BACKENDS = {
+    "serial": (_serial, False),
+    "simpson": (_simpson, False),
+    "kahan": (_kahan, False),
+    "pairwise": (_pairwise, False),
+    "vectorized": (_vectorized, False),
+    "threads": (_threads, True),
+    "processes": (_processes, True),
+    "processes_static": (_processes_static, True),
+    "processes_shm": (_processes_shm, True),
+    "integrator": (_integrator, True),
+    "cython": (_cython, True),
+    "cython_kahan": (_cython_kahan, True),
+    "cython_python": (_cython_python, False),
+    "auto": (_auto, False),
+}
+
+_POOLS: dict[int, Integrator] = {}
+
+
+def _available(backend: str, spec) -> bool:
+    if backend == "vectorized":
+        return spec[1] is not None
+    if backend in ("cython", "cython_kahan"):
+        return integrate_builtin is not None and spec[2] is not None
+    if backend == "cython_python":
+        return integrate_cy is not None
+    return True
+
+
+def measure(func, *, repeats: int, warmup: int) -> dict:
+    """
+    Запускает func() warmup раз без замера, затем repeats раз с замером.
+
+    CPU-время — process_time() текущего процесса плюс время дочерних
+    процессов из os.times(), завершившихся за время замера (пулы
+    integrate_process).
+    """
+    for _ in range(warmup):
+        func()
+
+    wall: list[float] = []
+    cpu: list[float] = []
+    for _ in range(repeats):
+        t0 = os.times()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        cpu_self = time.process_time() - cpu_start
+        t1 = os.times()
+        wall.append(elapsed)
+        cpu.append(
+            cpu_self
+            + (t1.children_user - t0.children_user)
+            + (t1.children_system - t0.children_system)
+        )
+    return {
+        "median": statistics.median(wall),
+        "p95": _percentile(wall, 95),
+        "stddev": statistics.stdev(wall) if len(wall) > 1 else 0.0,
+        "min": min(wall),
+        "mean": statistics.fmean(wall),
+        "cpu_median": statistics.median(cpu),
+        "runs": wall,
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_suite(
+    *,
+    backends: list[str],
+    integrands: list[str],
+    n_iters: list[int],
+    n_jobs_values: list[int],
+    repeats: int = 5,
+    warmup: int = 1,
+    log=sys.stdout,
+) -> dict:
+    """Прогоняет сетку backend × integrand × n_iter × n_jobs и возвращает отчёт."""
+    results = []
+    try:
+        for backend, name, n_iter in itertools.product(backends, integrands, n_iters):
+            func, uses_jobs = BACKENDS[backend]
+            spec = INTEGRANDS[name]
+            if not _available(backend, spec):
+                continue
+            for n_jobs in n_jobs_values if uses_jobs else [1]:
+                if backend == "integrator" and n_jobs not in _POOLS:
+                    _POOLS[n_jobs] = Integrator("process", max_workers=n_jobs)
+                stats = measure(
+                    lambda: func(spec, n_iter, n_jobs), repeats=repeats, warmup=warmup
+                )
+                results.append(
+                    {
+                        "backend": backend,
+                        "integrand": name,
+                        "n_iter": n_iter,
+                        "n_jobs": n_jobs if uses_jobs else None,
+                        **stats,
+                    }
+                )
+                jobs_label = n_jobs if uses_jobs else "-"
+                log.write(
+                    f"{backend:>14} {name:>7} n_iter={n_iter:>9} n_jobs={jobs_label:>2}: "
+                    f"median {stats['median']:.4f} s, p95 {stats['p95']:.4f} s, "
+                    f"cpu {stats['cpu_median']:.4f} s\n"
+                )
+    finally:
+        for pool in _POOLS.values():
+            pool.close()
+        _POOLS.clear()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeats": repeats,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, *, threshold: float = 0.1) -> list[dict]:
+    """
+    Сравнивает медианы двух отчётов run_suite().
+
+    Возвращает строки для общих конфигураций с полем ratio = new / base;
+    regression=True, если новая медиана хуже базовой больше чем на threshold.
+    """
+    def key(row):
+        return row["backend"], row["integrand"], row["n_iter"], row["n_jobs"]
+
+    base_rows = {key(row): row for row in base["results"]}
+    rows = []
+    for row in new["results"]:
+        old = base_rows.get(key(row))
+        if old is None or old["median"] <= 0:
+            continue
+        ratio = row["median"] / old["median"]
+        rows.append(
+            {
+                "backend": row["backend"],
+                "integrand": row["integrand"],
+                "n_iter": row["n_iter"],
+                "n_jobs": row["n_jobs"],
+                "base_median": old["median"],
+                "new_median": row["median"],
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="прогнать сетку бенчмарков")
+    run_p.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    run_p.add_argument("--integrands", nargs="+", default=list(INTEGRANDS), choices=list(INTEGRANDS))
+    run_p.add_argument("--n-iter", nargs="+", type=int, default=[100_000, 500_000])
+    run_p.add_argument("--n-jobs", nargs="+", type=int, default=[2, 4])
+    run_p.add_argument("--repeats", type=int, default=5)
+    run_p.add_argument("--warmup", type=int, default=1)
+    run_p.add_argument("-o", "--output", default="bench_results.json")
+
+    cmp_p = sub.add_parser("compare", help="сравнить два файла результатов")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.1,
+                       help="допустимое относительное замедление медианы (0.1 = 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_suite(
+            backends=args.backends,
+            integrands=args.integrands,
+            n_iters=args.n_iter,
+            n_jobs_values=args.n_jobs,
+            repeats=args.repeats,
+            warmup=args.warmup,
+        )
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+        print(f"Результаты сохранены в {args.output}")
+        return 0
+
+    with open(args.base, encoding="utf-8") as fh:
+        base = json.load(fh)
+    with open(args.new, encoding="utf-8") as fh:
+        new = json.load(fh)
+    rows = compare(base, new, threshold=args.threshold)
+    for row in rows:
+        mark = "РЕГРЕССИЯ" if row["regression"] else "ok"
+        print(
+            f"{row['backend']:>14} {row['integrand']:>7} n_iter={row['n_iter']:>9} "
+            f"n_jobs={row['n_jobs'] or '-':>2}: {row['base_median']:.4f} -> {row['new_median']:.4f} s "
+            f"(x{row['ratio']:.2f}) {mark}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
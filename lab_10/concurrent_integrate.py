@@ -1,8 +1,29 @@
+import asyncio
+import itertools
+import logging
 import math
+import os
+import struct
+import sys
+import threading
+import time
 from functools import partial
+from multiprocessing import resource_tracker, shared_memory as shm
+from typing import Iterable, Iterator, NamedTuple
 import concurrent.futures as ftres
 
-from integrate import integrate
+from integrate import AdaptiveResult, compensated_sum, integrate
+
+# Журнал по частям разбиения (границы, время, работник) пишется на уровне
+# DEBUG. По умолчанию он выключен, и части считаются без обёрток и замеров;
+# включается через logging.getLogger("concurrent_integrate").setLevel(logging.DEBUG).
+logger = logging.getLogger(__name__)
+
+# Сколько частей по умолчанию приходится на одного работника. Части
+# раздаются пулом по мере освобождения работников, поэтому дорогой
+# участок [a, b] не задерживает остальных: пока один работник считает
+# его часть, другие разбирают оставшиеся.
+CHUNKS_PER_JOB = 8
 
 
 def integrate_async(
@@ -12,68 +33,508 @@ def integrate_async(
     *,
     n_jobs: int = 2,
     n_iter: int = 1000,
-) -> float:
+    tol: float | None = None,
+    n_chunks: int | None = None,
+) -> float | AdaptiveResult:
     """
     Параллельное численное интегрирование с помощью пула потоков.
 
-    Разбивает отрезок [a, b] на n_jobs подотрезков, на каждом из которых
-    вызывается функция integrate(). Результаты суммируются.
+    Разбивает отрезок [a, b] на n_chunks подотрезков (по умолчанию
+    CHUNKS_PER_JOB * n_jobs), на каждом из которых вызывается функция
+    integrate(); n_jobs работников разбирают их по мере освобождения.
+    Все n_iter точек исходной сетки распределяются между частями без
+    потерь, поэтому результат совпадает с integrate(f, a, b, n_iter=n_iter)
+    с точностью до порядка суммирования.
+    Если задан tol, каждый подотрезок интегрируется адаптивно с допуском
+    tol / n_chunks, а n_iter игнорируется. Тогда возвращается AdaptiveResult:
+    значения, оценки погрешности и числа вычислений f частей складываются.
     """
-    executor = ftres.ThreadPoolExecutor(max_workers=n_jobs)
+    with ftres.ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        futures = _submit_parts(
+            executor, f, a, b, n_chunks=_chunk_count(n_jobs, n_chunks), n_iter=n_iter, tol=tol
+        )
+        return _sum_completed(futures)
 
-    local_n_iter = n_iter // n_jobs
-    spawn = partial(
-        executor.submit,
-        integrate,
-        f,
-        n_iter=local_n_iter,
-    )
 
-    step = (b - a) / n_jobs
-    futures = []
+def integrate_process(
+    f,
+    a: float,
+    b: float,
+    *,
+    n_jobs: int = 2,
+    n_iter: int = 1000,
+    tol: float | None = None,
+    shared_memory: bool = False,
+    n_chunks: int | None = None,
+) -> float | AdaptiveResult:
+    """
+    Параллельное численное интегрирование с помощью пула процессов.
 
-    for i in range(n_jobs):
-        left = a + i * step
-        right = a + (i + 1) * step
-        print(f"Работник {i}, границы: {left}, {right}")
-        futures.append(spawn(left, right))
+    Параметры tol и n_chunks работают так же, как в integrate_async().
+    Пул создаётся на каждый вызов; для серии вызовов используйте Integrator.
 
-    total = 0.0
-    for fut in ftres.as_completed(futures):
-        total += fut.result()
+    При shared_memory=True работники записывают частичные суммы в общий
+    массив multiprocessing.shared_memory вместо возврата через futures,
+    а итог складывается компенсированным суммированием в порядке частей.
+    Результат тогда не зависит от того, какой работник закончил первым.
+    Этот режим — ради воспроизводимости, а не скорости: каждая часть всё
+    равно отчитывается через future, плюс создание блока и подключение
+    к нему, так что он не быстрее обычного (см. processes_shm в bench_suite).
+    """
+    n_chunks = _chunk_count(n_jobs, n_chunks)
+    with ftres.ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        if shared_memory:
+            return _integrate_shared(
+                executor, f, a, b, n_chunks=n_chunks, n_iter=n_iter, tol=tol
+            )
+        futures = _submit_parts(executor, f, a, b, n_chunks=n_chunks, n_iter=n_iter, tol=tol)
+        return _sum_completed(futures)
 
-    executor.shutdown(wait=True)
-    return total
 
+class Integrator:
+    """
+    Интегратор с долгоживущим пулом потоков или процессов.
 
-def integrate_process(
+    Пул создаётся один раз и переиспользуется всеми вызовами integrate(),
+    поэтому стоимость запуска процессов платится однократно. Используется
+    как контекстный менеджер:
+
+    >>> import math
+    >>> with Integrator("thread", max_workers=2) as integrator:
+    ...     round(integrator.integrate(math.sin, 0.0, math.pi, n_iter=10_000), 3)
+    2.0
+    """
+
+    def __init__(self, kind: str = "process", max_workers: int | None = None):
+        if kind == "process":
+            executor = ftres.ProcessPoolExecutor(max_workers=max_workers)
+        elif kind == "thread":
+            executor = ftres.ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            raise ValueError("kind must be 'process' or 'thread'")
+        self._kind = kind
+        self._executor = executor
+        self._max_workers = executor._max_workers
+
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def executor(self) -> ftres.Executor:
+        return self._executor
+
+    def integrate(
+        self,
+        f,
+        a: float,
+        b: float,
+        *,
+        n_jobs: int | None = None,
+        n_iter: int = 1000,
+        tol: float | None = None,
+        shared_memory: bool = False,
+        n_chunks: int | None = None,
+    ) -> float | AdaptiveResult:
+        """
+        Интеграл f на [a, b]. n_jobs (по умолчанию — число работников пула)
+        задаёт число частей n_chunks по умолчанию; остальные параметры
+        как у integrate_process().
+        """
+        n_chunks = _chunk_count(n_jobs or self._max_workers, n_chunks)
+        if shared_memory:
+            return _integrate_shared(
+                self._executor, f, a, b, n_chunks=n_chunks, n_iter=n_iter, tol=tol
+            )
+        futures = _submit_parts(
+            self._executor,
+            f,
+            a,
+            b,
+            n_chunks=n_chunks,
+            n_iter=n_iter,
+            tol=tol,
+        )
+        return _sum_completed(futures)
+
+    def close(self) -> None:
+        """Дожидается завершения задач и останавливает пул."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "Integrator":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+async def integrate_aio(
     f,
     a: float,
     b: float,
     *,
     n_jobs: int = 2,
     n_iter: int = 1000,
-) -> float:
+    tol: float | None = None,
+    executor: "ftres.Executor | Integrator | None" = None,
+    timeout: float | None = None,
+    n_chunks: int | None = None,
+) -> float | AdaptiveResult:
     """
-    Параллельное численное интегрирование с помощью пула процессов.
+    Асинхронное интегрирование для asyncio: не блокирует цикл событий.
+
+    Части [a, b] (как в integrate_async, включая n_chunks) отправляются в пул через
+    loop.run_in_executor. executor — общий пул (Executor или Integrator),
+    который могут делить между собой сколько угодно одновременных вызовов;
+    его размер ограничивает число частей в работе. По умолчанию используется
+    пул цикла событий.
+
+    Если вызов отменён или истёк timeout (asyncio.TimeoutError), ещё не
+    начатые части снимаются с очереди пула. Части складываются в порядке
+    разбиения, поэтому результат не зависит от порядка завершения.
+
+    >>> import asyncio, math
+    >>> round(asyncio.run(integrate_aio(math.sin, 0.0, math.pi, n_iter=10_000)), 3)
+    2.0
+    """
+    if isinstance(executor, Integrator):
+        executor = executor.executor
+    loop = asyncio.get_running_loop()
+    tasks, local_tol = _split(
+        a, b, n_chunks=_chunk_count(n_jobs, n_chunks), n_iter=n_iter, tol=tol
+    )
+    futures = [
+        loop.run_in_executor(
+            executor, partial(integrate, f, left, right, n_iter=count, tol=local_tol)
+        )
+        for (left, right, count) in tasks
+    ]
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*futures), timeout)
+    except BaseException:
+        for fut in futures:
+            fut.cancel()
+        raise
+    return _total(results, compensated_sum)
+
+
+def integrate_many(
+    jobs: Iterable[tuple],
+    *,
+    n_iter: int = 1000,
+    method: str = "left",
+    tol: float | None = None,
+    kind: str = "process",
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    stream: bool = False,
+    integrator: Integrator | None = None,
+) -> list[float] | Iterator[float]:
     """
-    local_n_iter = n_iter // n_jobs
-    step = (b - a) / n_jobs
+    Вычисляет много интегралов (f, a, b) за один вызов на одном пуле.
 
+    Каждая задача целиком считается одним работником через integrate();
+    задачи отправляются в пул пачками по chunksize штук, что снижает
+    накладные расходы на передачу данных между процессами. Результаты
+    возвращаются в порядке задач.
+
+    С tol каждая задача возвращает AdaptiveResult (см. integrate()).
+
+    Если передан integrator, используется его пул, иначе создаётся
+    временный пул вида kind ("process" или "thread").
+    При stream=True возвращается генератор, выдающий результаты по мере
+    готовности (с сохранением порядка); временный пул живёт, пока генератор
+    не исчерпан или не закрыт.
+
+    >>> import math
+    >>> jobs = [(math.sin, 0.0, math.pi), (math.cos, 0.0, math.pi / 2)]
+    >>> [round(x, 3) for x in integrate_many(jobs, n_iter=10_000, kind="thread")]
+    [2.0, 1.0]
+    """
+    jobs = list(jobs)
+    worker = partial(_integrate_job, n_iter=n_iter, method=method, tol=tol)
+    results = _map_jobs(worker, jobs, kind, max_workers, chunksize, integrator)
+    if stream:
+        return results
+    return list(results)
+
+
+def _map_jobs(worker, jobs, kind, max_workers, chunksize, integrator) -> Iterator[float]:
+    if integrator is not None:
+        yield from integrator.executor.map(
+            worker, jobs, chunksize=chunksize or _default_chunksize(jobs, integrator.max_workers)
+        )
+        return
+
+    with Integrator(kind, max_workers=max_workers) as own:
+        yield from own.executor.map(
+            worker, jobs, chunksize=chunksize or _default_chunksize(jobs, own.max_workers)
+        )
+
+
+def _default_chunksize(jobs: list, max_workers: int) -> int:
+    # Как в multiprocessing.Pool.map: около четырёх пачек на работника.
+    chunksize, extra = divmod(len(jobs), max_workers * 4)
+    return max(1, chunksize + bool(extra))
+
+
+def _integrate_job(
+    job: tuple, *, n_iter: int, method: str, tol: float | None
+) -> float | AdaptiveResult:
+    f, a, b = job
+    return integrate(f, a, b, n_iter=n_iter, method=method, tol=tol)
+
+
+def _integrate_shared(
+    executor: ftres.Executor,
+    f,
+    a: float,
+    b: float,
+    *,
+    n_chunks: int,
+    n_iter: int,
+    tol: float | None,
+) -> float | AdaptiveResult:
+    """Частичные суммы через общую память, свёртка в фиксированном порядке."""
+    block = shm.SharedMemory(create=True, size=n_chunks * _CELL.size)
+    futures: list[ftres.Future] = []
+    try:
+        futures = _submit_parts(
+            executor, f, a, b, n_chunks=n_chunks, n_iter=n_iter, tol=tol,
+            out=_BlockRef(block.name, next(_block_ids), _tracker_id()),
+        )
+        for fut in futures:
+            report = fut.result()  # пробрасывает исключения работников
+            if report is not None:
+                _log_chunk(report)
+        # Частей могло стать меньше n_chunks (n_iter < n_chunks).
+        raw = bytes(block.buf[: len(futures) * _CELL.size])
+        cells = list(_CELL.iter_unpack(raw))
+        value = compensated_sum(v for v, _, _ in cells)
+        if tol is None:
+            return value
+        return AdaptiveResult(
+            value, math.fsum(e for _, e, _ in cells), sum(n for _, _, n in cells)
+        )
+    finally:
+        # Блок удаляется, только когда ни одна часть уже не пишет в него.
+        for fut in futures:
+            fut.cancel()
+        ftres.wait(futures)
+        block.close()
+        block.unlink()
+
+
+# Ячейка части в общей памяти: значение, оценка погрешности и число
+# вычислений f (последние два заполняются только при tol).
+_CELL = struct.Struct("ddq")
+
+# Номер вызова _integrate_shared: вместе с именем блока отличает его от
+# прежнего блока с тем же (случайным) именем в кэше работника.
+_block_ids = itertools.count()
+
+
+class _BlockRef(NamedTuple):
+    name: str
+    call: int
+    tracker: tuple[int, int] | None
+
+
+def _tracker_id() -> tuple[int, int] | None:
+    """
+    Канал трекера ресурсов этого процесса (устройство, inode) или None,
+    если подключения к блоку не регистрируются (Python 3.13+, Windows).
+    """
+    if sys.version_info >= (3, 13) or os.name != "posix":
+        return None
+    stat = os.fstat(resource_tracker.getfd())
+    return stat.st_dev, stat.st_ino
+
+
+# Блок, к которому подключён поток работника: части одного вызова
+# переиспользуют подключение, а не открывают блок заново.
+_attached = threading.local()
+
+
+def _attach(out: _BlockRef) -> shm.SharedMemory:
+    """Подключение к блоку out, одно на работника и вызов."""
+    if getattr(_attached, "out", None) == out:
+        return _attached.block
+    if getattr(_attached, "block", None) is not None:
+        _attached.block.close()
+        _attached.block = None
+    if sys.version_info >= (3, 13):
+        block = shm.SharedMemory(name=out.name, track=False)
+    else:
+        block = shm.SharedMemory(name=out.name)
+        # До Python 3.13 подключение по имени регистрирует блок в трекере
+        # ресурсов. Если пул стартовал раньше трекера родителя, трекер у
+        # работника свой: при выходе он сообщил бы об «утечке» и попытался
+        # удалить уже удалённый родителем блок. В общем с родителем трекере
+        # регистрацию снимать нельзя — она и есть регистрация родителя.
+        if out.tracker is not None and _tracker_id() != out.tracker:
+            resource_tracker.unregister(block._name, "shared_memory")
+    _attached.out, _attached.block = out, block
+    return block
+
+
+def _integrate_into(
+    out: _BlockRef, index: int, trace: bool, f, a: float, b: float, **kwargs
+) -> "_ChunkReport | None":
+    """
+    Считает integrate() и кладёт результат в ячейку index общей памяти out.
+    При trace=True возвращает отчёт о части для журнала.
+    """
+    if trace:
+        report = _traced_integrate(index, f, a, b, **kwargs)
+        value = report.value
+    else:
+        report = None
+        value = integrate(f, a, b, **kwargs)
+    cell = value if isinstance(value, AdaptiveResult) else (value, 0.0, 0)
+    _CELL.pack_into(_attach(out).buf, index * _CELL.size, *cell)
+    return report
+
+
+class _ChunkReport(NamedTuple):
+    index: int
+    left: float
+    right: float
+    value: float | AdaptiveResult
+    elapsed: float
+    worker: str
+
+
+def _traced_integrate(index: int, f, a: float, b: float, **kwargs) -> _ChunkReport:
+    """integrate() с замером времени и идентификатором работника."""
+    start = time.perf_counter()
+    value = integrate(f, a, b, **kwargs)
+    elapsed = time.perf_counter() - start
+    worker = f"{os.getpid()}/{threading.current_thread().name}"
+    return _ChunkReport(index, a, b, value, elapsed, worker)
+
+
+def _log_chunk(report: _ChunkReport) -> None:
+    logger.debug(
+        "часть %d [%r, %r]: %.6f с, работник %s",
+        report.index,
+        report.left,
+        report.right,
+        report.elapsed,
+        report.worker,
+    )
+
+
+def _sum_completed(futures: list[ftres.Future]) -> float | AdaptiveResult:
+    """Сумма результатов частей по мере готовности; отчёты частей — в журнал."""
+    results = []
+    for fut in ftres.as_completed(futures):
+        result = fut.result()
+        if isinstance(result, _ChunkReport):
+            _log_chunk(result)
+            result = result.value
+        results.append(result)
+    return _total(results)
+
+
+def _total(results: list, summation=sum) -> float | AdaptiveResult:
+    """
+    Сумма результатов частей. Для AdaptiveResult (режим tol) значения
+    складываются через summation, а оценки погрешности и числа вычислений f
+    — отдельно.
+    """
+    if results and isinstance(results[0], AdaptiveResult):
+        return AdaptiveResult(
+            summation(r.value for r in results),
+            math.fsum(r.error for r in results),
+            sum(r.n_evals for r in results),
+        )
+    return summation(results)
+
+
+def _chunk_count(n_jobs: int, n_chunks: int | None) -> int:
+    if n_chunks is None:
+        n_chunks = CHUNKS_PER_JOB * n_jobs
+    if n_chunks <= 0:
+        raise ValueError("n_chunks must be a positive integer")
+    return n_chunks
+
+
+def _split(
+    a: float, b: float, *, n_chunks: int, n_iter: int, tol: float | None
+) -> tuple[list[tuple[float, float, int]], float | None]:
+    """
+    Части [a, b] вида (left, right, n_iter) и tol для каждой части.
+
+    Без tol границы частей лежат на узлах общей сетки с шагом (b - a) / n_iter,
+    а точки делятся между частями поровну с точностью до одной, так что
+    их сумма равна n_iter. Частей не больше, чем точек.
+    С tol отрезок делится на n_chunks равных частей.
+    """
+    if tol is not None:
+        step = (b - a) / n_chunks
+        tasks = [
+            (a + i * step, a + (i + 1) * step, n_iter)
+            for i in range(n_chunks)
+        ]
+        return tasks, tol / n_chunks
+
+    n_chunks = max(1, min(n_chunks, n_iter))
+    step = (b - a) / n_iter
+    edges = [k * n_iter // n_chunks for k in range(n_chunks + 1)]
     tasks = [
-        (a + i * step, a + (i + 1) * step)
-        for i in range(n_jobs)
+        (a + lo * step, b if hi == n_iter else a + hi * step, hi - lo)
+        for lo, hi in zip(edges, edges[1:])
     ]
+    return tasks, None
 
-    with ftres.ProcessPoolExecutor(max_workers=n_jobs) as executor:
-        futures = [
-            executor.submit(integrate, f, left, right, n_iter=local_n_iter)
-            for (left, right) in tasks
+
+def _submit_parts(
+    executor: ftres.Executor,
+    f,
+    a: float,
+    b: float,
+    *,
+    n_chunks: int,
+    n_iter: int,
+    tol: float | None,
+    out: _BlockRef | None = None,
+) -> list[ftres.Future]:
+    """
+    Разбивает [a, b] на n_chunks частей и отправляет их в пул.
+
+    Все части ставятся в очередь пула сразу, а работники берут следующую,
+    как только освобождаются, — нагрузка выравнивается без планировщика.
+
+    Если задан блок общей памяти out, часть i пишет результат
+    в его i-ю ячейку, а future возвращает None. Если в журнале включён
+    уровень DEBUG, части возвращают _ChunkReport вместо числа.
+    """
+    trace = logger.isEnabledFor(logging.DEBUG)
+    tasks, local_tol = _split(a, b, n_chunks=n_chunks, n_iter=n_iter, tol=tol)
+    if out is not None:
+        return [
+            executor.submit(
+                _integrate_into, out, i, trace, f, left, right,
+                n_iter=count, tol=local_tol,
+            )
+            for i, (left, right, count) in enumerate(tasks)
+        ]
+    if trace:
+        return [
+            executor.submit(
+                _traced_integrate, i, f, left, right, n_iter=count, tol=local_tol
+            )
+            for i, (left, right, count) in enumerate(tasks)
         ]
-        total = 0.0
-        for fut in ftres.as_completed(futures):
-            total += fut.result()
-    return total
+    return [
+        executor.submit(integrate, f, left, right, n_iter=count, tol=local_tol)
+        for (left, right, count) in tasks
+    ]
 
 
 if __name__ == "__main__":
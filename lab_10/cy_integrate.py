@@ -1,5 +1,5 @@
-def integrate_cy(a: float, b: float, n_iter: int = 100000) -> float:
+def integrate_cy(f: object, a: float, b: float, n_iter: int = 100000) -> float:
     """
     Stub for IDE type checking. Реальная реализация в cy_integrate.pyd.
     """
-    raise NotImplementedError("This is just a stub for IDE.")
\ No newline at end of file
+    raise NotImplementedError("This is just a stub for IDE.")
@@ -1,24 +1,21 @@
 # cy_integrate.pyx
 
-# cython: language_level=3
-
-# cy_integrate_nogil.pyx
 # cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
 
-cdef double _integrate_raw_nogil(double a, double b, long n_iter) nogil:
+
+def integrate_cy(f, double a, double b, long n_iter=100000):
+    """
+    Cython-версия integrate() по формуле левых прямоугольников.
+
+    Цикл и накопление суммы типизированы, но f — произвольная
+    Python-функция, поэтому GIL не освобождается. Для noGIL-версии
+    с конкретной f(x) см. cy_integrate_nogil.
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter must be a positive integer")
     cdef long i
     cdef double acc = 0.0
     cdef double step = (b - a) / n_iter
-    cdef double x
     for i in range(n_iter):
-        x = a + i * step
-        # пример: f(x) = x^2
-        acc += x * x * step
-    return acc
-
-
-сdef integrate_nogil(double a, double b, long n_iter=100000):
-    """
-    Python-обёртка над noGIL-функцией _integrate_raw_nogil.
-    """
-    return _integrate_raw_nogil(a, b, n_iter)
\ No newline at end of file
+        acc += f(a + i * step)
+    return acc * step
@@ -0,0 +1,15 @@
+# cy_integrate_nogil.pxd
+
+# Подынтегральная функция на C: data — произвольные параметры (например,
+# коэффициенты многочлена), передаются без изменений при каждом вызове.
+ctypedef double (*integrand_t)(double x, void* data) noexcept nogil
+
+cdef double integrate_c(
+    integrand_t f,
+    void* data,
+    double a,
+    double b,
+    long long n_iter,
+    int num_threads,
+    bint kahan=*,
+) noexcept nogil
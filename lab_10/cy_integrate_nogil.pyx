@@ -1,18 +1,41 @@
 # cy_integrate_nogil.pyx
 
 # cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+import math
+import os
+from array import array
+
 from cython.parallel import prange
-import cython
-
-@cython.cfunc
-@cython.locals(
-    i=cython.long,
-    step=cython.double,
-    acc=cython.double,
-    x=cython.double,
-)
-def _integrate_raw_nogil(double a, double b, long n_iter) nogil:
-    cdef long i
+from libc.math cimport cos, exp, sin
+from libc.stdlib cimport free, malloc
+
+from integrate import integrate
+
+
+cdef inline void _neumaier_add(double* acc, double* comp, double term) noexcept nogil:
+    """Компенсированное сложение Неймайера: acc += term, потери копятся в comp."""
+    cdef double t = acc[0] + term
+    if (acc[0] if acc[0] >= 0 else -acc[0]) >= (term if term >= 0 else -term):
+        comp[0] += (acc[0] - t) + term
+    else:
+        comp[0] += (term - t) + acc[0]
+    acc[0] = t
+
+
+cdef double _sum_range_kahan(double a, double step, long long start, long long stop) noexcept nogil:
+    """Сумма f(a + i * step) для i из [start, stop) с компенсацией."""
+    cdef long long i
+    cdef double acc = 0.0
+    cdef double comp = 0.0
+    cdef double x
+    for i in range(start, stop):
+        x = a + i * step
+        _neumaier_add(&acc, &comp, x * x)
+    return acc + comp
+
+
+cdef double _integrate_raw_nogil(double a, double b, long long n_iter) noexcept nogil:
+    cdef long long i
     cdef double acc = 0.0
     cdef double step = (b - a) / n_iter
     cdef double x
@@ -24,9 +47,324 @@ def _integrate_raw_nogil(double a, double b, long n_iter) nogil:
     return acc
 
 
-def integrate_nogil(double a, double b, long n_iter=100000):
+cdef double _integrate_raw_kahan_nogil(double a, double b, long long n_iter) noexcept nogil:
+    """
+    То же, что _integrate_raw_nogil, но с компенсированным суммированием
+    Неймайера: потерянные младшие разряды копятся в comp.
+    """
+    cdef double step = (b - a) / n_iter
+    return _sum_range_kahan(a, step, 0, n_iter) * step
+
+
+cdef double _integrate_raw_prange(double a, double b, long long n_iter, int num_threads) noexcept nogil:
+    """
+    OpenMP-версия _integrate_raw_nogil: итерации делятся между потоками
+    статически, acc — переменная редукции prange.
+    """
+    cdef long long i
+    cdef double acc = 0.0
+    cdef double step = (b - a) / n_iter
+    cdef double x
+    for i in prange(n_iter, schedule="static", num_threads=num_threads):
+        x = a + i * step
+        acc += x * x
+    return acc * step
+
+
+cdef double _integrate_raw_kahan_prange(
+    double a, double b, long long n_iter, int num_threads, double* partials
+) noexcept nogil:
+    """
+    Параллельная компенсированная сумма: каждый из num_threads блоков
+    суммируется с компенсацией в partials[k], затем блоки складываются
+    в фиксированном порядке, так что результат не зависит от расписания.
+    """
+    cdef long long k, start, stop
+    cdef double step = (b - a) / n_iter
+    cdef double acc = 0.0
+    cdef double comp = 0.0
+    for k in prange(num_threads, schedule="static", num_threads=num_threads):
+        start = k * n_iter // num_threads
+        stop = (k + 1) * n_iter // num_threads
+        partials[k] = _sum_range_kahan(a, step, start, stop)
+    for k in range(num_threads):
+        _neumaier_add(&acc, &comp, partials[k])
+    return (acc + comp) * step
+
+
+def integrate_nogil(
+    double a,
+    double b,
+    long long n_iter=100000,
+    str summation="naive",
+    num_threads=None,
+):
     """
     Пример noGIL-версии для конкретной функции f(x) = x^2.
     Для обобщённой f(x) придётся отказаться от чистого nogil.
+
+    summation="kahan" включает компенсированное суммирование, которое
+    не теряет точность при n_iter порядка 10**9.
+
+    num_threads — число потоков OpenMP (по умолчанию все ядра). При
+    num_threads=1 используется последовательное ядро. Если модуль собран
+    без OpenMP, prange выполняется в одном потоке.
+    """
+    if n_iter <= 0:
+        raise ValueError("n_iter must be a positive integer")
+    if summation not in ("naive", "kahan"):
+        raise ValueError("summation must be 'naive' or 'kahan'")
+    cdef int threads = num_threads if num_threads is not None else (os.cpu_count() or 1)
+    if threads <= 0:
+        raise ValueError("num_threads must be a positive integer")
+    if threads > n_iter:
+        threads = <int>n_iter
+
+    cdef bint kahan = summation == "kahan"
+    cdef double result
+    cdef double* partials
+    if threads == 1:
+        with nogil:
+            if kahan:
+                result = _integrate_raw_kahan_nogil(a, b, n_iter)
+            else:
+                result = _integrate_raw_nogil(a, b, n_iter)
+        return result
+
+    if not kahan:
+        with nogil:
+            result = _integrate_raw_prange(a, b, n_iter, threads)
+        return result
+
+    partials = <double*> malloc(threads * sizeof(double))
+    if partials == NULL:
+        raise MemoryError()
+    try:
+        with nogil:
+            result = _integrate_raw_kahan_prange(a, b, n_iter, threads, partials)
+    finally:
+        free(partials)
+    return result
+
+
+# ----------------- Интегрирование C-функций по указателю -----------------
+
+ctypedef double (*_plain_func_t)(double x) noexcept nogil
+
+cdef struct _poly_t:
+    const double* coeffs
+    Py_ssize_t n
+
+
+cdef double _f_square(double x, void* data) noexcept nogil:
+    return x * x
+
+
+cdef double _f_sin(double x, void* data) noexcept nogil:
+    return sin(x)
+
+
+cdef double _f_cos(double x, void* data) noexcept nogil:
+    return cos(x)
+
+
+cdef double _f_exp(double x, void* data) noexcept nogil:
+    return exp(x)
+
+
+cdef double _f_poly(double x, void* data) noexcept nogil:
+    """Многочлен c[0] + c[1] * x + ... по схеме Горнера."""
+    cdef _poly_t* poly = <_poly_t*> data
+    cdef Py_ssize_t k
+    cdef double acc = 0.0
+    for k in range(poly.n - 1, -1, -1):
+        acc = acc * x + poly.coeffs[k]
+    return acc
+
+
+cdef double _f_plain(double x, void* data) noexcept nogil:
+    """Адаптер для внешней функции double f(double), адрес которой в data."""
+    return (<_plain_func_t> data)(x)
+
+
+cdef double _sum_range_c(
+    integrand_t f, void* data, double a, double step, long long start, long long stop, bint kahan
+) noexcept nogil:
+    cdef long long i
+    cdef double acc = 0.0
+    cdef double comp = 0.0
+    if kahan:
+        for i in range(start, stop):
+            _neumaier_add(&acc, &comp, f(a + i * step, data))
+        return acc + comp
+    for i in range(start, stop):
+        acc += f(a + i * step, data)
+    return acc
+
+
+cdef double integrate_c(
+    integrand_t f,
+    void* data,
+    double a,
+    double b,
+    long long n_iter,
+    int num_threads,
+    bint kahan=False,
+) noexcept nogil:
+    """
+    Левые прямоугольники для C-функции f(x, data) без GIL.
+
+    Доступна другим Cython-модулям через cimport (см. .pxd). n_iter и
+    num_threads должны быть положительными; проверка — на вызывающей стороне.
+    """
+    cdef long long i, k, start, stop
+    cdef double acc = 0.0
+    cdef double comp = 0.0
+    cdef double step = (b - a) / n_iter
+    cdef double* partials
+
+    if num_threads > n_iter:
+        num_threads = <int>n_iter
+    if num_threads <= 1:
+        return _sum_range_c(f, data, a, step, 0, n_iter, kahan) * step
+
+    if not kahan:
+        for i in prange(n_iter, schedule="static", num_threads=num_threads):
+            acc += f(a + i * step, data)
+        return acc * step
+
+    partials = <double*> malloc(num_threads * sizeof(double))
+    if partials == NULL:
+        return _sum_range_c(f, data, a, step, 0, n_iter, kahan) * step
+    for k in prange(num_threads, schedule="static", num_threads=num_threads):
+        start = k * n_iter // num_threads
+        stop = (k + 1) * n_iter // num_threads
+        partials[k] = _sum_range_c(f, data, a, step, start, stop, True)
+    for k in range(num_threads):
+        _neumaier_add(&acc, &comp, partials[k])
+    free(partials)
+    return (acc + comp) * step
+
+
+BUILTIN_INTEGRANDS = ("square", "sin", "cos", "exp", "poly")
+
+
+cdef integrand_t _builtin(str name) except NULL:
+    if name == "square":
+        return _f_square
+    if name == "sin":
+        return _f_sin
+    if name == "cos":
+        return _f_cos
+    if name == "exp":
+        return _f_exp
+    if name == "poly":
+        return _f_poly
+    raise ValueError(f"unknown integrand {name!r}, expected one of {BUILTIN_INTEGRANDS}")
+
+
+cdef int _check_args(long long n_iter, num_threads) except -1:
+    if n_iter <= 0:
+        raise ValueError("n_iter must be a positive integer")
+    cdef int threads = num_threads if num_threads is not None else (os.cpu_count() or 1)
+    if threads <= 0:
+        raise ValueError("num_threads must be a positive integer")
+    return threads
+
+
+def integrate_builtin(
+    str name,
+    double a,
+    double b,
+    long long n_iter=100000,
+    coeffs=None,
+    str summation="naive",
+    num_threads=None,
+):
+    """
+    Интеграл встроенной функции из BUILTIN_INTEGRANDS на C-скорости без GIL.
+
+    Для name="poly" coeffs задаёт коэффициенты многочлена по возрастанию
+    степеней: coeffs=(1, 0, 3) — это 1 + 3 * x**2.
+    Остальные параметры — как у integrate_nogil.
+    """
+    cdef integrand_t f = _builtin(name)
+    cdef int threads = _check_args(n_iter, num_threads)
+    if summation not in ("naive", "kahan"):
+        raise ValueError("summation must be 'naive' or 'kahan'")
+    cdef bint kahan = summation == "kahan"
+    cdef _poly_t poly
+    cdef double[::1] c
+    cdef double result
+
+    if name == "poly":
+        if coeffs is None:
+            raise ValueError("coeffs are required for name='poly'")
+        c = array("d", coeffs)
+        if c.shape[0] == 0:
+            return 0.0
+        poly.coeffs = &c[0]
+        poly.n = c.shape[0]
+    with nogil:
+        result = integrate_c(f, &poly, a, b, n_iter, threads, kahan)
+    return result
+
+
+def integrate_cfunc(
+    size_t address,
+    double a,
+    double b,
+    long long n_iter=100000,
+    str summation="naive",
+    num_threads=None,
+):
+    """
+    Интеграл внешней C-функции double f(double) по её адресу.
+
+    Адрес можно получить через ctypes, например для sin из libm:
+    ``ctypes.cast(ctypes.CDLL(ctypes.util.find_library("m")).sin, ctypes.c_void_p).value``.
+    Функция должна быть потокобезопасной и не требовать GIL.
+    """
+    if address == 0:
+        raise ValueError("address must not be NULL")
+    cdef int threads = _check_args(n_iter, num_threads)
+    if summation not in ("naive", "kahan"):
+        raise ValueError("summation must be 'naive' or 'kahan'")
+    cdef bint kahan = summation == "kahan"
+    cdef double result
+    with nogil:
+        result = integrate_c(_f_plain, <void*> address, a, b, n_iter, threads, kahan)
+    return result
+
+
+def match_builtin(f):
+    """Имя встроенной функции и коэффициенты для f или (None, None)."""
+    if f is math.sin:
+        return "sin", None
+    if f is math.cos:
+        return "cos", None
+    if f is math.exp:
+        return "exp", None
+    name = getattr(f, "__name__", None)
+    if getattr(f, "__module__", None) == "numpy" and name in ("sin", "cos", "exp", "square"):
+        return name, None
+    # numpy.polynomial.Polynomial с тождественным отображением области
+    coef = getattr(f, "coef", None)
+    if coef is not None and type(f).__name__ == "Polynomial":
+        if tuple(f.domain) == tuple(f.window):
+            return "poly", [float(c) for c in coef]
+    return None, None
+
+
+def integrate_fast(f, double a, double b, long long n_iter=100000, num_threads=None):
+    """
+    Интеграл f на [a, b] по левым прямоугольникам.
+
+    Если f — одна из встроенных функций (math.sin/cos/exp, numpy.sin/cos/
+    exp/square или numpy.polynomial.Polynomial), считается C-ядром без GIL.
+    Для произвольной Python-функции используется обычный integrate().
     """
-    return _integrate_raw_nogil(a, b, n_iter)
\ No newline at end of file
+    name, coeffs = match_builtin(f)
+    if name is None:
+        return integrate(f, a, b, n_iter=n_iter)
+    return integrate_builtin(name, a, b, n_iter, coeffs=coeffs, num_threads=num_threads)
@@ -1,16 +1,112 @@
 import math
+from functools import lru_cache, partial
+from typing import Callable, Iterable, NamedTuple, Sequence
 
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для векторизованного режима
+    np = None
 
-def integrate(f: object, a: float, b: float, *, n_iter: int = 100_000) -> float:
+
+# Максимальное число точек сетки, обрабатываемых за один векторный вызов f.
+# 2**20 значений float64 — около 8 МБ на массив, поэтому память не растёт
+# с n_iter даже при 10**8 точек.
+DEFAULT_CHUNK_SIZE: int = 1 << 20
+
+
+class QuadratureRule(NamedTuple):
     """
-    Численное вычисление определённого интеграла по формуле левых прямоугольников.
+    Квадратурная формула на одной панели, приведённая к отрезку [0, 1].
+
+    Интеграл по панели [x, x + h] равен h * sum(w * f(x + t * h)).
+    Сумма весов равна 1.
+    """
+
+    nodes: tuple[float, ...]
+    weights: tuple[float, ...]
+
+
+@lru_cache(maxsize=None)
+def gauss_legendre(n_points: int) -> QuadratureRule:
+    """
+    Формула Гаусса–Лежандра с `n_points` узлами на отрезке [0, 1].
+
+    Узлы — корни многочлена Лежандра P_n, найденные методом Ньютона.
+    Формула точна для многочленов степени до 2 * n_points - 1.
+    """
+    if n_points <= 0:
+        raise ValueError("n_points must be a positive integer")
+
+    points: list[tuple[float, float]] = []
+    for k in range(1, n_points + 1):
+        x = math.cos(math.pi * (k - 0.25) / (n_points + 0.5))
+        for _ in range(100):
+            p_prev, p_cur = 1.0, x
+            for j in range(2, n_points + 1):
+                p_prev, p_cur = p_cur, ((2 * j - 1) * x * p_cur - (j - 1) * p_prev) / j
+            dp = n_points * (x * p_cur - p_prev) / (x * x - 1.0)
+            dx = p_cur / dp
+            x -= dx
+            if abs(dx) < 1e-15:
+                break
+        weight = 2.0 / ((1.0 - x * x) * dp * dp)
+        points.append(((1.0 + x) / 2.0, weight / 2.0))
+
+    points.sort()
+    return QuadratureRule(
+        tuple(t for t, _ in points),
+        tuple(w for _, w in points),
+    )
+
+
+RULES: dict[str, QuadratureRule] = {
+    "left": QuadratureRule((0.0,), (1.0,)),
+    "midpoint": QuadratureRule((0.5,), (1.0,)),
+    "trapezoid": QuadratureRule((0.0, 1.0), (0.5, 0.5)),
+    "simpson": QuadratureRule((0.0, 0.5, 1.0), (1 / 6, 4 / 6, 1 / 6)),
+    "gauss": gauss_legendre(3),
+}
+
+
+def register_rule(name: str, nodes: Sequence[float], weights: Sequence[float]) -> None:
+    """
+    Регистрирует квадратурную формулу под именем `name` для `method=`.
+
+    Узлы задаются на [0, 1] в порядке возрастания, сумма весов равна 1.
+    """
+    nodes = tuple(float(t) for t in nodes)
+    weights = tuple(float(w) for w in weights)
+    if not nodes or len(nodes) != len(weights):
+        raise ValueError("nodes and weights must be non-empty and of equal length")
+    if any(t < 0.0 or t > 1.0 for t in nodes) or list(nodes) != sorted(nodes):
+        raise ValueError("nodes must be sorted and lie in [0, 1]")
+    if not math.isclose(math.fsum(weights), 1.0, rel_tol=1e-12):
+        raise ValueError("weights must sum to 1")
+    RULES[name] = QuadratureRule(nodes, weights)
+
+
+def integrate(
+    f: object,
+    a: float,
+    b: float,
+    *,
+    n_iter: int = 100_000,
+    method: str | QuadratureRule = "left",
+    vectorized: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    tol: float | None = None,
+    summation: str = "naive",
+) -> "float | AdaptiveResult":
+    """
+    Численное вычисление определённого интеграла по составной квадратурной формуле.
 
     Функция приближённо вычисляет значение интеграла
     \[
         \int_a^b f(x)\,dx
     \]
     используя равномерное разбиение отрезка [a, b] на `n_iter` частей и
-    сумму значений функции в левых концах отрезков.
+    одну и ту же квадратурную формулу на каждой части. По умолчанию это
+    формула левых прямоугольников.
 
     Параметры
     ----------
@@ -26,21 +122,65 @@ def integrate(f: object, a: float, b: float, *, n_iter: int = 100_000) -> float:
         Число разбиений (итераций) метода. Должно быть положительным целым
         числом; при малых значениях точность низкая, при очень больших —
         возрастает время вычисления и накопление ошибок округления.
+    method : str или QuadratureRule, keyword-only
+        Квадратурная формула на каждой части разбиения:
+
+        - ``"left"`` — левые прямоугольники, погрешность O(h);
+        - ``"midpoint"`` — средние прямоугольники, O(h^2);
+        - ``"trapezoid"`` — трапеции, O(h^2);
+        - ``"simpson"`` — Симпсон, O(h^4);
+        - ``"gauss"`` — Гаусс–Лежандр по 3 узлам, O(h^6).
+
+        Можно передать и свою формулу: ``gauss_legendre(5)`` или имя,
+        зарегистрированное через ``register_rule``. Общие концы соседних
+        частей (трапеции, Симпсон) вычисляются один раз.
+    vectorized : bool, keyword-only
+        Если True, сетка строится массивами numpy по `chunk_size` точек и
+        `f` вызывается один раз на весь блок (подходит для ufunc вроде
+        ``numpy.sin`` и любых функций, принимающих массивы). Если `f` не
+        умеет работать с массивами, используется обычный поточечный цикл.
+    chunk_size : int, keyword-only
+        Максимальный размер блока в векторизованном режиме. Ограничивает
+        пиковое потребление памяти независимо от `n_iter`.
+    tol : float или None, keyword-only
+        Если задано, включается адаптивный режим (см. ``integrate_adaptive``):
+        отрезок дробится только там, где оценка погрешности больше допуска,
+        и вместо числа возвращается ``AdaptiveResult`` со значением, оценкой
+        погрешности и числом вычислений f. `n_iter` при этом не используется,
+        а `method`, `vectorized`, `chunk_size` и `summation` задавать нельзя
+        (TypeError).
+    summation : str, keyword-only
+        Способ накопления суммы значений f:
+
+        - ``"naive"`` — обычное ``acc += ...``, самый быстрый; ошибка
+          округления растёт пропорционально `n_iter`;
+        - ``"kahan"`` — компенсированное суммирование Неймайера, ошибка
+          не зависит от `n_iter`;
+        - ``"pairwise"`` — попарное суммирование, ошибка O(log n_iter).
+
+        В векторизованном режиме numpy суммирует каждый блок попарно,
+        а `summation` задаёт способ сложения сумм блоков.
 
     Возвращаемое значение
     ----------------------
     float
-        Приближённое значение определённого интеграла.
+        Приближённое значение определённого интеграла
+        (``AdaptiveResult``, если задан `tol`).
 
     Ограничения
     -----------
-    - Метод использует только значения функции в левых концах отрезков,
-      поэтому для сильно меняющихся функций может потребоваться очень
-      большое `n_iter`.
+    - Формула по умолчанию использует только значения функции в левых
+      концах отрезков, поэтому для сильно меняющихся функций может
+      потребоваться очень большое `n_iter`; формулы высокого порядка
+      дают ту же точность при гораздо меньшем числе вычислений f.
     - Функция `f` должна быть определена и не иметь разрывов на всём
       отрезке интегрирования.
     - `n_iter` должен быть положительным; при нулевом или отрицательном
       значении возбуждается исключение ValueError.
+    - При ``n_iter`` порядка 10**9 используйте ``summation="kahan"``,
+      иначе ошибка округления сравнима с погрешностью формулы.
+    - Для `vectorized=True` требуется установленный numpy, иначе
+      возбуждается ImportError.
 
     Примеры
     -------
@@ -54,16 +194,320 @@ def integrate(f: object, a: float, b: float, *, n_iter: int = 100_000) -> float:
 
     >>> round(integrate(lambda x: x**2, 0.0, 1.0, n_iter=10_000), 3)
     0.333
+
+    Формула Симпсона точна для кубических многочленов:
+
+    >>> round(integrate(lambda x: x**3, 0.0, 2.0, n_iter=1, method="simpson"), 12)
+    4.0
     """
+    if tol is not None:
+        ignored = [
+            name
+            for name, value, default in (
+                ("method", method, "left"),
+                ("vectorized", vectorized, False),
+                ("chunk_size", chunk_size, DEFAULT_CHUNK_SIZE),
+                ("summation", summation, "naive"),
+            )
+            if value != default
+        ]
+        if ignored:
+            raise TypeError(f"tol cannot be combined with {', '.join(ignored)}")
+        return integrate_adaptive(f, a, b, tol=tol)
+
     if n_iter <= 0:
         raise ValueError("n_iter must be a positive integer")
 
-    acc: float = 0.0
+    rule = _resolve_rule(method)
+    if summation not in SUMMATIONS:
+        raise ValueError(
+            f"unknown summation {summation!r}, expected one of {sorted(SUMMATIONS)}"
+        )
     step: float = (b - a) / n_iter
-    for i in range(n_iter):
-        acc += f(a + i * step) * step
+
+    if vectorized:
+        if np is None:
+            raise ImportError("vectorized=True requires numpy")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer")
+        node_sum = partial(_node_sum_vectorized, f, a, step, summation, chunk_size)
+        try:
+            return _apply_rule(rule, node_sum, n_iter) * step
+        except _ScalarOnly:
+            pass
+
+    return _apply_rule(rule, partial(_node_sum, f, a, step, summation), n_iter) * step
+
+
+def compensated_sum(values: Iterable[float]) -> float:
+    """
+    Компенсированная сумма Неймайера (улучшенный алгоритм Кэхэна).
+
+    Складывает значения строго в порядке следования, накапливая потерянные
+    младшие разряды в отдельной поправке. Погрешность не растёт с числом
+    слагаемых, а результат воспроизводим при одинаковом порядке.
+
+    >>> compensated_sum([1.0, 1e100, 1.0, -1e100])
+    2.0
+    """
+    total: float = 0.0
+    comp: float = 0.0
+    for v in values:
+        t = total + v
+        if abs(total) >= abs(v):
+            comp += (total - t) + v
+        else:
+            comp += (v - t) + total
+        total = t
+    return total + comp
+
+
+def pairwise_sum(values: Iterable[float], block: int = 128) -> float:
+    """
+    Попарное (каскадное) суммирование за один проход.
+
+    Значения складываются блоками по `block` штук, суммы блоков
+    объединяются как в двоичном дереве, поэтому ошибка округления растёт
+    как O(log n), а память — O(log n) независимо от длины входа.
+
+    >>> abs(pairwise_sum([0.1] * 10**6) - 1e5) < 1e-9
+    True
+    """
+    # Стек частичных сумм (уровень, сумма): как разряды двоичного счётчика.
+    stack: list[tuple[int, float]] = []
+    acc: float = 0.0
+    count = 0
+    for v in values:
+        acc += v
+        count += 1
+        if count == block:
+            level = 0
+            while stack and stack[-1][0] == level:
+                acc += stack.pop()[1]
+                level += 1
+            stack.append((level, acc))
+            acc = 0.0
+            count = 0
+    while stack:
+        acc += stack.pop()[1]
+    return acc
+
+
+def _naive_sum(values: Iterable[float]) -> float:
+    acc: float = 0.0
+    for v in values:
+        acc += v
     return acc
 
-integral_value = integrate(math.cos, 0.0, math.pi, n_iter=1_000)
-print(integral_value)
+
+SUMMATIONS: dict[str, Callable[[Iterable[float]], float]] = {
+    "naive": _naive_sum,
+    "kahan": compensated_sum,
+    "pairwise": pairwise_sum,
+}
+
+
+class AdaptiveResult(NamedTuple):
+    """Результат адаптивного интегрирования."""
+
+    value: float
+    error: float
+    n_evals: int
+
+
+# Минимальная глубина дробления: без неё симметричные функции вроде sin
+# на [0, 2 * pi] дают нулевую оценку погрешности на первом же шаге.
+_ADAPTIVE_MIN_DEPTH: int = 2
+# Относительный уровень ошибки округления формулы Симпсона на части отрезка
+_ADAPTIVE_ROUNDOFF: float = 50 * 2.0 ** -52
+
+
+def integrate_adaptive(
+    f: object,
+    a: float,
+    b: float,
+    *,
+    tol: float = 1e-8,
+    max_depth: int = 50,
+    max_evals: int = 100_000,
+) -> AdaptiveResult:
+    """
+    Адаптивное интегрирование по формуле Симпсона с контролем погрешности.
+
+    Отрезок делится пополам только там, где разность между формулой Симпсона
+    на целой части и на двух половинах превышает допуск, пропорциональный
+    длине части. Гладкие участки остаются крупными, крутые — дробятся.
+
+    Параметры
+    ----------
+    f : object
+        Интегрируемая функция одной вещественной переменной.
+    a, b : float
+        Границы интегрирования.
+    tol : float, keyword-only
+        Допустимая абсолютная погрешность на всём отрезке [a, b].
+    max_depth : int, keyword-only
+        Максимальная глубина дробления. Части, достигшие её, принимаются
+        как есть, а их вклад входит в оценку погрешности.
+    max_evals : int, keyword-only
+        Бюджет вычислений f. После его исчерпания оставшиеся части больше
+        не дробятся (допускается перерасход на 2 вычисления на каждую
+        ожидающую часть), и error может оказаться больше tol.
+
+    Дробление прекращается и там, где оценка погрешности ниже ошибки
+    округления значения части (tol меньше достижимой точности), или
+    не конечна (f вернула nan/inf) — тогда nan/inf попадает в error.
+
+    Возвращаемое значение
+    ----------------------
+    AdaptiveResult
+        value — значение интеграла, error — оценка абсолютной погрешности,
+        n_evals — число вычислений f.
+
+    Примеры
+    -------
+    >>> import math
+    >>> res = integrate_adaptive(math.sin, 0.0, math.pi, tol=1e-10)
+    >>> round(res.value, 9), res.error < 1e-10
+    (2.0, True)
+    """
+    if tol <= 0:
+        raise ValueError("tol must be positive")
+    if max_depth < _ADAPTIVE_MIN_DEPTH:
+        raise ValueError(f"max_depth must be at least {_ADAPTIVE_MIN_DEPTH}")
+    if max_evals < 3:
+        raise ValueError("max_evals must be at least 3")
+
+    width = b - a
+    if width == 0:
+        return AdaptiveResult(0.0, 0.0, 0)
+
+    fa, fm, fb = f(a), f((a + b) / 2), f(b)
+    n_evals = 3
+    value: float = 0.0
+    error: float = 0.0
+
+    # Явный стек вместо рекурсии: (left, right, f(left), f(mid), f(right), S, depth)
+    stack = [(a, b, fa, fm, fb, width / 6 * (fa + 4 * fm + fb), 0)]
+    while stack:
+        left, right, fl, fm, fr, whole, depth = stack.pop()
+        mid = (left + right) / 2
+        h = right - left
+        flm = f(left + h / 4)
+        frm = f(right - h / 4)
+        n_evals += 2
+        s_left = h / 12 * (fl + 4 * flm + fm)
+        s_right = h / 12 * (fm + 4 * frm + fr)
+        delta = s_left + s_right - whole
+        local_err = abs(delta) / 15
+        local_tol = tol * abs(h / width)
+        # Ниже этого уровня разность формул — шум округления, дробить бессмысленно
+        roundoff = _ADAPTIVE_ROUNDOFF * (abs(s_left) + abs(s_right))
+
+        if depth >= _ADAPTIVE_MIN_DEPTH and (
+            local_err <= max(local_tol, roundoff)
+            or depth >= max_depth
+            or n_evals >= max_evals
+            or not math.isfinite(local_err)
+        ):
+            # Экстраполяция Ричардсона повышает порядок до O(h^6).
+            value += s_left + s_right + delta / 15
+            error += local_err
+        else:
+            stack.append((mid, right, fm, frm, fr, s_right, depth + 1))
+            stack.append((left, mid, fl, flm, fm, s_left, depth + 1))
+
+    return AdaptiveResult(value, error, n_evals)
+
+
+class _ScalarOnly(Exception):
+    """f не принимает массивы numpy — нужен поточечный цикл."""
+
+
+def _resolve_rule(method: str | QuadratureRule) -> QuadratureRule:
+    if isinstance(method, QuadratureRule):
+        return method
+    try:
+        return RULES[method]
+    except KeyError:
+        raise ValueError(
+            f"unknown method {method!r}, expected one of {sorted(RULES)}"
+        ) from None
+
+
+def _apply_rule(
+    rule: QuadratureRule,
+    node_sum: Callable[[float, int], float],
+    n_iter: int,
+) -> float:
+    """
+    Сумма sum_k w_k * sum_i f(a + (i + t_k) * step) без множителя step.
+
+    node_sum(offset, count) возвращает sum_{i < count} f(a + (i + offset) * step).
+    """
+    nodes, weights = rule
+    acc: float = 0.0
+    inner = range(len(nodes))
+    if len(nodes) > 1 and nodes[0] == 0.0 and nodes[-1] == 1.0:
+        # Закрытая формула: правый узел части i совпадает с левым узлом
+        # части i + 1, поэтому общие точки сетки вычисляются один раз.
+        w_first, w_last = weights[0], weights[-1]
+        acc += w_first * node_sum(0.0, 1) + w_last * node_sum(float(n_iter), 1)
+        if n_iter > 1:
+            acc += (w_first + w_last) * node_sum(1.0, n_iter - 1)
+        inner = range(1, len(nodes) - 1)
+    for k in inner:
+        acc += weights[k] * node_sum(nodes[k], n_iter)
+    return acc
+
+
+def _node_sum(
+    f: object, a: float, step: float, summation: str, offset: float, count: int
+) -> float:
+    if summation == "naive":
+        acc: float = 0.0
+        for i in range(count):
+            acc += f(a + (i + offset) * step)
+        return acc
+    return SUMMATIONS[summation](f(a + (i + offset) * step) for i in range(count))
+
+
+def _node_sum_vectorized(
+    f: object,
+    a: float,
+    step: float,
+    summation: str,
+    chunk_size: int,
+    offset: float,
+    count: int,
+) -> float:
+    """
+    Векторизованная версия _node_sum.
+
+    Узлы строятся блоками по `chunk_size` точек, значения f на блоке
+    суммируются одной редукцией numpy. Если f не принимает массивы,
+    на первом блоке возбуждается _ScalarOnly.
+    """
+    partials: list[float] = []
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        x = np.arange(start, stop, dtype=np.float64)
+        x += offset
+        x *= step
+        x += a
+        try:
+            y = f(x)
+        except (TypeError, ValueError):
+            if start == 0:
+                raise _ScalarOnly from None
+            raise
+        # f может вернуть скаляр (например, lambda x: 1.0) — растягиваем
+        # его на весь блок, чтобы не потерять слагаемые.
+        partials.append(float(np.sum(np.broadcast_to(y, x.shape))))
+    return SUMMATIONS[summation](partials)
+
+
+if __name__ == "__main__":
+    integral_value = integrate(math.cos, 0.0, math.pi, n_iter=1_000)
+    print(integral_value)
 
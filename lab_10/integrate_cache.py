@@ -0,0 +1,269 @@
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import types
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from integrate import integrate
+from concurrent_integrate import integrate_async, integrate_process
+
+
+class CacheInfo(NamedTuple):
+    """Счётчики кэша для мониторинга (по образцу functools.lru_cache)."""
+
+    hits: int
+    disk_hits: int
+    misses: int
+    uncacheable: int
+    currsize: int
+    maxsize: int
+
+
+def function_key(f) -> str | None:
+    """
+    Стабильный идентификатор функции f или None, если его нельзя построить.
+
+    Для встроенных функций и ufunc numpy — модуль и имя. Для Python-функций
+    к имени добавляется хеш байткода, констант, значений по умолчанию,
+    замыкания и глобальных переменных, которые функция читает, поэтому
+    изменённая или по-другому замкнутая лямбда получает другой ключ.
+    Глобальные переменные допускаются только модули, функции со стабильным
+    ключом и числа/строки. Связанные методы объектов, а также замыкания
+    и глобальные переменные с объектами без стабильного представления
+    (массивы, списки, экземпляры классов) дают None: их изменение
+    не отразилось бы в ключе, и кэш вернул бы устаревший результат.
+    """
+    if isinstance(f, functools.partial):
+        inner = function_key(f.func)
+        if inner is None:
+            return None
+        return _stable(("partial", inner, f.args, sorted(f.keywords.items())))
+
+    owner = getattr(f, "__self__", None)
+    if owner is not None and not isinstance(owner, types.ModuleType):
+        return None  # связанный метод: результат зависит от состояния объекта
+
+    module = getattr(f, "__module__", None) or type(f).__module__
+    qualname = getattr(f, "__qualname__", None) or getattr(f, "__name__", None)
+    if qualname is None:
+        return None
+    name = f"{module}.{qualname}"
+
+    code = getattr(f, "__code__", None)
+    if code is None:
+        return name  # builtin_function_or_method, numpy.ufunc и т.п.
+
+    try:
+        closure = tuple(cell.cell_contents for cell in (f.__closure__ or ()))
+    except ValueError:  # пустая ячейка замыкания
+        return None
+    scope = getattr(f, "__globals__", {})
+    global_values = {}
+    for g in _global_names(code):
+        if g not in scope:
+            continue  # имя атрибута или встроенная функция
+        value = scope[g]
+        if isinstance(value, types.ModuleType):
+            global_values[g] = {"module": value.__name__}
+        elif value is f:
+            global_values[g] = {"self": name}  # рекурсивная функция
+        elif value is None or isinstance(value, (bool, int, float, str)) or callable(value):
+            global_values[g] = value  # функции проверяет _stable через function_key
+        else:
+            return None
+    payload = _stable(
+        (
+            code.co_code,
+            code.co_consts,
+            code.co_names,
+            f.__defaults__,
+            f.__kwdefaults__,
+            closure,
+            global_values,
+        )
+    )
+    if payload is None:
+        return None
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    return f"{name}#{digest}"
+
+
+class IntegralCache:
+    """
+    LRU-кэш результатов интегрирования с необязательным хранилищем на диске.
+
+    Ключ — функция (см. function_key), имя вызываемой функции и все
+    аргументы. В памяти хранится не больше maxsize значений; при path
+    результаты дополнительно пишутся в SQLite и переживают перезапуск.
+    Вызовы с функцией без стабильного ключа выполняются без кэша
+    и учитываются в счётчике uncacheable.
+
+    >>> cache = IntegralCache(maxsize=2)
+    >>> cached = cache.cached(integrate)
+    >>> import math
+    >>> cached(math.sin, 0.0, math.pi, n_iter=1000) == cached(math.sin, 0.0, math.pi, n_iter=1000)
+    True
+    >>> cache.info().hits, cache.info().misses
+    (1, 1)
+    """
+
+    def __init__(self, maxsize: int = 1024, path: str | Path | None = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self._maxsize = maxsize
+        self._data: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._disk_hits = self._misses = self._uncacheable = 0
+        self._conn: sqlite3.Connection | None = None
+        if path is not None:
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS integral_cache (key TEXT PRIMARY KEY, value REAL)"
+            )
+            self._conn.commit()
+
+    def cached(self, func: Callable[..., float]) -> Callable[..., float]:
+        """Оборачивает функцию интегрирования вида func(f, a, b, **kwargs)."""
+
+        @functools.wraps(func)
+        def wrapper(f, a: float, b: float, **kwargs) -> float:
+            key = self._make_key(func, f, a, b, kwargs)
+            if key is None:
+                with self._lock:
+                    self._uncacheable += 1
+                return func(f, a, b, **kwargs)
+            found, value = self._lookup(key)
+            if found:
+                return value
+            value = func(f, a, b, **kwargs)
+            self._store(key, value)
+            return value
+
+        wrapper.cache = self
+        return wrapper
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._disk_hits,
+                self._misses,
+                self._uncacheable,
+                len(self._data),
+                self._maxsize,
+            )
+
+    def clear(self) -> None:
+        """Очищает кэш в памяти и на диске и обнуляет счётчики."""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._disk_hits = self._misses = self._uncacheable = 0
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM integral_cache")
+                self._conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _make_key(self, func, f, a, b, kwargs) -> str | None:
+        f_key = function_key(f)
+        if f_key is None:
+            return None
+        params = _stable((float(a), float(b), sorted(kwargs.items())))
+        if params is None:
+            return None
+        return f"{func.__module__}.{func.__qualname__}|{f_key}|{params}"
+
+    def _lookup(self, key: str) -> tuple[bool, float | None]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return True, self._data[key]
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value FROM integral_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._disk_hits += 1
+                    self._put_memory(key, row[0])
+                    return True, row[0]
+            self._misses += 1
+            return False, None
+
+    def _store(self, key: str, value: float) -> None:
+        with self._lock:
+            self._put_memory(key, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO integral_cache(key, value) VALUES (?, ?)",
+                    (key, value),
+                )
+                self._conn.commit()
+
+    def _put_memory(self, key: str, value: float) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+
+def _global_names(code) -> set[str]:
+    """Имена, которые читает code и вложенные в него функции и лямбды."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            names |= _global_names(const)
+    return names
+
+
+def _stable(obj) -> str | None:
+    """
+    Детерминированное текстовое представление obj или None.
+
+    Допускаются числа, строки, байты, None, кортежи, списки, словари
+    и функции со стабильным ключом; для всего остального — None.
+    """
+    try:
+        return json.dumps(_to_json(obj), sort_keys=True, ensure_ascii=False)
+    except (_Unstable, RecursionError):  # RecursionError — рекурсивное замыкание
+        return None
+
+
+class _Unstable(Exception):
+    pass
+
+
+def _to_json(obj):
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    if isinstance(obj, float):
+        return repr(obj)  # различает 0.1 и 0.1000000001, а также nan/inf
+    if isinstance(obj, bytes):
+        return {"bytes": obj.hex()}
+    if isinstance(obj, (tuple, list)):
+        return [_to_json(item) for item in obj]
+    if isinstance(obj, dict):
+        return {str(k): _to_json(v) for k, v in obj.items()}
+    if hasattr(obj, "co_code"):  # вложенный code object (лямбда внутри функции)
+        return [obj.co_code.hex(), _to_json(obj.co_consts), list(obj.co_names)]
+    if callable(obj):
+        key = function_key(obj)
+        if key is None:
+            raise _Unstable
+        return {"function": key}
+    raise _Unstable
+
+
+# Общий кэш по умолчанию и готовые обёртки. Включаются явным использованием:
+# from integrate_cache import cached_integrate.
+default_cache = IntegralCache()
+cached_integrate = default_cache.cached(integrate)
+cached_integrate_async = default_cache.cached(integrate_async)
+cached_integrate_process = default_cache.cached(integrate_process)
@@ -0,0 +1,264 @@
+import math
+from typing import NamedTuple, Sequence
+
+from integrate import (
+    DEFAULT_CHUNK_SIZE,
+    QuadratureRule,
+    _resolve_rule,
+    compensated_sum,
+    np,
+)
+from concurrent_integrate import Integrator
+
+try:
+    from scipy.stats import qmc
+except ImportError:  # scipy нужен только для квази-Монте-Карло (Соболь)
+    qmc = None
+
+
+Bounds = Sequence[tuple[float, float]]
+
+
+def integrate_nd(
+    f,
+    bounds: Bounds,
+    *,
+    n_iter: int | Sequence[int] = 100,
+    method: str | QuadratureRule = "gauss",
+    n_jobs: int = 1,
+    integrator: Integrator | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> float:
+    """
+    Интеграл по прямоугольнику (2D/3D/...) тензорным произведением формул.
+
+    Параметры
+    ----------
+    f : object
+        Векторизованная функция d переменных: f(x, y[, z, ...]) принимает
+        массивы numpy одной длины и возвращает массив той же длины.
+    bounds : последовательность пар (a, b)
+        Границы по каждой оси, например [(0, 1), (0, math.pi)].
+    n_iter : int или последовательность int, keyword-only
+        Число частей разбиения по каждой оси (одно на все оси или своё).
+    method : str или QuadratureRule, keyword-only
+        Одномерная формула из integrate.RULES, применяемая по каждой оси.
+    n_jobs : int, keyword-only
+        Число процессов. Сетка делится по первой оси; f должна
+        сериализоваться pickle. При n_jobs=1 всё считается в текущем процессе.
+    integrator : Integrator или None, keyword-only
+        Готовый пул для частей; иначе при n_jobs > 1 создаётся временный.
+    chunk_size : int, keyword-only
+        Примерное число точек сетки на один вызов f.
+
+    Примеры
+    -------
+    >>> import numpy as np
+    >>> round(integrate_nd(lambda x, y: x * y, [(0, 1), (0, 2)], n_iter=4), 12)
+    1.0
+    """
+    _require_numpy()
+    dims = len(bounds)
+    if dims == 0:
+        raise ValueError("bounds must not be empty")
+    n_iters = [n_iter] * dims if isinstance(n_iter, int) else list(n_iter)
+    if len(n_iters) != dims or any(n <= 0 for n in n_iters):
+        raise ValueError("n_iter must be positive for every axis")
+
+    rule = _resolve_rule(method)
+    axes = [_axis_nodes(rule, a, b, n) for (a, b), n in zip(bounds, n_iters)]
+
+    n_first = len(axes[0][0])
+    n_parts = min(max(1, n_jobs if integrator is None else integrator.max_workers), n_first)
+    edges = [k * n_first // n_parts for k in range(n_parts + 1)]
+    parts = list(zip(edges, edges[1:]))
+
+    if n_parts == 1:
+        return _tensor_block(f, axes, 0, n_first, chunk_size)
+
+    def run(pool: Integrator) -> float:
+        futures = [
+            pool.executor.submit(_tensor_block, f, axes, start, stop, chunk_size)
+            for start, stop in parts
+        ]
+        return compensated_sum(fut.result() for fut in futures)
+
+    if integrator is not None:
+        return run(integrator)
+    with Integrator("process", max_workers=n_parts) as pool:
+        return run(pool)
+
+
+class MonteCarloResult(NamedTuple):
+    """Результат (квази-)Монте-Карло: значение, стандартная ошибка, число точек."""
+
+    value: float
+    error: float
+    n_samples: int
+
+
+def integrate_mc(
+    f,
+    bounds: Bounds,
+    *,
+    n_samples: int = 1 << 16,
+    qmc_sobol: bool = True,
+    n_replicas: int = 8,
+    seed: int | None = None,
+    n_jobs: int = 1,
+    integrator: Integrator | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> MonteCarloResult:
+    """
+    Интеграл по прямоугольнику любой размерности методом Монте-Карло.
+
+    При qmc_sobol=True используется квази-Монте-Карло: n_replicas
+    независимо скремблированных последовательностей Соболя по
+    n_samples / n_replicas точек (нужен scipy). Значение — среднее по
+    репликам, ошибка — их стандартное отклонение / sqrt(n_replicas).
+    Для равномерных псевдослучайных точек (qmc_sobol=False) ошибка —
+    обычная sigma / sqrt(n).
+
+    Точки в обоих режимах делятся на n_replicas независимых блоков,
+    которые при n_jobs > 1 раздаются по процессам, как в integrate_nd.
+    Потоки случайных чисел блоков порождаются из seed через
+    numpy.random.SeedSequence, поэтому результат при заданном seed
+    не зависит от n_jobs.
+
+    >>> import numpy as np
+    >>> res = integrate_mc(lambda x, y: x + y, [(0, 1), (0, 1)], n_samples=1 << 12, seed=1)
+    >>> abs(res.value - 1.0) < 1e-3
+    True
+    """
+    _require_numpy()
+    if qmc_sobol and qmc is None:
+        raise ImportError("qmc_sobol=True requires scipy")
+    dims = len(bounds)
+    if dims == 0:
+        raise ValueError("bounds must not be empty")
+    if n_samples <= 0 or n_replicas <= 0:
+        raise ValueError("n_samples and n_replicas must be positive")
+
+    lower = np.array([a for a, _ in bounds], dtype=np.float64)
+    upper = np.array([b for _, b in bounds], dtype=np.float64)
+    volume = float(np.prod(upper - lower))
+
+    sizes = [
+        (k + 1) * n_samples // n_replicas - k * n_samples // n_replicas
+        for k in range(n_replicas)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(n_replicas)
+    tasks = [
+        (f, lower, upper, size, block_seed, qmc_sobol, chunk_size)
+        for size, block_seed in zip(sizes, seeds)
+        if size > 0
+    ]
+
+    n_workers = n_jobs if integrator is None else integrator.max_workers
+    if n_workers <= 1 or len(tasks) == 1:
+        stats = [_mc_block(*task) for task in tasks]
+    elif integrator is not None:
+        stats = [fut.result() for fut in [integrator.executor.submit(_mc_block, *t) for t in tasks]]
+    else:
+        with Integrator("process", max_workers=min(n_workers, len(tasks))) as pool:
+            stats = [fut.result() for fut in [pool.executor.submit(_mc_block, *t) for t in tasks]]
+
+    total = sum(count for _, _, count in stats)
+    value = compensated_sum(s for s, _, _ in stats) / total
+    if qmc_sobol:
+        means = [s / count for s, _, count in stats]
+        if len(means) > 1:
+            spread = math.sqrt(
+                compensated_sum((m - value) ** 2 for m in means) / (len(means) - 1)
+            )
+            error = spread / math.sqrt(len(means))
+        else:
+            error = math.inf
+    else:
+        second = compensated_sum(sq for _, sq, _ in stats) / total
+        variance = max(second - value * value, 0.0) * total / max(total - 1, 1)
+        error = math.sqrt(variance / total)
+
+    return MonteCarloResult(value * volume, error * volume, total)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("multidimensional integration requires numpy")
+
+
+def _axis_nodes(rule: QuadratureRule, a: float, b: float, n_iter: int):
+    """
+    Узлы и веса составной формулы на [a, b] как массивы numpy.
+
+    У закрытых формул общий узел соседних частей входит один раз с суммой весов.
+    """
+    step = (b - a) / n_iter
+    t = np.asarray(rule.nodes, dtype=np.float64)
+    w = np.asarray(rule.weights, dtype=np.float64)
+    panels = np.arange(n_iter, dtype=np.float64)[:, None]
+    x = a + (panels + t) * step
+    weights = np.broadcast_to(w * step, x.shape).copy()
+
+    if len(t) > 1 and t[0] == 0.0 and t[-1] == 1.0:
+        # Правый узел части i совпадает с левым узлом части i + 1.
+        weights[1:, 0] += weights[:-1, -1]
+        x = np.concatenate([x[:, :-1].ravel(), [b]])
+        weights = np.concatenate([weights[:, :-1].ravel(), [weights[-1, -1]]])
+        return x, weights
+    return x.ravel(), weights.ravel()
+
+
+def _tensor_block(f, axes, start: int, stop: int, chunk_size: int) -> float:
+    """Сумма w * f по строкам [start, stop) первой оси тензорной сетки."""
+    (x0, w0), rest = axes[0], axes[1:]
+    if rest:
+        grids = np.meshgrid(*(x for x, _ in rest), indexing="ij")
+        rest_x = [g.ravel() for g in grids]
+        rest_w = np.ones(1)
+        for _, w in rest:
+            rest_w = np.multiply.outer(rest_w, w)
+        rest_w = rest_w.ravel()
+    else:
+        rest_x, rest_w = [], np.ones(1)
+
+    rows_per_chunk = max(1, chunk_size // len(rest_w))
+    partials: list[float] = []
+    for lo in range(start, stop, rows_per_chunk):
+        hi = min(lo + rows_per_chunk, stop)
+        rows = hi - lo
+        coords = [np.repeat(x0[lo:hi], len(rest_w))] + [np.tile(x, rows) for x in rest_x]
+        weights = np.repeat(w0[lo:hi], len(rest_w)) * np.tile(rest_w, rows)
+        y = np.broadcast_to(f(*coords), weights.shape)
+        partials.append(float(np.dot(y, weights)))
+    return compensated_sum(partials)
+
+
+def _mc_block(f, lower, upper, size: int, seed, sobol: bool, chunk_size: int):
+    """Сумма, сумма квадратов и число значений f в size точках блока."""
+    dims = len(lower)
+    if sobol:
+        sampler = qmc.Sobol(d=dims, scramble=True, seed=np.random.default_rng(seed))
+        draw = sampler.random
+    else:
+        rng = np.random.default_rng(seed)
+        draw = lambda m: rng.random((m, dims))
+
+    total: list[float] = []
+    total_sq: list[float] = []
+    for lo in range(0, size, chunk_size):
+        m = min(chunk_size, size - lo)
+        points = lower + draw(m) * (upper - lower)
+        y = np.broadcast_to(f(*points.T), (m,))
+        total.append(float(np.sum(y)))
+        total_sq.append(float(np.dot(y, y)))
+    return compensated_sum(total), compensated_sum(total_sq), size
+
+
+if __name__ == "__main__":
+    gauss_2d = integrate_nd(lambda x, y: np.sin(x) * np.sin(y), [(0, math.pi), (0, math.pi)],
+                            n_iter=20)
+    print("2D Гаусс, sin(x) sin(y) на [0, pi]^2 (точно 4):", gauss_2d)
+    ball = integrate_mc(lambda *xs: (sum(x * x for x in xs) <= 1.0).astype(float),
+                        [(-1, 1)] * 6, n_samples=1 << 18, seed=0)
+    print("Объём 6-мерного шара (точно pi^3/6 = %.6f):" % (math.pi**3 / 6), ball)
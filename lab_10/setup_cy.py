@@ -1,12 +1,29 @@
+import sys
+
 from setuptools import Extension, setup
 from Cython.Build import cythonize
 
+# prange в cy_integrate_nogil требует OpenMP. Apple clang по умолчанию
+# OpenMP не поддерживает — там модуль собирается без него и prange
+# выполняется в одном потоке.
+if sys.platform == "win32":
+    openmp_compile_args, openmp_link_args = ["/openmp"], []
+elif sys.platform == "darwin":
+    openmp_compile_args, openmp_link_args = [], []
+else:
+    openmp_compile_args, openmp_link_args = ["-fopenmp"], ["-fopenmp"]
+
 extensions = [
     Extension("cy_integrate", ["cy_integrate.pyx"]),
-    Extension("cy_integrate_nogil", ["cy_integrate_nogil.pyx"]),
+    Extension(
+        "cy_integrate_nogil",
+        ["cy_integrate_nogil.pyx"],
+        extra_compile_args=openmp_compile_args,
+        extra_link_args=openmp_link_args,
+    ),
 ]
 
 setup(
     name="cy_integrate_all",
     ext_modules=cythonize(extensions, annotate=True, language_level=3),
-)
\ No newline at end of file
+)
@@ -1,7 +1,43 @@
+import asyncio
+import concurrent.futures as ftres
+import contextlib
+import io
 import math
+import subprocess
+import sys
+import tempfile
+import time
 import unittest
+from pathlib import Path
+from unittest import mock
 
-from integrate import integrate
+try:
+    from cy_integrate_nogil import integrate_builtin, integrate_fast, integrate_nogil
+except ImportError:  # расширение не собрано (python setup_cy.py build_ext --inplace)
+    integrate_nogil = None
+
+from auto_integrate import calibrate, choose_backend, integrate_auto
+from bench_suite import compare, measure
+from integrate_cache import IntegralCache, function_key
+from multidim_integrate import integrate_mc, integrate_nd, qmc
+from concurrent_integrate import (
+    CHUNKS_PER_JOB,
+    Integrator,
+    integrate_aio,
+    integrate_async,
+    integrate_many,
+    integrate_process,
+)
+from integrate import (
+    AdaptiveResult,
+    compensated_sum,
+    gauss_legendre,
+    integrate,
+    integrate_adaptive,
+    np,
+    register_rule,
+    RULES,
+)
 
 
 class TestIntegrate(unittest.TestCase):
@@ -22,5 +58,562 @@ class TestIntegrate(unittest.TestCase):
         self.assertAlmostEqual(res_coarse, res_fine, places=2)
 
 
+class TestQuadratureRules(unittest.TestCase):
+    def test_rules_exact_for_polynomials(self) -> None:
+        """Каждая формула точна для многочленов своей степени на одной части."""
+        cases = {
+            "midpoint": (lambda x: 3 * x + 1, 1),
+            "trapezoid": (lambda x: 3 * x + 1, 1),
+            "simpson": (lambda x: x**3 - x, 3),
+            "gauss": (lambda x: x**5 + x**2, 5),
+        }
+        for method, (f, degree) in cases.items():
+            with self.subTest(method=method, degree=degree):
+                expected = integrate(f, 0.0, 2.0, n_iter=200_000, method="simpson")
+                result = integrate(f, 0.0, 2.0, n_iter=1, method=method)
+                self.assertAlmostEqual(result, expected, places=10)
+
+    def test_higher_order_needs_fewer_points(self) -> None:
+        """Симпсону и Гауссу для 3 знаков sin хватает в 100+ раз меньше точек."""
+        for method in ("simpson", "gauss"):
+            with self.subTest(method=method):
+                result = integrate(math.sin, 0.0, math.pi, n_iter=20, method=method)
+                self.assertAlmostEqual(result, 2.0, places=4)
+
+    def test_gauss_legendre_weights(self) -> None:
+        """Веса формулы Гаусса–Лежандра на [0, 1] положительны и дают в сумме 1."""
+        rule = gauss_legendre(7)
+        self.assertEqual(len(rule.nodes), 7)
+        self.assertAlmostEqual(math.fsum(rule.weights), 1.0, places=14)
+        self.assertTrue(all(w > 0 for w in rule.weights))
+        result = integrate(lambda x: x**13, 0.0, 1.0, n_iter=1, method=rule)
+        self.assertAlmostEqual(result, 1 / 14, places=13)
+
+    def test_register_rule(self) -> None:
+        """Зарегистрированная формула доступна по имени."""
+        register_rule("simpson38", (0.0, 1 / 3, 2 / 3, 1.0), (1 / 8, 3 / 8, 3 / 8, 1 / 8))
+        self.addCleanup(RULES.pop, "simpson38")
+        result = integrate(lambda x: x**3, 0.0, 1.0, n_iter=1, method="simpson38")
+        self.assertAlmostEqual(result, 0.25, places=14)
+
+    def test_compensated_summation_modes(self) -> None:
+        """kahan и pairwise накапливают меньшую ошибку округления, чем naive."""
+        f = lambda x: 0.1
+        errors = {
+            summation: abs(integrate(f, 0.0, 1.0, n_iter=1_000_000, summation=summation) - 0.1)
+            for summation in ("naive", "kahan", "pairwise")
+        }
+        self.assertLess(errors["kahan"], 1e-16)
+        self.assertLess(errors["pairwise"], errors["naive"])
+        with self.assertRaises(ValueError):
+            integrate(f, 0.0, 1.0, n_iter=10, summation="fast")
+
+    def test_unknown_method(self) -> None:
+        """Неизвестное имя формулы — ValueError."""
+        with self.assertRaises(ValueError):
+            integrate(math.sin, 0.0, 1.0, n_iter=10, method="romberg")
+
+
+class TestIntegrateAdaptive(unittest.TestCase):
+    def test_reaches_tolerance(self) -> None:
+        """Фактическая погрешность и её оценка не превышают tol."""
+        res = integrate_adaptive(math.sin, 0.0, math.pi, tol=1e-9)
+        self.assertLess(abs(res.value - 2.0), 1e-9)
+        self.assertLessEqual(res.error, 1e-9)
+
+    def test_fewer_evaluations_on_peaked_integrand(self) -> None:
+        """Узкий пик: адаптивный режим тратит на порядки меньше вычислений f."""
+        calls = 0
+
+        def f(x: float) -> float:
+            nonlocal calls
+            calls += 1
+            return math.exp(-1e4 * x * x)
+
+        res = integrate_adaptive(f, -1.0, 1.0, tol=1e-8)
+        self.assertEqual(res.n_evals, calls)
+        self.assertAlmostEqual(res.value, math.sqrt(math.pi) / 100, places=8)
+        self.assertLess(res.n_evals, 2_000)
+
+    def test_tol_keyword(self) -> None:
+        """integrate(tol=...) и integrate_async(tol=...) возвращают AdaptiveResult."""
+        res = integrate(math.sin, 0.0, math.pi, tol=1e-10)
+        self.assertEqual(res, integrate_adaptive(math.sin, 0.0, math.pi, tol=1e-10))
+        self.assertAlmostEqual(res.value, 2.0, places=9)
+
+        result = integrate_async(math.sin, 0.0, math.pi, n_jobs=2, n_chunks=4, tol=1e-10)
+        parts = [integrate_adaptive(math.sin, k * math.pi / 4, (k + 1) * math.pi / 4,
+                                    tol=1e-10 / 4) for k in range(4)]
+        self.assertIsInstance(result, AdaptiveResult)
+        self.assertAlmostEqual(result.value, 2.0, places=9)
+        self.assertEqual(result.n_evals, sum(p.n_evals for p in parts))
+        self.assertAlmostEqual(result.error, math.fsum(p.error for p in parts))
+
+        shared = integrate_process(math.sin, 0.0, math.pi, n_jobs=2, n_chunks=4, tol=1e-10,
+                                   shared_memory=True)
+        self.assertEqual(shared.n_evals, result.n_evals)
+        self.assertAlmostEqual(shared.value, result.value, places=14)
+
+    def test_tol_rejects_ignored_options(self) -> None:
+        """tol вместе с method, vectorized, chunk_size или summation — TypeError."""
+        for option in ({"method": "simpson"}, {"vectorized": True}, {"chunk_size": 10},
+                       {"summation": "kahan"}):
+            with self.subTest(**option):
+                with self.assertRaises(TypeError):
+                    integrate(math.sin, 0.0, 1.0, tol=1e-8, **option)
+
+    def test_invalid_tol(self) -> None:
+        """Неположительный tol — ValueError."""
+        with self.assertRaises(ValueError):
+            integrate_adaptive(math.sin, 0.0, 1.0, tol=0.0)
+
+    def test_unreachable_tol_and_nan_stop(self) -> None:
+        """tol ниже округления, nan от f и бюджет max_evals не дают дробить до max_depth."""
+        res = integrate_adaptive(math.sin, 0.0, math.pi, tol=1e-17)
+        self.assertAlmostEqual(res.value, 2.0, places=12)
+        self.assertLess(res.n_evals, 100_000)
+
+        res = integrate_adaptive(lambda x: math.nan, 0.0, 1.0)
+        self.assertTrue(math.isnan(res.error))
+        self.assertLess(res.n_evals, 100)
+
+        res = integrate_adaptive(lambda x: math.sin(1 / x) if x else 0.0, 0.0, 1.0,
+                                 tol=1e-14, max_evals=1_000)
+        self.assertLess(res.n_evals, 1_000 + 4 * 50)
+        self.assertGreater(res.error, 1e-14)
+
+
+class TestIntegrator(unittest.TestCase):
+    def test_pool_is_reused(self) -> None:
+        """Один пул обслуживает несколько вызовов и закрывается на выходе."""
+        with Integrator("process", max_workers=2) as integrator:
+            executor = integrator.executor
+            first = integrator.integrate(math.sin, 0.0, math.pi, n_iter=20_000)
+            second = integrator.integrate(math.cos, 0.0, math.pi / 2, n_iter=20_000)
+            self.assertIs(integrator.executor, executor)
+        self.assertAlmostEqual(first, 2.0, places=3)
+        self.assertAlmostEqual(second, 1.0, places=3)
+        with self.assertRaises(RuntimeError):
+            executor.submit(math.sin, 0.0)
+
+    def test_integrate_many_keeps_order(self) -> None:
+        """integrate_many возвращает результаты в порядке задач."""
+        jobs = [(math.sin, 0.0, k * math.pi / 8) for k in range(1, 17)]
+        expected = [1.0 - math.cos(b) for _, _, b in jobs]
+        results = integrate_many(jobs, n_iter=50, method="gauss", max_workers=2)
+        for got, want in zip(results, expected):
+            self.assertAlmostEqual(got, want, places=8)
+
+    def test_integrate_many_stream_on_shared_pool(self) -> None:
+        """stream=True выдаёт генератор и может работать на пуле Integrator."""
+        jobs = [(math.cos, 0.0, b) for b in (0.5, 1.0, 1.5)]
+        with Integrator("thread", max_workers=2) as integrator:
+            stream = integrate_many(jobs, n_iter=20, method="simpson",
+                                    stream=True, integrator=integrator)
+            self.assertNotIsInstance(stream, list)
+            results = list(stream)
+        self.assertEqual(len(results), 3)
+        for got, (_, _, b) in zip(results, jobs):
+            self.assertAlmostEqual(got, math.sin(b), places=6)
+
+    def test_shared_memory_reduction_is_reproducible(self) -> None:
+        """Свёртка через общую память даёт побитово одинаковый результат."""
+        results = {
+            integrate_process(math.sin, 0.0, math.pi, n_jobs=4, n_iter=40_000,
+                              shared_memory=True)
+            for _ in range(3)
+        }
+        self.assertEqual(len(results), 1)
+        self.assertAlmostEqual(results.pop(), 2.0, places=3)
+
+    def test_shared_memory_failure_waits_for_chunks(self) -> None:
+        """При ошибке части блок удаляется после остальных частей, а не раньше."""
+        done = []
+
+        def f(x):
+            if x == 0.0:
+                raise ZeroDivisionError
+            time.sleep(0.2)
+            done.append(x)
+            return x
+
+        with Integrator("thread", max_workers=2) as integrator:
+            with self.assertRaises(ZeroDivisionError):
+                integrator.integrate(f, 0.0, 1.0, n_iter=4, n_chunks=4, shared_memory=True)
+            finished = list(done)
+            time.sleep(0.3)
+            # после возврата ни одна часть уже не выполняется
+            self.assertIn(0.25, finished)
+            self.assertEqual(done, finished)
+
+    def test_shared_memory_no_tracker_warnings(self) -> None:
+        """Пул, созданный до трекера ресурсов, не оставляет «утечек» при выходе."""
+        script = (
+            "import math\n"
+            "from concurrent_integrate import Integrator\n"
+            "if __name__ == '__main__':\n"
+            "    with Integrator('process', max_workers=2) as integrator:\n"
+            "        integrator.integrate(math.sin, 0.0, math.pi, n_iter=1_000)\n"
+            "        for _ in range(2):\n"
+            "            integrator.integrate(math.sin, 0.0, math.pi, n_iter=1_000,\n"
+            "                                 shared_memory=True)\n"
+        )
+        proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, timeout=60)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stderr, "")
+
+    def test_compensated_sum(self) -> None:
+        """Компенсированная сумма не теряет малые слагаемые."""
+        self.assertEqual(compensated_sum([1.0, 1e100, 1.0, -1e100]), 2.0)
+        self.assertEqual(compensated_sum([0.1] * 10), 1.0)
+
+    def test_no_output_by_default(self) -> None:
+        """Без настройки журнала параллельные функции ничего не печатают."""
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            integrate_async(math.sin, 0.0, math.pi, n_jobs=2, n_iter=1_000)
+        self.assertEqual(buf.getvalue(), "")
+
+    def test_debug_log_per_chunk(self) -> None:
+        """На уровне DEBUG каждая часть пишет границы, время и работника."""
+        for shared in (False, True):
+            with self.subTest(shared_memory=shared):
+                with self.assertLogs("concurrent_integrate", level="DEBUG") as logs:
+                    with Integrator("process", max_workers=2) as integrator:
+                        result = integrator.integrate(
+                            math.sin, 0.0, math.pi, n_iter=2_000, shared_memory=shared,
+                            n_chunks=2,
+                        )
+                self.assertAlmostEqual(result, 2.0, places=3)
+                self.assertEqual(len(logs.records), 2)
+                self.assertIn("часть 0 [0.0,", logs.output[0] + logs.output[1])
+
+    def test_chunks_keep_every_point(self) -> None:
+        """Остаток n_iter % n_chunks не теряется: результат как у integrate()."""
+        f = lambda x: x * x
+        expected = integrate(f, 0.0, 1.0, n_iter=1_001)
+        for n_chunks in (None, 3, 7, 5_000):
+            with self.subTest(n_chunks=n_chunks):
+                result = integrate_async(f, 0.0, 1.0, n_jobs=3, n_iter=1_001, n_chunks=n_chunks)
+                self.assertAlmostEqual(result, expected, places=13)
+        shared = integrate_process(math.sin, 0.0, math.pi, n_jobs=2, n_iter=1_001,
+                                   shared_memory=True, n_chunks=5_000)
+        self.assertAlmostEqual(shared, integrate(math.sin, 0.0, math.pi, n_iter=1_001), places=13)
+
+    def test_many_chunks_are_dispatched(self) -> None:
+        """По умолчанию частей в CHUNKS_PER_JOB раз больше, чем работников."""
+        with self.assertLogs("concurrent_integrate", level="DEBUG") as logs:
+            integrate_async(math.sin, 0.0, math.pi, n_jobs=2, n_iter=1_000)
+        self.assertEqual(len(logs.records), 2 * CHUNKS_PER_JOB)
+        with self.assertRaises(ValueError):
+            integrate_async(math.sin, 0.0, math.pi, n_jobs=2, n_chunks=0)
+
+    def test_unknown_kind(self) -> None:
+        """Неизвестный тип пула — ValueError."""
+        with self.assertRaises(ValueError):
+            Integrator("fiber")
+
+
+class TestIntegrateAio(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_pool(self) -> None:
+        """Много одновременных вызовов на одном ограниченном пуле."""
+        with Integrator("thread", max_workers=2) as integrator:
+            results = await asyncio.gather(
+                *(
+                    integrate_aio(math.cos, 0.0, b, n_jobs=3, n_iter=3_000,
+                                  executor=integrator)
+                    for b in (0.5, 1.0, 1.5)
+                )
+            )
+        for got, b in zip(results, (0.5, 1.0, 1.5)):
+            self.assertAlmostEqual(got, math.sin(b), places=3)
+
+    async def test_timeout_cancels_pending_parts(self) -> None:
+        """По таймауту части, не взятые пулом, не выполняются."""
+        calls = 0
+
+        def slow(x: float) -> float:
+            nonlocal calls
+            calls += 1
+            time.sleep(0.001)
+            return 1.0
+
+        executor = ftres.ThreadPoolExecutor(max_workers=1)
+        with self.assertRaises(asyncio.TimeoutError):
+            await integrate_aio(slow, 0.0, 1.0, n_jobs=4, n_iter=400,
+                                executor=executor, timeout=0.02)
+        executor.shutdown(wait=True)
+        self.assertLessEqual(calls, 100)
+
+
+class TestIntegrateAuto(unittest.TestCase):
+    def test_calibration_is_cached_on_disk(self) -> None:
+        """Повторная калибровка читает результат из файла."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "calibration.json"
+            first = calibrate(path)
+            self.assertTrue(path.exists())
+            with mock.patch("auto_integrate.integrate") as patched:
+                second = calibrate(path)
+            patched.assert_not_called()
+            self.assertEqual(first, second)
+
+    def test_choose_backend(self) -> None:
+        """Скалярная сериализуемая f уходит в процессы выше порога, лямбда — нет."""
+        calibration = {"process_threshold": 10_000}
+        with mock.patch("auto_integrate.os.cpu_count", return_value=4):
+            self.assertEqual(
+                choose_backend(math.fabs, 0.0, 1.0, 100_000, calibration=calibration), "process"
+            )
+            self.assertEqual(
+                choose_backend(math.fabs, 0.0, 1.0, 1_000, calibration=calibration), "serial"
+            )
+            self.assertEqual(
+                choose_backend(lambda x: math.floor(x), 0.0, 1.0, 100_000,
+                               calibration=calibration),
+                "serial",
+            )
+
+    @unittest.skipIf(np is None, "numpy не установлен")
+    def test_array_function_is_vectorized(self) -> None:
+        """Функция, принимающая массивы, считается векторизованно."""
+        self.assertEqual(choose_backend(lambda x: x * x, 0.0, 1.0, 10), "vectorized")
+
+    def test_process_backend_keeps_all_points(self) -> None:
+        """Разбиение по процессам даёт тот же результат, что и один цикл, на одном пуле."""
+        pool = mock.Mock(side_effect=ftres.ProcessPoolExecutor)
+        with mock.patch("auto_integrate.os.cpu_count", return_value=3), \
+                mock.patch("concurrent_integrate.ftres.ProcessPoolExecutor", pool):
+            # 1000 точек на 3 ядра — части двух размеров (334 и 333)
+            result = integrate_auto(math.fabs, -1.0, 2.0, n_iter=1_000, method="midpoint",
+                                    backend="process")
+        self.assertEqual(pool.call_count, 1)
+        expected = integrate(math.fabs, -1.0, 2.0, n_iter=1_000, method="midpoint")
+        self.assertAlmostEqual(result, expected, places=12)
+
+
+class TestBenchSuite(unittest.TestCase):
+    def test_measure_statistics(self) -> None:
+        """measure() возвращает медиану, p95, разброс и CPU-время."""
+        stats = measure(lambda: integrate(math.sin, 0.0, 1.0, n_iter=1_000), repeats=5, warmup=1)
+        self.assertEqual(len(stats["runs"]), 5)
+        self.assertLessEqual(stats["min"], stats["median"])
+        self.assertLessEqual(stats["median"], stats["p95"])
+        self.assertGreaterEqual(stats["stddev"], 0.0)
+        self.assertIn("cpu_median", stats)
+
+    def test_compare_flags_regressions(self) -> None:
+        """Замедление больше порога помечается как регрессия."""
+        row = {"backend": "serial", "integrand": "sin", "n_iter": 10, "n_jobs": None}
+        base = {"results": [{**row, "median": 1.0}, {**row, "integrand": "cos", "median": 1.0}]}
+        new = {"results": [{**row, "median": 1.3}, {**row, "integrand": "cos", "median": 1.05}]}
+        rows = compare(base, new, threshold=0.1)
+        self.assertEqual([r["regression"] for r in rows], [True, False])
+
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestIntegrateVectorized(unittest.TestCase):
+    def test_matches_scalar_path(self) -> None:
+        """Векторизованный режим совпадает со скалярным в пределах округления."""
+        scalar = integrate(math.sin, 0.0, math.pi, n_iter=50_000)
+        vector = integrate(np.sin, 0.0, math.pi, n_iter=50_000, vectorized=True)
+        self.assertAlmostEqual(scalar, vector, places=10)
+
+    def test_chunks_cover_all_points(self) -> None:
+        """Разбиение на блоки не теряет и не дублирует точки сетки."""
+        f = lambda x: x**2
+        whole = integrate(f, 0.0, 1.0, n_iter=1_001, vectorized=True)
+        chunked = integrate(f, 0.0, 1.0, n_iter=1_001, vectorized=True, chunk_size=100)
+        self.assertAlmostEqual(whole, chunked, places=12)
+
+    def test_constant_result_is_broadcast(self) -> None:
+        """Функция, возвращающая скаляр, интегрируется как константа."""
+        result = integrate(lambda x: 1.0, 0.0, 2.0, n_iter=1_000, vectorized=True)
+        self.assertAlmostEqual(result, 2.0, places=12)
+
+    def test_falls_back_for_scalar_only_function(self) -> None:
+        """math.sin не принимает массивы — используется обычный цикл."""
+        result = integrate(math.sin, 0.0, math.pi, n_iter=10_000, vectorized=True)
+        expected = integrate(math.sin, 0.0, math.pi, n_iter=10_000)
+        self.assertEqual(result, expected)
+
+    def test_methods_match_scalar_path(self) -> None:
+        """Все формулы дают одинаковый результат в обоих режимах."""
+        for method in RULES:
+            with self.subTest(method=method):
+                scalar = integrate(math.exp, 0.0, 1.0, n_iter=999, method=method)
+                vector = integrate(
+                    np.exp, 0.0, 1.0, n_iter=999, method=method,
+                    vectorized=True, chunk_size=100,
+                )
+                self.assertAlmostEqual(scalar, vector, places=12)
+
+
+@unittest.skipIf(integrate_nogil is None, "cy_integrate_nogil не собран")
+class TestCythonNogil(unittest.TestCase):
+    def test_prange_matches_serial(self) -> None:
+        """Параллельное ядро совпадает с последовательным и с Python-версией."""
+        expected = integrate(lambda x: x * x, 0.0, 1.0, n_iter=100_000)
+        for summation in ("naive", "kahan"):
+            for num_threads in (1, 2, 4):
+                with self.subTest(summation=summation, num_threads=num_threads):
+                    result = integrate_nogil(
+                        0.0, 1.0, 100_000, summation=summation, num_threads=num_threads
+                    )
+                    self.assertAlmostEqual(result, expected, places=12)
+
+    def test_builtin_integrands(self) -> None:
+        """Встроенные C-функции совпадают с Python-версией."""
+        cases = [
+            ("sin", None, math.sin),
+            ("cos", None, math.cos),
+            ("exp", None, math.exp),
+            ("poly", (1.0, -2.0, 3.0), lambda x: 1.0 - 2.0 * x + 3.0 * x * x),
+        ]
+        for name, coeffs, f in cases:
+            with self.subTest(name=name):
+                expected = integrate(f, 0.0, 1.5, n_iter=50_000)
+                result = integrate_builtin(name, 0.0, 1.5, 50_000, coeffs=coeffs, num_threads=2)
+                self.assertAlmostEqual(result, expected, places=12)
+
+    def test_integrate_fast_falls_back_to_python(self) -> None:
+        """math.sin идёт в C-ядро, произвольная лямбда — в integrate()."""
+        self.assertAlmostEqual(
+            integrate_fast(math.sin, 0.0, math.pi, 50_000),
+            integrate(math.sin, 0.0, math.pi, n_iter=50_000),
+            places=12,
+        )
+        f = lambda x: abs(x - 0.5)
+        self.assertEqual(integrate_fast(f, 0.0, 1.0, 1_000), integrate(f, 0.0, 1.0, n_iter=1_000))
+
+    def test_invalid_arguments(self) -> None:
+        """Некорректные n_iter и num_threads — ValueError."""
+        with self.assertRaises(ValueError):
+            integrate_nogil(0.0, 1.0, 0)
+        with self.assertRaises(ValueError):
+            integrate_nogil(0.0, 1.0, 10, num_threads=0)
+        with self.assertRaises(ValueError):
+            integrate_builtin("tan", 0.0, 1.0, 10)
+
+
+def gaussian_3d(x, y, z):
+    # На уровне модуля, чтобы передавать в пул процессов.
+    return np.exp(-(x * x + y * y + z * z))
+
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestMultidim(unittest.TestCase):
+    def test_tensor_product_exact_for_polynomials(self) -> None:
+        """Тензорные формулы точны для многочленов нужной степени по каждой оси."""
+        f = lambda x, y: x**3 * y + y**2
+        expected = 4 * 9 / 2 + 2 * 27 / 3  # интеграл по [0, 2] x [0, 3]
+        for method in ("simpson", "gauss"):
+            with self.subTest(method=method):
+                result = integrate_nd(f, [(0, 2), (0, 3)], n_iter=[1, 2], method=method)
+                self.assertAlmostEqual(result, expected, places=10)
+
+    def test_processes_and_chunks_match_serial(self) -> None:
+        """Разбиение по процессам и блокам не меняет результат 3D-интеграла."""
+        bounds = [(0, 1)] * 3
+        expected = (math.sqrt(math.pi) / 2 * math.erf(1)) ** 3
+        serial = integrate_nd(gaussian_3d, bounds, n_iter=8)
+        parallel = integrate_nd(gaussian_3d, bounds, n_iter=8, n_jobs=2, chunk_size=50)
+        self.assertAlmostEqual(serial, expected, places=10)
+        self.assertAlmostEqual(parallel, serial, places=13)
+
+    def test_monte_carlo_error_and_reproducibility(self) -> None:
+        """MC попадает в оценку погрешности и не зависит от n_jobs при seed."""
+        expected = (math.sqrt(math.pi) / 2 * math.erf(1)) ** 3
+        modes = [False] + ([True] if qmc is not None else [])
+        for sobol in modes:
+            with self.subTest(qmc_sobol=sobol):
+                res = integrate_mc(gaussian_3d, [(0, 1)] * 3, n_samples=1 << 14,
+                                   qmc_sobol=sobol, seed=7)
+                self.assertEqual(res.n_samples, 1 << 14)
+                self.assertLess(abs(res.value - expected), 5 * res.error)
+                again = integrate_mc(gaussian_3d, [(0, 1)] * 3, n_samples=1 << 14,
+                                     qmc_sobol=sobol, seed=7, n_jobs=2)
+                self.assertEqual(res, again)
+
+
+class TestIntegralCache(unittest.TestCase):
+    def test_hits_misses_and_lru(self) -> None:
+        """Повтор вызова берётся из кэша, старые записи вытесняются."""
+        calls = []
+
+        def fake_integrate(f, a, b, **kwargs):
+            calls.append((a, b))
+            return integrate(f, a, b, **kwargs)
+
+        cache = IntegralCache(maxsize=2)
+        cached = cache.cached(fake_integrate)
+        first = cached(math.sin, 0.0, math.pi, n_iter=1000)
+        self.assertEqual(cached(math.sin, 0.0, math.pi, n_iter=1000), first)
+        cached(math.sin, 0.0, 1.0, n_iter=1000)
+        cached(math.sin, 0.0, 2.0, n_iter=1000)
+        cached(math.sin, 0.0, math.pi, n_iter=1000)
+        self.assertEqual(len(calls), 4)
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 4, 2))
+
+    def test_function_identity(self) -> None:
+        """Разные замыкания и параметры дают разные ключи, связанные методы — None."""
+        def power(k):
+            return lambda x: x**k
+
+        self.assertEqual(function_key(power(2)), function_key(power(2)))
+        self.assertNotEqual(function_key(power(2)), function_key(power(3)))
+        self.assertNotEqual(function_key(lambda x: x + 1), function_key(lambda x: x + 2))
+        self.assertEqual(function_key(math.sin), "math.sin")
+        self.assertIsNone(function_key([].count))
+
+        cache = IntegralCache()
+        cached = cache.cached(integrate)
+        self.assertAlmostEqual(
+            cached(power(2), 0.0, 1.0, n_iter=1000), cached(power(2), 0.0, 1.0, n_iter=1000)
+        )
+        self.assertEqual(cache.info().hits, 1)
+        self.assertNotEqual(
+            cached(power(2), 0.0, 1.0, n_iter=1000),
+            cached(power(2), 0.0, 1.0, n_iter=1000, method="simpson"),
+        )
+
+    def test_function_globals(self) -> None:
+        """Глобальные числа входят в ключ, глобальные кортежи и массивы делают f некэшируемой."""
+        source = "def f(x):\n    return math.fsum(c * x for c in COEFFS) + K\n"
+        scope = {"math": math, "COEFFS": (1.0, 2.0), "K": 1.0}
+        exec(source, scope)
+        self.assertIsNone(function_key(scope["f"]))
+
+        scope = {"math": math, "K": 1.0}
+        exec("def f(x):\n    return math.sin(x) + K\n", scope)
+        key = function_key(scope["f"])
+        self.assertIsNotNone(key)
+        scope["K"] = 2.0
+        self.assertNotEqual(function_key(scope["f"]), key)
+
+        exec("def fact(n):\n    return 1 if n <= 1 else n * fact(n - 1)\n", scope)
+        self.assertIsNotNone(function_key(scope["fact"]))
+
+    def test_uncacheable_and_disk_store(self) -> None:
+        """Функции без стабильного ключа не кэшируются; диск переживает новый объект кэша."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "cache.sqlite"
+            cache = IntegralCache(path=path)
+            cached = cache.cached(integrate)
+            value = cached(math.cos, 0.0, 1.0, n_iter=500)
+            offset = object()
+            cached(lambda x: x if offset else 0.0, 0.0, 1.0, n_iter=10)
+            self.assertEqual(cache.info().uncacheable, 1)
+            cache.close()
+
+            reopened = IntegralCache(path=path)
+            cached = reopened.cached(integrate)
+            self.assertEqual(cached(math.cos, 0.0, 1.0, n_iter=500), value)
+            self.assertEqual(reopened.info().disk_hits, 1)
+            reopened.close()
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
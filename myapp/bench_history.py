@@ -0,0 +1,82 @@
+"""
+Бенчмарк запросов к архиву курсов currency_history на миллионах строк.
+
+Архив заполняется синтетическими курсами (--codes валют × --days дней),
+затем замеряются min/max/avg за окно --window дней и выборка ряда за
+то же окно. Для сравнения те же запросы выполняются по такой же таблице
+с rowid и без индекса (полный просмотр).
+
+    python bench_history.py --codes 50 --days 40000
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+import time
+
+from controllers import CurrencyRatesCRUD
+
+
+def fill(crud: CurrencyRatesCRUD, conn: sqlite3.Connection, codes: int, days: int) -> list[str]:
+    """Заполняет архив и таблицу-образец без индекса одинаковыми данными."""
+    conn.execute(
+        "CREATE TABLE plain_history (char_code TEXT, date TEXT, value FLOAT, nominal INTEGER)"
+    )
+    names = [f"C{i:03d}" for i in range(codes)]
+    start = datetime.date(1920, 1, 1)
+    rnd = random.Random(0)
+    for day in range(days):
+        date = (start + datetime.timedelta(days=day)).isoformat()
+        rows = [
+            {"char_code": code, "value": rnd.uniform(10, 100), "nominal": 1}
+            for code in names
+        ]
+        crud._record_history(date, rows)
+        conn.executemany(
+            "INSERT INTO plain_history VALUES (?, ?, ?, ?)",
+            [(r["char_code"], date, r["value"], r["nominal"]) for r in rows],
+        )
+    conn.commit()
+    return names
+
+
+def timed(conn: sqlite3.Connection, sql: str, params: tuple, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--codes", type=int, default=50, help="число валют")
+    parser.add_argument("--days", type=int, default=40000, help="число дней истории")
+    parser.add_argument("--window", type=int, default=365, help="окно запроса, дней")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(":memory:")
+    crud = CurrencyRatesCRUD(conn)
+    start = time.perf_counter()
+    names = fill(crud, conn, args.codes, args.days)
+    print(f"Заполнено {args.codes * args.days} строк за {time.perf_counter() - start:.1f} с")
+
+    first = datetime.date(1920, 1, 1) + datetime.timedelta(days=args.days // 2)
+    last = first + datetime.timedelta(days=args.window - 1)
+    params = (names[len(names) // 2], first.isoformat(), last.isoformat())
+    queries = {
+        "min/max/avg": "SELECT COUNT(*), MIN(value / nominal), MAX(value / nominal), "
+                       "AVG(value / nominal) FROM {table} "
+                       "WHERE char_code = ? AND date BETWEEN ? AND ?",
+        "ряд за окно": "SELECT date, value, nominal FROM {table} "
+                       "WHERE char_code = ? AND date BETWEEN ? AND ? ORDER BY date",
+    }
+    for label, sql in queries.items():
+        indexed = timed(conn, sql.format(table="currency_history"), params, args.repeat)
+        plain = timed(conn, sql.format(table="plain_history"), params, max(1, args.repeat // 10))
+        print(f"{label:>12}: currency_history {indexed:8.3f} мс, "
+              f"без индекса {plain:8.3f} мс (x{plain / indexed:.0f})")
+
+
+if __name__ == "__main__":
+    main()
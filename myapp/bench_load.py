@@ -0,0 +1,91 @@
+"""
+Нагрузочный бенчмарк myapp: запросов в секунду до и после keep-alive и сжатия.
+
+"до" — HTTP/1.0 без сжатия (новое TCP-соединение на каждый запрос),
+"после" — HTTP/1.1 keep-alive, с gzip и без него.
+
+    python bench_load.py --clients 8 --requests 200 --path /currencies
+"""
+import argparse
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import myapp
+from servers import make_server
+
+
+class LegacyHandler(myapp.SimpleHTTPRequestHandler):
+    """Поведение до перехода на HTTP/1.1: соединение на запрос, без сжатия."""
+
+    protocol_version = "HTTP/1.0"
+    compress_min_size = None
+
+
+def _client(port: int, path: str, n: int, keep_alive: bool, gzip: bool) -> int:
+    headers = {"Accept-Encoding": "gzip"} if gzip else {}
+    received = 0
+    conn = None
+    for _ in range(n):
+        if conn is None:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        received += len(response.read())
+        if not keep_alive or response.will_close:
+            conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+    return received
+
+
+def run(handler_class, *, keep_alive: bool, gzip: bool, clients: int, requests: int,
+        path: str, mode: str, workers: int) -> tuple[float, float]:
+    """Возвращает (запросов в секунду, байт на ответ)."""
+    server = make_server(("127.0.0.1", 0), handler_class, mode=mode, workers=workers)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    try:
+        _client(port, path, 5, keep_alive, gzip)  # прогрев кэша страниц
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            sizes = list(pool.map(
+                lambda _: _client(port, path, requests, keep_alive, gzip), range(clients)
+            ))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+    total = clients * requests
+    return total / elapsed, sum(sizes) / total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="запросов на клиента")
+    parser.add_argument("--path", default="/currencies")
+    parser.add_argument("--mode", default="pool")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    # Журнал запросов в stderr искажает замер
+    myapp.SimpleHTTPRequestHandler.log_message = lambda *a: None
+
+    cases = [
+        ("HTTP/1.0, без сжатия (до)", LegacyHandler, False, False),
+        ("HTTP/1.1 keep-alive", myapp.SimpleHTTPRequestHandler, True, False),
+        ("HTTP/1.1 keep-alive + gzip", myapp.SimpleHTTPRequestHandler, True, True),
+    ]
+    for label, handler_class, keep_alive, gzip in cases:
+        rps, size = run(handler_class, keep_alive=keep_alive, gzip=gzip,
+                        clients=args.clients, requests=args.requests, path=args.path,
+                        mode=args.mode, workers=args.workers)
+        print(f"{label:<30} {rps:8.0f} запросов/с, {size:7.0f} байт/ответ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Бенчмарк индексов currency и user_currency (миграция 2 схемы).
+
+База заполняется --currencies валютами и --subscriptions подписками
+(--users пользователей) на схеме версии 1, без индексов. Замеряются
+_update по char_code и get_user_with_currencies, затем база мигрирует
+до последней версии и те же операции замеряются снова на тех же данных.
+
+    python bench_schema.py --currencies 100000 --subscriptions 1000000
+"""
+import argparse
+import random
+import sqlite3
+import time
+
+from controllers import CurrencyRatesCRUD
+from controllers.migrations import SCHEMA_VERSION
+
+
+def fill(conn: sqlite3.Connection, currencies: int, users: int, subscriptions: int) -> None:
+    rnd = random.Random(0)
+    conn.executemany(
+        "INSERT INTO currency(num_code, char_code, name, value, nominal) VALUES(?, ?, ?, ?, 1)",
+        ((f"{i:06d}", f"C{i:06d}", f"Валюта {i}", rnd.uniform(1, 100)) for i in range(currencies)),
+    )
+    conn.executemany("INSERT INTO user(name) VALUES(?)", ((f"user{i}",) for i in range(users)))
+    conn.executemany(
+        "INSERT INTO user_currency(user_id, currency_id) VALUES(?, ?)",
+        ((rnd.randint(1, users), rnd.randint(1, currencies)) for _ in range(subscriptions)),
+    )
+    conn.commit()
+
+
+def measure(crud: CurrencyRatesCRUD, args, rnd: random.Random) -> tuple[float, float]:
+    """Среднее время (мс) одного _update и одного get_user_with_currencies."""
+    codes = [f"C{rnd.randrange(args.currencies):06d}" for _ in range(args.repeat)]
+    start = time.perf_counter()
+    for code in codes:
+        crud._update({code: rnd.uniform(1, 100)})
+    update = (time.perf_counter() - start) / args.repeat * 1000
+
+    users = [rnd.randint(1, args.users) for _ in range(args.repeat)]
+    start = time.perf_counter()
+    for user_id in users:
+        crud.get_user_with_currencies(user_id)
+    read = (time.perf_counter() - start) / args.repeat * 1000
+    return update, read
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--currencies", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--subscriptions", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50, help="операций каждого вида")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(":memory:")
+    crud = CurrencyRatesCRUD(conn, schema_version=1)
+    start = time.perf_counter()
+    fill(conn, args.currencies, args.users, args.subscriptions)
+    print(f"Заполнено {args.currencies} валют и {args.subscriptions} подписок "
+          f"за {time.perf_counter() - start:.1f} с")
+
+    rnd = random.Random(1)
+    before = measure(crud, args, rnd)
+
+    start = time.perf_counter()
+    crud._migrate(SCHEMA_VERSION)
+    print(f"Миграция до версии {SCHEMA_VERSION}: {time.perf_counter() - start:.1f} с")
+    after = measure(crud, args, rnd)
+
+    for label, old, new in zip(("_update", "get_user_with_currencies"), before, after):
+        print(f"{label:>25}: без индексов {old:8.3f} мс, с индексами {new:8.3f} мс "
+              f"(x{old / new:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Бенчмарк старта myapp с локальной заглушкой API ЦБ вместо сети.
+
+Заглушка отвечает с задержкой --delay секунд, как медленная сеть. Замеряется:
+- сколько длился бы старый старт, блокированный get_currencies();
+- через сколько сервер отвечает на первый запрос;
+- через сколько на странице видны свежие курсы из заглушки.
+
+    python bench_startup.py --delay 2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from utils import get_currencies
+
+HERE = Path(__file__).resolve().parent
+
+# Формат daily_json.js, курс USD заметный, чтобы найти его на странице
+PAYLOAD = {
+    "Date": "2026-10-18T11:30:00+03:00",
+    "Valute": {
+        "USD": {"NumCode": "840", "CharCode": "USD", "Nominal": 1, "Name": "Доллар США",
+                "Value": 123.4567},
+        "EUR": {"NumCode": "978", "CharCode": "EUR", "Nominal": 1, "Name": "Евро",
+                "Value": 130.1},
+        "GBP": {"NumCode": "826", "CharCode": "GBP", "Nominal": 1, "Name": "Фунт стерлингов",
+                "Value": 150.2},
+    },
+}
+
+
+def start_stand_in(delay: float) -> ThreadingHTTPServer:
+    """Локальная заглушка daily_json.js, отвечающая через delay секунд."""
+    body = json.dumps(PAYLOAD, ensure_ascii=False).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _wait_for(url: str, marker: str | None, start: float, limit: float = 30.0) -> float:
+    while time.perf_counter() - start < limit:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                page = response.read().decode("utf-8")
+            if marker is None or marker in page:
+                return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} не ответил за {limit} с")
+
+
+def measure_server(rates_url: str, snapshot: Path, port: int) -> tuple[float, float]:
+    """(время до первого ответа, время до свежих курсов) для запуска myapp.py."""
+    env = {**os.environ, "MYAPP_RATES_SNAPSHOT": str(snapshot)}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "myapp.py", "--port", str(port), "--rates-url", rates_url],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        page = f"http://127.0.0.1:{port}/currencies"
+        first = _wait_for(page, None, start)
+        fresh = _wait_for(page, "123.4567", start)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return first, fresh
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--delay", type=float, default=2.0, help="задержка ответа заглушки, с")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    stand_in = start_stand_in(args.delay)
+    rates_url = f"http://127.0.0.1:{stand_in.server_address[1]}/daily_json.js"
+    try:
+        start = time.perf_counter()
+        get_currencies(["USD", "EUR", "GBP"], url=rates_url)
+        blocking = time.perf_counter() - start
+        print(f"Старый старт ждал бы get_currencies(): {blocking:.3f} с")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot = Path(tmp) / "rates_snapshot.json"
+            for label in ("без снимка", "со снимком"):
+                first, fresh = measure_server(rates_url, snapshot, args.port)
+                print(f"{label:>11}: первый ответ через {first:.3f} с, "
+                      f"свежие курсы через {fresh:.3f} с")
+    finally:
+        stand_in.shutdown()
+        stand_in.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import gzip
+from functools import lru_cache
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен, без него остаётся gzip
+    brotli = None
+
+# Тела меньше этого размера (в байтах) не сжимаются: выигрыш меньше накладных расходов.
+MIN_COMPRESS_SIZE = 1024
+
+# Поддерживаемые кодировки в порядке предпочтения сервера.
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """
+    Выбирает кодировку из заголовка Accept-Encoding или None.
+
+    Учитываются веса q: кодировка с q=0 запрещена. При равных весах
+    берётся та, что раньше в ENCODINGS.
+
+    >>> negotiate("gzip, deflate, br;q=0")
+    'gzip'
+    >>> negotiate("identity") is None
+    True
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    star = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, star)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+@lru_cache(maxsize=128)
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Сжимает data. Результат кэшируется: закэшированные страницы
+    (PageCache) не пережимаются на каждый запрос.
+    """
+    if encoding == "gzip":
+        # mtime=0 — одинаковый результат для одинаковых данных
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=5)
+    raise ValueError(f"Неподдерживаемая кодировка {encoding!r}")
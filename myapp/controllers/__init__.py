@@ -1 +1,2 @@
-from .databasecontroller import CurrencyRatesCRUD
\ No newline at end of file
+from .databasecontroller import CurrencyRatesCRUD
+from .connection import ThreadLocalConnection
\ No newline at end of file
@@ -0,0 +1,74 @@
+import sqlite3
+import threading
+
+
+class ThreadLocalConnection:
+    """
+    Соединение с SQLite, своё для каждого потока.
+
+    Вместо одного соединения с check_same_thread=False каждый поток
+    получает собственное sqlite3.Connection к одной и той же базе.
+    Для базы в памяти используйте URI с общим кэшем, например
+    "file:myapp?mode=memory&cache=shared" (uri=True): пока открыто
+    хотя бы одно соединение, все потоки видят одни и те же таблицы.
+
+    Объект повторяет нужную CurrencyRatesCRUD часть интерфейса
+    sqlite3.Connection: execute, executemany, cursor, commit, rollback.
+    """
+
+    def __init__(self, database: str, *, uri: bool = False, timeout: float = 5.0):
+        self._database = database
+        self._uri = uri
+        self._timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: dict[threading.Thread, sqlite3.Connection] = {}
+        # Соединение создающего потока держит базу в памяти живой,
+        # даже если рабочие потоки ещё не открыли свои.
+        self._anchor = self.get()
+
+    def get(self) -> sqlite3.Connection:
+        """Соединение текущего потока (создаётся при первом обращении)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False только ради close() из другого потока;
+            # само соединение используется лишь потоком-владельцем.
+            conn = sqlite3.connect(
+                self._database, uri=self._uri, timeout=self._timeout,
+                check_same_thread=False,
+            )
+            # read_uncommitted не включаем: иначе читатели видели бы чужие
+            # незакоммиченные изменения. Чтобы в режиме общего кэша не
+            # получать "database table is locked", CurrencyRatesCRUD не
+            # пускает чтение во время записи.
+            self._local.conn = conn
+            with self._lock:
+                # Заодно закрываем соединения завершившихся потоков.
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        return self.get().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters) -> sqlite3.Cursor:
+        return self.get().executemany(sql, seq_of_parameters)
+
+    def cursor(self) -> sqlite3.Cursor:
+        return self.get().cursor()
+
+    def commit(self) -> None:
+        self.get().commit()
+
+    def rollback(self) -> None:
+        self.get().rollback()
+
+    def close(self) -> None:
+        """Закрывает соединения всех потоков."""
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for conn in connections.values():
+            conn.close()
+        self._local = threading.local()
+        self._anchor = None
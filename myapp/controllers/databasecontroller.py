@@ -1,50 +1,87 @@
+import datetime
 import sqlite3
-from typing import List, Dict, Any, Tuple
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Tuple, Callable
+
+from .connection import ThreadLocalConnection
+from .migrations import SCHEMA_VERSION, migrate
+
+# Добавление валюты; при совпадении char_code (UNIQUE) обновляется существующая
+_UPSERT_CURRENCY = """
+    INSERT INTO currency(num_code, char_code, name, value, nominal)
+    VALUES(:num_code, :char_code, :name, :value, :nominal)
+    ON CONFLICT(char_code) DO UPDATE
+    SET num_code = excluded.num_code, name = excluded.name,
+        value = excluded.value, nominal = excluded.nominal
+"""
 
 
 class CurrencyRatesCRUD:
     """
-    Контроллер работы с БД (SQLite в памяти) для таблиц user, currency, user_currency.
+    Контроллер работы с БД (SQLite в памяти) для таблиц user, currency, user_currency
+    и архива курсов currency_history.
+
+    conn — обычное sqlite3.Connection или ThreadLocalConnection для
+    многопоточного сервера. Запросы выполняются через conn.execute, без
+    общего курсора. Чтения идут параллельно друг другу, но не во время
+    записи (блокировка читателей-писателя), поэтому незакоммиченные или
+    откатываемые изменения никто не видит.
+    После каждой успешной записи вызываются слушатели из add_listener()
+    (например, сброс кэша страниц).
+
+    Схема создаётся и обновляется миграциями (controllers.migrations) до
+    версии schema_version; меньшая версия нужна только для бенчмарков.
     """
 
-    def __init__(self, conn: sqlite3.Connection):
+    def __init__(
+        self,
+        conn: sqlite3.Connection | ThreadLocalConnection,
+        *,
+        schema_version: int = SCHEMA_VERSION,
+    ):
         self._conn = conn
-        self._cursor = conn.cursor()
-        self._create_tables()
+        self._lock = _ReadWriteLock()
+        self._depth = 0  # вложенность _transaction(), меняется под блокировкой записи
+        self._notify = False  # вызывать ли слушателей после текущей транзакции
+        self._listeners: List[Callable[[], None]] = []
+        self._migrate(schema_version)
 
-    def _create_tables(self) -> None:
-        self._conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL
-            );
-            """
-        )
-        self._conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS currency (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                num_code TEXT NOT NULL,
-                char_code TEXT NOT NULL,
-                name TEXT NOT NULL,
-                value FLOAT,
-                nominal INTEGER
-            );
-            """
-        )
-        self._conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_currency (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                currency_id INTEGER NOT NULL,
-                FOREIGN KEY(user_id) REFERENCES user(id),
-                FOREIGN KEY(currency_id) REFERENCES currency(id)
-            );
-            """
-        )
-        self._conn.commit()
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Подписывает callback() на изменения currency, user и user_currency."""
+        self._listeners.append(callback)
+
+    @contextmanager
+    def _transaction(self, *, notify: bool = True):
+        """
+        Транзакция записи: commit при успехе, rollback при ошибке.
+        Вложенные вызовы (seed_test_data -> _create) входят во внешнюю.
+        Слушатели вызываются после commit, если хотя бы один уровень
+        транзакции был с notify=True (запись в архив курсов их не трогает).
+        """
+        with self._lock.write():
+            if self._depth == 0:
+                self._notify = False
+            self._depth += 1
+            self._notify = self._notify or notify
+            try:
+                yield
+            except BaseException:
+                if self._depth == 1:
+                    self._conn.rollback()
+                raise
+            else:
+                if self._depth == 1:
+                    self._conn.commit()
+                    if self._notify:
+                        for callback in self._listeners:
+                            callback()
+            finally:
+                self._depth -= 1
+
+    def _migrate(self, target: int) -> None:
+        with self._transaction():
+            migrate(self._conn, target)
 
     # ----------------- CRUD для currency -----------------
 
@@ -52,19 +89,39 @@ class CurrencyRatesCRUD:
         """
         Создание нескольких валют.
         data: список словарей с ключами num_code, char_code, name, value, nominal.
+        Валюта с уже существующим char_code не дублируется, а обновляется.
         """
-        sql = """
-            INSERT INTO currency(num_code, char_code, name, value, nominal)
-            VALUES(:num_code, :char_code, :name, :value, :nominal)
+        with self._transaction():
+            self._conn.executemany(_UPSERT_CURRENCY, data)
+
+    def _upsert(self, data: List[Dict[str, Any]]) -> int:
+        """
+        Обновляет валюты из data по char_code и добавляет отсутствующие.
+        Записываются только изменившиеся строки, всё — одной транзакцией;
+        если ничего не изменилось, слушатели не вызываются.
+        Возвращает число изменённых и добавленных валют.
+        """
+        sql = _UPSERT_CURRENCY + """
+            WHERE currency.num_code IS NOT excluded.num_code
+               OR currency.name IS NOT excluded.name
+               OR currency.value IS NOT excluded.value
+               OR currency.nominal IS NOT excluded.nominal
         """
-        self._cursor.executemany(sql, data)
-        self._conn.commit()
+        rows = [{**item, "char_code": item["char_code"].upper()} for item in data]
+        if not rows:
+            return 0
+        with self._transaction(notify=False):
+            # rowcount не учитывает конфликты, отброшенные условием WHERE
+            changed = self._conn.executemany(sql, rows).rowcount
+            if changed:
+                self._notify = True
+        return changed
 
     def _read(self) -> List[Dict[str, Any]]:
         """Чтение всех валют (SELECT * FROM currency)."""
         sql = "SELECT id, num_code, char_code, name, value, nominal FROM currency"
-        cur = self._cursor.execute(sql)
-        rows = cur.fetchall()
+        with self._lock.read():
+            rows = self._conn.execute(sql).fetchall()
         result: List[Dict[str, Any]] = []
         for r in rows:
             result.append(
@@ -88,61 +145,101 @@ class CurrencyRatesCRUD:
         params: List[Tuple[float, str]] = []
         for code, val in changes.items():
             params.append((float(val), code.upper()))
-        self._cursor.executemany(sql, params)
-        self._conn.commit()
+        with self._transaction():
+            self._conn.executemany(sql, params)
 
     def _delete(self, currency_id: int) -> None:
         """Удаление валюты по id."""
         sql = "DELETE FROM currency WHERE id = ?"
-        self._cursor.execute(sql, (currency_id,))
-        self._conn.commit()
+        with self._transaction():
+            self._conn.execute(sql, (currency_id,))
+
+    # ----------------- Архив курсов -----------------
+
+    def _record_history(self, date: str, data: List[Dict[str, Any]]) -> int:
+        """
+        Записывает курсы data (поля char_code, value, nominal) в архив на дату date.
+        date — "YYYY-MM-DD" или дата ответа ЦБ вида "2026-10-18T11:30:00+03:00".
+        Повторная запись той же даты заменяет курс. Возвращает число строк.
+        """
+        day = _history_day(date)
+        sql = """
+            INSERT INTO currency_history(char_code, date, value, nominal)
+            VALUES(?, ?, ?, ?)
+            ON CONFLICT(char_code, date) DO UPDATE
+            SET value = excluded.value, nominal = excluded.nominal
+        """
+        params = [
+            (item["char_code"].upper(), day, float(item["value"]), int(item["nominal"]))
+            for item in data
+        ]
+        with self._transaction(notify=False):
+            self._conn.executemany(sql, params)
+        return len(params)
+
+    def get_history(self, char_code: str, start: str, end: str) -> List[Dict[str, Any]]:
+        """Курсы валюты за период [start, end] (даты "YYYY-MM-DD") по возрастанию даты."""
+        sql = """
+            SELECT date, value, nominal FROM currency_history
+            WHERE char_code = ? AND date BETWEEN ? AND ?
+            ORDER BY date
+        """
+        params = (char_code.upper(), _history_day(start), _history_day(end))
+        with self._lock.read():
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"date": r[0], "value": r[1], "nominal": r[2]} for r in rows]
+
+    def get_history_stats(self, char_code: str, start: str, end: str) -> Dict[str, Any]:
+        """
+        Минимум, максимум и среднее курса за период [start, end].
+        Считается курс за одну единицу (value / nominal), чтобы смена
+        номинала не искажала статистику. Нет данных — count 0 и None.
+        """
+        sql = """
+            SELECT COUNT(*), MIN(value / nominal), MAX(value / nominal), AVG(value / nominal)
+            FROM currency_history
+            WHERE char_code = ? AND date BETWEEN ? AND ?
+        """
+        params = (char_code.upper(), _history_day(start), _history_day(end))
+        with self._lock.read():
+            count, low, high, avg = self._conn.execute(sql, params).fetchall()[0]
+        return {"count": count, "min": low, "max": high, "avg": avg}
 
     # ----------------- Пользователи и подписки -----------------
 
     def seed_test_data(self) -> None:
         """Создаём тестовые данные: пользователя, валюты и подписки."""
+        with self._transaction():
+            self._seed_test_data()
+
+    def _seed_test_data(self) -> None:
         # 1. Пользователи
-        self._cursor.execute("INSERT INTO user(name) VALUES (?)", ("Иван",))
-        self._cursor.execute("INSERT INTO user(name) VALUES (?)", ("Мария",))
-        self._conn.commit()
-
-        # 2. Если валют ещё нет — создадим простые для примера
-        cur = self._cursor.execute("SELECT COUNT(*) FROM currency")
-        count = cur.fetchone()[0]
-        if count == 0:
-            data = [
-                {
-                    "num_code": "840",
-                    "char_code": "USD",
-                    "name": "Доллар США",
-                    "value": 90.0,
-                    "nominal": 1,
-                },
-                {
-                    "num_code": "978",
-                    "char_code": "EUR",
-                    "name": "Евро",
-                    "value": 91.0,
-                    "nominal": 1,
-                },
-                {
-                    "num_code": "826",
-                    "char_code": "GBP",
-                    "name": "Фунт стерлингов",
-                    "value": 100.0,
-                    "nominal": 1,
-                },
-            ]
-            self._create(data)
+        self._conn.execute("INSERT INTO user(name) VALUES (?)", ("Иван",))
+        self._conn.execute("INSERT INTO user(name) VALUES (?)", ("Мария",))
+
+        # 2. Базовые валюты, если их ещё нет (курсы из снимка не трогаем)
+        data = [
+            ("840", "USD", "Доллар США", 90.0, 1),
+            ("978", "EUR", "Евро", 91.0, 1),
+            ("826", "GBP", "Фунт стерлингов", 100.0, 1),
+        ]
+        self._conn.executemany(
+            """
+            INSERT INTO currency(num_code, char_code, name, value, nominal)
+            VALUES(?, ?, ?, ?, ?)
+            ON CONFLICT(char_code) DO NOTHING
+            """,
+            data,
+        )
 
         # 3. Подписки: Иван -> USD, EUR; Мария -> EUR, GBP
         # Получаем id пользователей
-        self._cursor.execute("SELECT id, name FROM user")
-        users = {row[1]: row[0] for row in self._cursor.fetchall()}
+        cur = self._conn.execute("SELECT id, name FROM user")
+        users = {row[1]: row[0] for row in cur.fetchall()}
 
         # Получаем id валют
-        self._cursor.execute("SELECT id, char_code FROM currency")
-        currencies = {row[1]: row[0] for row in self._cursor.fetchall()}
+        cur = self._conn.execute("SELECT id, char_code FROM currency")
+        currencies = {row[1]: row[0] for row in cur.fetchall()}
 
         subs = [
             (users["Иван"], currencies["USD"]),
@@ -150,32 +247,35 @@ class CurrencyRatesCRUD:
             (users["Мария"], currencies["EUR"]),
             (users["Мария"], currencies["GBP"]),
         ]
-        self._cursor.executemany(
+        self._conn.executemany(
             "INSERT INTO user_currency(user_id, currency_id) VALUES(?, ?)", subs
         )
-        self._conn.commit()
 
     def get_users(self) -> List[Dict[str, Any]]:
-        cur = self._cursor.execute("SELECT id, name FROM user")
-        return [{"id": row[0], "name": row[1]} for row in cur.fetchall()]
+        with self._lock.read():
+            rows = self._conn.execute("SELECT id, name FROM user").fetchall()
+        return [{"id": row[0], "name": row[1]} for row in rows]
 
     def get_user_with_currencies(self, user_id: int) -> Dict[str, Any] | None:
-        # Информация о пользователе
-        cur = self._cursor.execute("SELECT id, name FROM user WHERE id = ?", (user_id,))
-        user_row = cur.fetchone()
-        if not user_row:
-            return None
-
-        # Валюты, на которые он подписан
         sql = """
             SELECT c.id, c.num_code, c.char_code, c.name, c.value, c.nominal
             FROM user_currency uc
             JOIN currency c ON c.id = uc.currency_id
             WHERE uc.user_id = ?
         """
-        cur = self._cursor.execute(sql, (user_id,))
+        with self._lock.read():
+            # Информация о пользователе
+            users = self._conn.execute(
+                "SELECT id, name FROM user WHERE id = ?", (user_id,)
+            ).fetchall()
+            if not users:
+                return None
+            user_row = users[0]
+
+            # Валюты, на которые он подписан
+            rows = self._conn.execute(sql, (user_id,)).fetchall()
         currencies = []
-        for r in cur.fetchall():
+        for r in rows:
             currencies.append(
                 {
                     "id": r[0],
@@ -190,4 +290,74 @@ class CurrencyRatesCRUD:
             "id": user_row[0],
             "name": user_row[1],
             "currencies": currencies,
-        }
\ No newline at end of file
+        }
+
+class _ReadWriteLock:
+    """
+    Блокировка «много читателей или один писатель».
+
+    Запись реентерабельна (вложенные _transaction), а поток-писатель
+    читает без ожидания. Ожидающий писатель не пропускает новых читателей
+    вперёд, чтобы поток запросов страниц не задерживал запись бесконечно.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()  # глубина чтения в текущем потоке
+        self._readers = 0
+        self._writer: int | None = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0 and self._writer != me:
+            with self._cond:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+            counted = True
+        else:
+            counted = False  # вложенное чтение или чтение внутри своей записи
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if counted:
+                with self._cond:
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+            self._write_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+def _history_day(date: str) -> str:
+    """"2026-10-18T11:30:00+03:00" -> "2026-10-18"; проверяет формат даты."""
+    try:
+        return datetime.date.fromisoformat(str(date)[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"Некорректная дата: {date!r}") from None
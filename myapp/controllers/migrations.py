@@ -0,0 +1,141 @@
+import sqlite3
+from typing import Callable, List, Tuple
+
+from .connection import ThreadLocalConnection
+
+Connection = sqlite3.Connection | ThreadLocalConnection
+
+
+def _initial_schema(conn: Connection) -> None:
+    """Таблицы user, currency, user_currency и архив курсов currency_history."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS currency (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            num_code TEXT NOT NULL,
+            char_code TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value FLOAT,
+            nominal INTEGER
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_currency (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            currency_id INTEGER NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES user(id),
+            FOREIGN KEY(currency_id) REFERENCES currency(id)
+        );
+        """
+    )
+    # Архив курсов по дням. Первичный ключ (char_code, date) без rowid —
+    # строки одной валюты лежат в B-дереве подряд в порядке дат, поэтому
+    # выборка за период читает только нужный диапазон даже на миллионах строк.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS currency_history (
+            char_code TEXT NOT NULL,
+            date TEXT NOT NULL,
+            value FLOAT NOT NULL,
+            nominal INTEGER NOT NULL,
+            PRIMARY KEY(char_code, date)
+        ) WITHOUT ROWID;
+        """
+    )
+
+
+def _currency_indexes(conn: Connection) -> None:
+    """
+    UNIQUE(char_code) для currency и UNIQUE(user_id, currency_id) для подписок.
+
+    Уникальный индекс нельзя построить, пока есть дубликаты кодов (их
+    оставлял повторный _create): у каждого кода остаётся строка с
+    наименьшим id, подписки на удаляемые строки переносятся на неё.
+    После переноса у пользователя могут оказаться две подписки на одну
+    валюту — из них тоже остаётся строка с наименьшим id.
+    """
+    # Соответствие old_id -> new_id во временной таблице: коррелированный
+    # поиск по char_code без индекса на миллионе подписок был бы квадратичным
+    conn.execute(
+        "CREATE TEMP TABLE currency_duplicate (old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)"
+    )
+    conn.execute(
+        """
+        INSERT INTO currency_duplicate(old_id, new_id)
+        SELECT c.id, keep.id
+        FROM currency c
+        JOIN (SELECT char_code, MIN(id) AS id FROM currency GROUP BY char_code) keep
+            ON keep.char_code = c.char_code
+        WHERE c.id <> keep.id
+        """
+    )
+    conn.execute(
+        """
+        UPDATE user_currency
+        SET currency_id = (SELECT new_id FROM currency_duplicate WHERE old_id = currency_id)
+        WHERE currency_id IN (SELECT old_id FROM currency_duplicate)
+        """
+    )
+    conn.execute("DELETE FROM currency WHERE id IN (SELECT old_id FROM currency_duplicate)")
+    conn.execute("DROP TABLE temp.currency_duplicate")
+    conn.execute(
+        """
+        DELETE FROM user_currency
+        WHERE id NOT IN (SELECT MIN(id) FROM user_currency GROUP BY user_id, currency_id)
+        """
+    )
+    # _update (WHERE char_code = ?) и upsert (ON CONFLICT(char_code))
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS currency_char_code ON currency(char_code)")
+    # JOIN в get_user_with_currencies: поиск подписок пользователя без
+    # обращения к самой таблице (индекс покрывает user_id и currency_id);
+    # заодно запрещает повторную подписку на ту же валюту
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS user_currency_user_id "
+        "ON user_currency(user_id, currency_id)"
+    )
+
+
+# Миграции по порядку: версия схемы N — применены первые N миграций.
+# Новые миграции только дописываются в конец.
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("начальная схема", _initial_schema),
+    ("индексы и UNIQUE(char_code)", _currency_indexes),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: Connection) -> int:
+    """Версия схемы БД (PRAGMA user_version; 0 — новая база)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: Connection, target: int = SCHEMA_VERSION) -> int:
+    """
+    Применяет недостающие миграции до версии target.
+    Транзакцией управляет вызывающий (CurrencyRatesCRUD._transaction).
+    Возвращает число применённых миграций.
+    """
+    if not 0 <= target <= SCHEMA_VERSION:
+        raise ValueError(f"Неизвестная версия схемы: {target}")
+    current = schema_version(conn)
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Схема БД версии {current} новее поддерживаемой ({SCHEMA_VERSION})"
+        )
+    for version in range(current + 1, target + 1):
+        _, apply = MIGRATIONS[version - 1]
+        apply(conn)
+        conn.execute(f"PRAGMA user_version = {version}")
+    return max(0, target - current)
@@ -1,13 +1,17 @@
-import sqlite3
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+import argparse
+import uuid
+from http.server import BaseHTTPRequestHandler
 
 from jinja2 import Environment, PackageLoader, select_autoescape
 
 from models import Author, App
-from controllers import CurrencyRatesCRUD
+from controllers import CurrencyRatesCRUD, ThreadLocalConnection
 from controllers.currencycontroller import CurrencyController
-from utils import get_currencies
+from compression import MIN_COMPRESS_SIZE, compress, negotiate
+from pagecache import PageCache
+from refresher import CBR_URL, RatesRefresher, apply_rates, backfill_history, load_snapshot
+from router import Request, Response, Router, html, redirect
+from servers import SERVER_MODES, make_server
 
 
 # --------- Инициализация моделей и БД ---------
@@ -15,32 +19,28 @@ from utils import get_currencies
 main_author = Author("Masterov Artem", "P3122")
 app = App("CurrenciesListApp", "1.0", main_author)
 
-# База в памяти
-conn = sqlite3.connect(":memory:", check_same_thread=False)
+# База в памяти с общим кэшем: у каждого потока сервера своё соединение.
+# Имя уникально, потому что при запуске "python myapp.py" модуль
+# импортируется второй раз (PackageLoader("myapp")) со своими данными.
+conn = ThreadLocalConnection(
+    f"file:myapp-{uuid.uuid4().hex}?mode=memory&cache=shared", uri=True
+)
 db_controller = CurrencyRatesCRUD(conn)
 
-# Попытаемся получить курсы USD, EUR, GBP из API
-api_data = get_currencies(["USD", "EUR", "GBP"])
-if api_data:
-    # конвертируем в формат для _create
-    data = []
-    for code, v in api_data.items():
-        data.append(
-            {
-                "num_code": v["num_code"],
-                "char_code": v["char_code"],
-                "name": v["name"],
-                "value": v["value"],
-                "nominal": v["nominal"],
-            }
-        )
-    db_controller._create(data)
+# Курсы берём из локального снимка, чтобы импорт и старт сервера не ждали
+# сеть; свежие курсы загружает фоновое обновление в main()
+CURRENCY_CODES = ["USD", "EUR", "GBP"]
+apply_rates(db_controller, load_snapshot())
 
 # Тестовые данные (пользователи, подписки, базовые валюты, если их нет)
 db_controller.seed_test_data()
 
 currency_controller = CurrencyController(db_controller)
 
+# Кэш страниц сбрасывается при любой записи в БД
+page_cache = PageCache()
+db_controller.add_listener(page_cache.invalidate)
+
 # --------- Jinja2 Environment ---------
 
 env = Environment(
@@ -55,138 +55,279 @@ template_user = env.get_template("user.html")
 template_currencies = env.get_template("currencies.html")
 
 
-# --------- HTTP обработчик ---------
-
-class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
-    def _send_html(self, html: str, status: int = 200):
-        self.send_response(status)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.end_headers()
-        self.wfile.write(html.encode("utf-8"))
+# --------- Маршруты ---------
 
-    def do_GET(self):
-        parsed = urlparse(self.path)
-        path = parsed.path
-        params = parse_qs(parsed.query)
-
-        # Главная
-        if path == "/":
-            html = template_index.render(
-                app_name=app.name,
-                app_version=app.version,
-                author_name=main_author.name,
-                group=main_author.group,
-            )
-            self._send_html(html)
-            return
-
-        # Автор
-        if path == "/author":
-            html = template_author.render(
-                author_name=main_author.name,
-                group=main_author.group,
-            )
-            self._send_html(html)
-            return
-
-        # Список пользователей
-        if path == "/users":
-            users = db_controller.get_users()
-            html = template_users.render(users=users)
-            self._send_html(html)
-            return
-
-        # Один пользователь
-        if path == "/user":
-            try:
-                user_id = int(params.get("id", [0])[0])
-            except ValueError:
-                user_id = 0
+router = Router()
 
-            user_info = db_controller.get_user_with_currencies(user_id)
-            if not user_info:
-                self._send_html("<h1>Пользователь не найден</h1>", status=404)
-                return
 
-            html = template_user.render(user=user_info)
-            self._send_html(html)
-            return
+@router.route("/")
+@page_cache.cached
+def index(request: Request) -> Response:
+    return html(
+        template_index.render(
+            app_name=app.name,
+            app_version=app.version,
+            author_name=main_author.name,
+            group=main_author.group,
+        )
+    )
 
-        # Список валют
-        if path == "/currencies":
-            currencies = currency_controller.list_currencies()
-            html = template_currencies.render(currencies=currencies)
-            self._send_html(html)
-            return
 
-        # Удаление валюты
-        if path == "/currency/delete":
+@router.route("/author")
+@page_cache.cached
+def author(request: Request) -> Response:
+    return html(
+        template_author.render(
+            author_name=main_author.name,
+            group=main_author.group,
+        )
+    )
+
+
+@router.route("/users")
+@page_cache.cached
+def users(request: Request) -> Response:
+    return html(template_users.render(users=db_controller.get_users()))
+
+
+@router.route("/user")
+@page_cache.cached
+def user(request: Request) -> Response:
+    try:
+        user_id = int(request.params.get("id", [0])[0])
+    except ValueError:
+        user_id = 0
+
+    user_info = db_controller.get_user_with_currencies(user_id)
+    if not user_info:
+        return html("<h1>Пользователь не найден</h1>", status=404)
+    return html(template_user.render(user=user_info))
+
+
+@router.route("/currencies")
+@page_cache.cached
+def currencies(request: Request) -> Response:
+    return html(template_currencies.render(currencies=currency_controller.list_currencies()))
+
+
+# GET оставлен для старых ссылок вида /currency/delete?id=1
+@router.route("/currency/delete", methods=("GET", "POST"))
+def currency_delete(request: Request) -> Response:
+    try:
+        currency_controller.delete_currency(int(request.params.get("id", [0])[0]))
+    except ValueError:
+        pass
+    # редирект обратно на список
+    return redirect("/currencies")
+
+
+@router.route("/currency/<int:currency_id>", methods=("DELETE",))
+def currency_delete_by_id(request: Request, currency_id: int) -> Response:
+    currency_controller.delete_currency(currency_id)
+    return Response(204, None)
+
+
+@router.route("/currency/update", methods=("GET", "POST"))
+def currency_update(request: Request) -> Response:
+    changes = _parse_changes(request.params)
+    if changes:
+        code, value = next(iter(changes.items()))
+        currency_controller.update_currency(code, value)
+    return redirect("/currencies")
+
+
+@router.route("/currency/<code>", methods=("PUT",))
+def currency_put(request: Request, code: str) -> Response:
+    """PUT /currency/USD с телом value=100.5."""
+    try:
+        value = float(request.params.get("value", [""])[0])
+    except ValueError:
+        return html("<h1>Некорректное значение курса</h1>", status=400)
+    currency_controller.update_currency(code.upper(), value)
+    return Response(204, None)
+
+
+# Показать валюты в консоль (для отладки)
+@router.route("/currency/show")
+def currency_show(request: Request) -> Response:
+    print("Текущие валюты в БД:")
+    for row in db_controller._read():
+        print(row)
+    return html("<h1>См. консоль сервера</h1>")
+
+
+def _parse_changes(params: dict) -> dict:
+    changes = {}
+
+    # Вариант 1: /currency/update?code=USD&value=100
+    code = params.get("code", [None])[0]
+    value = params.get("value", [None])[0]
+    if code and value:
+        try:
+            changes[code.upper()] = float(value)
+        except ValueError:
+            pass
+
+    # Вариант 2: /currency/update?USD=100
+    if not changes:
+        for k, v in params.items():
+            # k = 'USD', v = ['100']
             try:
-                currency_id = int(params.get("id", [0])[0])
-                currency_controller.delete_currency(currency_id)
+                changes[k.upper()] = float(v[0])
             except ValueError:
-                pass
-            # редирект обратно на список
-            self.send_response(303)
-            self.send_header("Location", "/currencies")
-            self.end_headers()
-            return
-
-        # Обновление курса валюты
-        if path == "/currency/update":
-            changes = {}
-
-            # Вариант 1: /currency/update?code=USD&value=100
-            code = params.get("code", [None])[0]
-            value = params.get("value", [None])[0]
-            if code and value:
-                try:
-                    changes[code.upper()] = float(value)
-                except ValueError:
-                    pass
-
-            # Вариант 2: /currency/update?USD=100
-            if not changes:
-                for k, v in params.items():
-                    # k = 'USD', v = ['100']
-                    try:
-                        changes[k.upper()] = float(v[0])
-                    except ValueError:
-                        continue
-
-            if changes:
-                currency_controller.update_currency(
-                    list(changes.keys())[0],
-                    list(changes.values())[0],
-                )
-
-            self.send_response(303)
-            self.send_header("Location", "/currencies")
-            self.end_headers()
-            return
+                continue
+    return changes
 
-        # Показать валюты в консоль (для отладки)
-        if path == "/currency/show":
-            print("Текущие валюты в БД:")
-            for row in db_controller._read():
-                print(row)
-            self._send_html("<h1>См. консоль сервера</h1>")
-            return
 
-        # Если маршрут не найден
-        self._send_html("<h1>404 Not Found</h1>", status=404)
+# --------- HTTP обработчик ---------
 
+class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
+    """
+    Адаптер BaseHTTPRequestHandler к router: все методы идут в dispatch().
+
+    Работает по HTTP/1.1: у каждого ответа есть Content-Length, поэтому
+    соединение остаётся открытым для следующих запросов клиента.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Простаивающее keep-alive соединение закрывается через timeout секунд,
+    # чтобы не занимать поток пула (--mode pool) бесконечно
+    timeout = 5
+    # Заголовки и тело пишутся отдельными send(); без TCP_NODELAY на
+    # keep-alive соединении алгоритм Нейгла и отложенный ACK клиента
+    # задерживают каждый ответ на десятки миллисекунд
+    disable_nagle_algorithm = True
+    # Тела от этого размера сжимаются (gzip, br при наличии brotli);
+    # None — сжатие выключено
+    compress_min_size = MIN_COMPRESS_SIZE
+    # Дополнительные заголовки текущего ответа (ETag, Allow, Location)
+    _response_headers = ()
 
-if __name__ == "__main__":
-    httpd = HTTPServer(("localhost", 8080), SimpleHTTPRequestHandler)
-    print("Сервер запущен: http://localhost:8080")
+    def _send_html(self, html: str, status: int = 200):
+        body = html.encode("utf-8")
+        encoding = None
+        if self.compress_min_size is not None and len(body) >= self.compress_min_size:
+            encoding = negotiate(self.headers.get("Accept-Encoding"))
+        if encoding is not None:
+            body = compress(body, encoding)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.compress_min_size is not None:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in self._response_headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, response: Response) -> None:
+        self._response_headers = response.headers
+        if response.body is None:
+            self.send_response(response.status)
+            for name, value in response.headers:
+                self.send_header(name, value)
+            # 304 повторяет Vary ответа 200, иначе кэш не знает, что
+            # сжатое и несжатое тела надо хранить раздельно
+            if response.status == 304 and self.compress_min_size is not None:
+                self.send_header("Vary", "Accept-Encoding")
+            # У 204 и 304 тела нет по определению, остальным нужна явная длина
+            if response.status not in (204, 304):
+                self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif response.status != 200:
+            self._send_html(response.body, status=response.status)
+        else:
+            self._send_html(response.body)
+
+    def _dispatch(self, method: str) -> None:
+        # headers появляется только после parse_request()
+        headers = getattr(self, "headers", None) or {}
+        body = b""
+        if method != "GET":
+            try:
+                length = int(headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # Где кончается тело, неизвестно — соединение дальше не читаем
+                self._send(Response(400, "<h1>400 Bad Request</h1>", (("Connection", "close"),)))
+                return
+            body = self.rfile.read(length) if length else b""
+        self._send(router.dispatch(Request(method, self.path, body, headers)))
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер курсов валют")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--mode",
+        choices=SERVER_MODES,
+        default="pool",
+        help="single — один запрос за раз, threads — поток на запрос, "
+             "pool — ограниченный пул потоков (по умолчанию)",
+    )
+    parser.add_argument("--workers", type=int, default=8,
+                        help="размер пула потоков для --mode pool")
+    parser.add_argument("--rates-url", default=CBR_URL,
+                        help="адрес daily_json.js (для тестов — локальная заглушка)")
+    parser.add_argument("--refresh-interval", type=float, default=3600.0,
+                        help="период обновления курсов, с")
+    parser.add_argument("--all-currencies", action="store_true",
+                        help=f"загружать все валюты ЦБ, а не только {', '.join(CURRENCY_CODES)}")
+    parser.add_argument("--history-dir", default=None,
+                        help="каталог с архивом ЦБ (файлы daily_json.js) для архива курсов")
+    args = parser.parse_args(argv)
+
+    if args.history_dir:
+        rows = backfill_history(db_controller, args.history_dir)
+        print(f"Архив курсов: загружено {rows} строк из {args.history_dir}")
+
+    httpd = make_server(
+        (args.host, args.port), SimpleHTTPRequestHandler, mode=args.mode, workers=args.workers
+    )
+    print(f"Сервер запущен: http://{args.host}:{args.port} (режим {args.mode})")
     print("Маршруты:")
     print("  /             - главная")
     print("  /author       - автор")
     print("  /users        - список пользователей")
     print("  /user?id=1    - пользователь и его валюты")
     print("  /currencies   - список валют")
-    print("  /currency/delete?id=...   - удалить валюту")
-    print("  /currency/update?USD=100  - обновить курс")
+    print("  /currency/delete?id=...   - удалить валюту (GET/POST)")
+    print("  /currency/update?USD=100  - обновить курс (GET/POST)")
+    print("  DELETE /currency/<id>     - удалить валюту")
+    print("  PUT /currency/<код>       - обновить курс, тело value=...")
     print("  /currency/show            - вывести валюты в консоль")
-    httpd.serve_forever()
\ No newline at end of file
+    refresher = RatesRefresher(
+        db_controller,
+        None if args.all_currencies else CURRENCY_CODES,
+        url=args.rates_url,
+        interval=args.refresh_interval,
+    )
+    refresher.start()
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        refresher.stop(timeout=1)
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import threading
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+from router import Request, Response
+
+
+class PageCache:
+    """
+    Кэш отрендеренных страниц с версией данных и ETag.
+
+    Ключ — путь и параметры строки запроса. Любое изменение данных
+    (invalidate(), обычно подписанный на CurrencyRatesCRUD.add_listener)
+    увеличивает версию и очищает кэш. ETag страницы — это версия данных,
+    поэтому запрос с совпадающим If-None-Match получает 304 без обращения
+    к БД и шаблонам. ETag слабый (W/): сжатое и несжатое тела одной версии
+    — разные представления, и сильный ETag у них совпадать не может.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self._maxsize = maxsize
+        self._pages: OrderedDict[tuple, Response] = OrderedDict()
+        self._lock = threading.Lock()
+        # Метка запуска: после перезапуска старые ETag не совпадут.
+        self._boot = uuid.uuid4().hex[:8]
+        self._version = 0
+        self.hits = self.misses = self.not_modified = 0
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self._boot}-{self._version}"'
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._pages.clear()
+
+    def cached(self, handler):
+        """Декоратор обработчика маршрута: кэширует ответы 200 на GET."""
+
+        @wraps(handler)
+        def wrapper(request: Request, **kwargs) -> Response:
+            if request.method != "GET":
+                return handler(request, **kwargs)
+            etag = self.etag
+            if _etag_matches(request.headers.get("If-None-Match"), etag):
+                with self._lock:
+                    self.not_modified += 1
+                return Response(304, None, (("ETag", etag),))
+
+            key = (request.path, tuple(sorted((k, tuple(v)) for k, v in request.query.items())))
+            with self._lock:
+                response = self._pages.get(key)
+                if response is not None:
+                    self._pages.move_to_end(key)
+                    self.hits += 1
+                    return response
+                self.misses += 1
+
+            response = handler(request, **kwargs)
+            if response.status != 200:
+                return response
+            response = response._replace(headers=response.headers + (("ETag", etag),))
+            with self._lock:
+                # Пока рендерили, данные могли измениться — такой ответ не кэшируем.
+                if etag == self.etag:
+                    self._pages[key] = response
+                    while len(self._pages) > self._maxsize:
+                        self._pages.popitem(last=False)
+            return response
+
+        return wrapper
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    """Слабое сравнение If-None-Match с etag (RFC 9110, 8.8.3.2): W/ не учитывается."""
+    if not header:
+        return False
+    etag = _opaque_tag(etag)
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or _opaque_tag(candidate) == etag:
+            return True
+    return False
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
@@ -0,0 +1,252 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+import requests
+
+from controllers import CurrencyRatesCRUD
+from utils import ValuteTable, parse_valute, parse_valute_stream
+
+CBR_URL = "https://www.cbr-xml-daily.ru/daily_json.js"
+
+
+def default_snapshot_path() -> Path:
+    """
+    Путь к снимку последних полученных курсов: при старте сервер берёт их
+    отсюда, не дожидаясь сети. Переменная окружения MYAPP_RATES_SNAPSHOT
+    читается при каждом вызове, поэтому её можно задать и после импорта.
+    """
+    return Path(
+        os.environ.get(
+            "MYAPP_RATES_SNAPSHOT",
+            Path.home() / ".cache" / "myapp" / "rates_snapshot.json",
+        )
+    )
+
+
+def load_snapshot(path: Path | None = None) -> Dict[str, Any]:
+    """
+    Курсы из снимка (код -> поля валюты) или {}, если снимка нет или он повреждён.
+    Записи без нужных полей или с полями не того типа отбрасываются:
+    испорченный снимок не должен мешать запуску сервера.
+    """
+    path = Path(path) if path is not None else default_snapshot_path()
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {code: item for code, item in data.items() if _is_rate(item)}
+
+
+def _is_rate(item: Any) -> bool:
+    """Запись снимка, которую можно передать в apply_rates()."""
+    if not isinstance(item, dict):
+        return False
+    if not all(isinstance(item.get(key), str) for key in ("num_code", "char_code", "name")):
+        return False
+    value, nominal = item.get("value"), item.get("nominal")
+    return (
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        and isinstance(nominal, int) and not isinstance(nominal, bool)
+    )
+
+
+def save_snapshot(rates: Dict[str, Any], path: Path | None = None) -> None:
+    """Атомарно записывает снимок: читатель не увидит недописанный файл."""
+    path = Path(path) if path is not None else default_snapshot_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(rates, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # нет прав на запись — просто работаем без снимка
+
+
+def apply_rates(db: CurrencyRatesCRUD, rates: Dict[str, Any]) -> int:
+    """Записывает курсы вида {код: поля} в БД, возвращает число изменённых валют."""
+    data: List[Dict[str, Any]] = [
+        {
+            "num_code": v["num_code"],
+            "char_code": v["char_code"],
+            "name": v["name"],
+            "value": v["value"],
+            "nominal": v["nominal"],
+        }
+        for v in rates.values()
+    ]
+    return db._upsert(data)
+
+
+def load_valute_file(path: Path, *, stream: bool = False) -> ValuteTable:
+    """
+    Читает файл формата daily_json.js (например, из архива ЦБ).
+    stream=True — потоковый разбор через ijson, без загрузки файла целиком.
+    """
+    with open(path, "rb") as fp:
+        if stream:
+            return parse_valute_stream(fp)
+        return parse_valute(json.load(fp))
+
+
+def import_valute_file(db: CurrencyRatesCRUD, path: Path, *, stream: bool = False) -> int:
+    """Загружает все валюты из файла в БД одной транзакцией; число изменённых."""
+    return db._upsert(load_valute_file(path, stream=stream).rows())
+
+
+def backfill_history(
+    db: CurrencyRatesCRUD,
+    directory: Path,
+    *,
+    pattern: str = "*.js",
+    stream: bool = False,
+    handle=sys.stdout,
+) -> int:
+    """
+    Заполняет архив курсов из локальной копии архива ЦБ.
+
+    В directory (включая подкаталоги, как в archive/2024/01/15/daily_json.js)
+    ищутся файлы pattern формата daily_json.js; дата курсов берётся из поля
+    Date файла. Всё пишется одной транзакцией, повторный импорт тех же дат
+    перезаписывает их. Файлы, которые не удалось разобрать, пропускаются
+    с сообщением в handle. Возвращает число записанных строк.
+    """
+    total = 0
+    with db._transaction(notify=False):
+        for path in sorted(Path(directory).rglob(pattern)):
+            try:
+                table = load_valute_file(path, stream=stream)
+                if not table.date:
+                    raise ValueError("в файле нет поля Date")
+                total += db._record_history(table.date, table.rows())
+            except sqlite3.Error:
+                raise
+            except Exception as e:  # битый JSON (в т.ч. ошибки ijson), нет полей
+                handle.write(f"Пропущен {path}: {e}\n")
+    return total
+
+
+class RatesRefresher:
+    """
+    Периодическое обновление курсов из API ЦБ в фоновом потоке.
+
+    Запросы идут через один requests.Session (пул соединений, keep-alive)
+    и условные: сервер получает If-None-Match / If-Modified-Since из
+    прошлого ответа и при неизменных данных отвечает 304 без тела.
+    Изменившиеся курсы записываются в БД одной транзакцией (_upsert),
+    неизменные не трогаются, и кэш страниц не сбрасывается.
+
+    Ответ разбирается целиком один раз (parse_valute); codes=None —
+    загружать все валюты ответа, иначе только перечисленные. Полученные
+    курсы также пишутся в архив currency_history на дату ответа.
+    """
+
+    def __init__(
+        self,
+        db: CurrencyRatesCRUD,
+        codes: List[str] | None,
+        *,
+        url: str = CBR_URL,
+        interval: float = 3600.0,
+        snapshot_path: Path | None = None,
+        session: requests.Session | None = None,
+        timeout: float = 5.0,
+        handle=sys.stdout,
+    ):
+        if interval <= 0:
+            raise ValueError("interval должен быть положительным")
+        self._db = db
+        self._codes = None if codes is None else list(codes)
+        self._url = url
+        self._interval = interval
+        self._snapshot_path = snapshot_path
+        self._session = session or _make_session()
+        self._timeout = timeout
+        self._handle = handle
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        # Счётчики для мониторинга
+        self.polls = self.not_modified = self.errors = self.changed = 0
+
+    def refresh(self) -> int | None:
+        """
+        Один условный запрос. Возвращает число изменённых валют
+        или None, если данные не изменились (304) или запрос не удался.
+        """
+        self.polls += 1
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        try:
+            response = self._session.get(self._url, headers=headers, timeout=self._timeout)
+            if response.status_code == 304:
+                self.not_modified += 1
+                return None
+            response.raise_for_status()
+            table = parse_valute(response.json())
+            rates = table.as_rates(self._codes)
+            if not rates:
+                raise ValueError("Не найдено ни одной запрошенной валюты")
+        except Exception as e:
+            self.errors += 1
+            self._handle.write(f"Ошибка при запросе к API: {e}\n")
+            return None
+
+        changed = apply_rates(self._db, rates)
+        if table.date:
+            self._db._record_history(table.date, list(rates.values()))
+        if changed:
+            self.changed += changed
+            save_snapshot(rates, self._snapshot_path)
+        # Валидаторы запоминаются только после записи: если БД или архив
+        # упали, следующий опрос получит ответ целиком, а не 304
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        return changed
+
+    def start(self) -> threading.Thread:
+        """Запускает обновление сразу и затем каждые interval секунд."""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rates-refresh", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Останавливает фоновый поток и закрывает сессию."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._session.close()
+
+    def _run(self) -> None:
+        while True:
+            # Ошибка записи в БД или разбора даты не должна останавливать
+            # поток: считаем её и пробуем снова через interval
+            try:
+                self.refresh()
+            except Exception as e:
+                self.errors += 1
+                self._handle.write(f"Ошибка при обновлении курсов: {e}\n")
+            if self._stop.wait(self._interval):
+                return
+
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    # Один хост — одного пула на 2 соединения хватает; повтор при обрыве
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
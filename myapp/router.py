@@ -0,0 +1,164 @@
+import re
+from functools import cached_property
+from typing import Callable, NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+
+class Response(NamedTuple):
+    """Ответ обработчика маршрута; body=None — ответ без тела (редирект, 204)."""
+
+    status: int = 200
+    body: str | None = ""
+    headers: tuple[tuple[str, str], ...] = ()
+
+
+class BadRequest(Exception):
+    """Запрос нельзя разобрать (например, тело формы не в UTF-8); Router отвечает 400."""
+
+
+def html(body: str, status: int = 200) -> Response:
+    return Response(status, body)
+
+
+def redirect(location: str, status: int = 303) -> Response:
+    return Response(status, None, (("Location", location),))
+
+
+class Request:
+    """
+    Запрос, не зависящий от HTTP-сервера.
+
+    Строка запроса и тело формы (application/x-www-form-urlencoded)
+    разбираются только при первом обращении к query/form/params;
+    тело не в UTF-8 — BadRequest.
+    """
+
+    def __init__(self, method: str, target: str, body: bytes = b"", headers=None):
+        self.method = method.upper()
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query_string = parts.query
+        self.body = body
+        self.headers = headers if headers is not None else {}
+
+    @cached_property
+    def query(self) -> dict[str, list[str]]:
+        return parse_qs(self.query_string)
+
+    @cached_property
+    def form(self) -> dict[str, list[str]]:
+        if not self.body:
+            return {}
+        try:
+            return parse_qs(self.body.decode("utf-8"))
+        except UnicodeDecodeError:
+            raise BadRequest("тело формы не в кодировке UTF-8") from None
+
+    @cached_property
+    def params(self) -> dict[str, list[str]]:
+        """Параметры строки запроса, дополненные полями формы из тела."""
+        return {**self.query, **self.form}
+
+
+Handler = Callable[..., Response]
+
+# Конвертеры для шаблонов вида "/currency/<int:currency_id>".
+_CONVERTERS = {
+    "int": (r"\d+", int),
+    "str": (r"[^/]+", str),
+}
+_PLACEHOLDER = re.compile(r"<(?:(\w+):)?(\w+)>")
+
+
+class Router:
+    """
+    Таблица маршрутов: точные пути в словаре, шаблоны — скомпилированные
+    регулярные выражения, которые проверяются, только если точного
+    совпадения нет.
+
+    Обработчик получает Request и значения из шаблона пути как именованные
+    аргументы и возвращает Response. Router не знает о сервере: его можно
+    использовать из любого HTTP-бэкенда через dispatch().
+    """
+
+    def __init__(self, not_found: Handler | None = None):
+        self._exact: dict[str, dict[str, Handler]] = {}
+        self._patterns: list[tuple[re.Pattern, dict[str, Callable], dict[str, Handler]]] = []
+        self._not_found = not_found or (lambda request: html("<h1>404 Not Found</h1>", 404))
+
+    def route(self, path: str, methods: tuple[str, ...] = ("GET",)):
+        """Декоратор: регистрирует обработчик для path и методов methods."""
+
+        def decorator(handler: Handler) -> Handler:
+            self.add(path, handler, methods)
+            return handler
+
+        return decorator
+
+    def add(self, path: str, handler: Handler, methods: tuple[str, ...] = ("GET",)) -> None:
+        if _PLACEHOLDER.search(path) is None:
+            table = self._exact.setdefault(path, {})
+        else:
+            regex, converters = _compile(path)
+            for pattern, _, table in self._patterns:
+                if pattern.pattern == regex.pattern:
+                    break
+            else:
+                table = {}
+                self._patterns.append((regex, converters, table))
+        for method in methods:
+            table[method.upper()] = handler
+
+    def resolve(self, method: str, path: str) -> tuple[Handler | None, dict, tuple[str, ...]]:
+        """
+        Обработчик для метода и пути, аргументы из шаблона и методы пути.
+
+        Если путь не найден — (None, {}, ()); если найден, но метод
+        не поддерживается — (None, {}, разрешённые методы). Если пути
+        подходят несколько шаблонов, берётся первый с нужным методом.
+        """
+        method = method.upper()
+        table = self._exact.get(path)
+        if table is not None:
+            return table.get(method), {}, tuple(table)
+
+        allowed: list[str] = []
+        for pattern, converters, table in self._patterns:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            handler = table.get(method)
+            if handler is not None:
+                kwargs = {k: converters[k](v) for k, v in match.groupdict().items()}
+                return handler, kwargs, tuple(table)
+            allowed.extend(m for m in table if m not in allowed)
+        return None, {}, tuple(allowed)
+
+    def dispatch(self, request: Request) -> Response:
+        handler, kwargs, allowed = self.resolve(request.method, request.path)
+        if handler is not None:
+            try:
+                return handler(request, **kwargs)
+            except BadRequest:
+                return html("<h1>400 Bad Request</h1>", 400)
+        if allowed:
+            return Response(
+                405, "<h1>405 Method Not Allowed</h1>", (("Allow", ", ".join(allowed)),)
+            )
+        return self._not_found(request)
+
+
+def _compile(path: str) -> tuple[re.Pattern, dict[str, Callable]]:
+    converters: dict[str, Callable] = {}
+    regex = ""
+    pos = 0
+    for match in _PLACEHOLDER.finditer(path):
+        kind, name = match.group(1) or "str", match.group(2)
+        if kind not in _CONVERTERS:
+            raise ValueError(f"Неизвестный конвертер {kind!r} в маршруте {path!r}")
+        part, convert = _CONVERTERS[kind]
+        regex += re.escape(path[pos:match.start()]) + f"(?P<{name}>{part})"
+        converters[name] = convert
+        pos = match.end()
+    regex += re.escape(path[pos:])
+    return re.compile(regex), converters
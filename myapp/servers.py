@@ -0,0 +1,138 @@
+import select
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+
+SERVER_MODES = ("single", "threads", "pool")
+
+# Как часто простаивающее keep-alive соединение проверяет, не ждут ли
+# свободного потока новые соединения
+_IDLE_POLL_INTERVAL = 0.05
+
+
+def _has_buffered_request(handler: BaseHTTPRequestHandler) -> bool:
+    """Есть ли уже прочитанные, но не разобранные байты (конвейерный запрос)."""
+    sock = handler.connection
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        return bool(handler.rfile.peek(1))
+    except OSError:
+        return False
+    finally:
+        sock.settimeout(timeout)
+
+
+def _pooled_handler(handler_class: type[BaseHTTPRequestHandler]) -> type[BaseHTTPRequestHandler]:
+    """
+    Подкласс handler_class, который не держит поток пула на простаивающем
+    keep-alive соединении, пока другие соединения ждут в очереди.
+    """
+
+    class PooledHandler(handler_class):
+        def handle(self):
+            self.close_connection = True
+            self.handle_one_request()
+            while not self.close_connection and self.server._wait_next_request(self):
+                self.handle_one_request()
+
+        def end_headers(self):
+            # Пул занят — закрываем соединение после этого ответа, клиент
+            # переподключится и встанет в общую очередь
+            if not self.close_connection and self.server.saturated:
+                self.send_header("Connection", "close")
+            super().end_headers()
+
+    PooledHandler.__name__ = PooledHandler.__qualname__ = handler_class.__name__
+    return PooledHandler
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer, обрабатывающий запросы в ограниченном пуле потоков.
+
+    В отличие от ThreadingHTTPServer (поток на каждый запрос), одновременно
+    обрабатывается не больше max_workers запросов, остальные ждут в очереди
+    пула. Потоки переиспользуются, поэтому их соединения с БД
+    (ThreadLocalConnection) тоже живут всё время работы сервера.
+
+    Keep-alive соединение занимает поток только пока в очереди никого нет:
+    если новые соединения ждут, простаивающее закрывается сразу, а
+    обслуживаемое — после текущего ответа (Connection: close).
+    """
+
+    def __init__(self, server_address, handler_class, *, max_workers: int = 8):
+        super().__init__(server_address, _pooled_handler(handler_class))
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http")
+        self._waiting = 0
+        self._waiting_lock = threading.Lock()
+
+    @property
+    def saturated(self) -> bool:
+        """Есть соединения, ожидающие свободного потока пула."""
+        return self._waiting > 0
+
+    def process_request(self, request, client_address):
+        with self._waiting_lock:
+            self._waiting += 1
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _wait_next_request(self, handler: BaseHTTPRequestHandler) -> bool:
+        """
+        Ждёт следующий запрос keep-alive соединения не дольше handler.timeout.
+        False — соединение пора закрыть: истёк таймаут или пул занят.
+        """
+        if _has_buffered_request(handler):
+            return True
+        deadline = None if handler.timeout is None else time.monotonic() + handler.timeout
+        while not self.saturated:
+            wait = _IDLE_POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return False
+            readable, _, _ = select.select([handler.connection], [], [], wait)
+            if readable:
+                return True
+        return False
+
+    def _process_request_worker(self, request, client_address):
+        with self._waiting_lock:
+            self._waiting -= 1
+        # То же, что ThreadingMixIn.process_request_thread.
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+def make_server(
+    address: tuple[str, int],
+    handler_class: type[BaseHTTPRequestHandler],
+    *,
+    mode: str = "pool",
+    workers: int = 8,
+) -> HTTPServer:
+    """
+    Создаёт HTTP-сервер в одном из режимов SERVER_MODES:
+    "single" — по одному запросу за раз (HTTPServer),
+    "threads" — поток на запрос (ThreadingHTTPServer),
+    "pool" — не больше workers запросов одновременно (PooledHTTPServer).
+    """
+    if mode == "single":
+        return HTTPServer(address, handler_class)
+    if mode == "threads":
+        return ThreadingHTTPServer(address, handler_class)
+    if mode == "pool":
+        if workers <= 0:
+            raise ValueError("workers должно быть положительным числом")
+        return PooledHTTPServer(address, handler_class, max_workers=workers)
+    raise ValueError(f"Неизвестный режим сервера {mode!r}, ожидается один из {SERVER_MODES}")
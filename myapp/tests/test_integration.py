@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock
 import sys
 import os
+import tempfile
 
 # Добавляем корень проекта в sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -15,12 +16,24 @@ class TestMyAppPages(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        # Импортируем myapp один раз
-        # ВАЖНО: если на импортe идёт реальный запрос к API,
-        # временно подставьте в myapp пустой dict для api_data
+        # Импортируем myapp один раз; к сети импорт не обращается,
+        # курсы берутся из локального снимка (refresher.load_snapshot).
+        # Снимок — во временном каталоге, чтобы результат не зависел
+        # от ~/.cache разработчика.
+        cls._snapshot_dir = tempfile.TemporaryDirectory()
+        cls._old_snapshot = os.environ.get("MYAPP_RATES_SNAPSHOT")
+        os.environ["MYAPP_RATES_SNAPSHOT"] = os.path.join(cls._snapshot_dir.name, "rates.json")
         import myapp
         cls.myapp = myapp
 
+    @classmethod
+    def tearDownClass(cls):
+        if cls._old_snapshot is None:
+            os.environ.pop("MYAPP_RATES_SNAPSHOT", None)
+        else:
+            os.environ["MYAPP_RATES_SNAPSHOT"] = cls._old_snapshot
+        cls._snapshot_dir.cleanup()
+
     def setUp(self):
         # Каждый тест будет работать с "пустым" обработчиком,
         # чтобы не поднимать реальный HTTP-сервер.
@@ -43,6 +56,9 @@ class TestMyAppPages(unittest.TestCase):
         self.myapp.db_controller = MagicMock()
         self.myapp.currency_controller = MagicMock()
 
+        # Страницы, закэшированные другими тестами, не должны попадать в этот
+        self.myapp.page_cache.invalidate()
+
     def _make_handler(self, path):
         """Создает фейковый обработчик с переопределённым _send_html."""
         handler = self.HandlerClass()
@@ -175,6 +191,129 @@ class TestMyAppPages(unittest.TestCase):
         handler.send_response.assert_called_once_with(303)
         handler.send_header.assert_any_call("Location", "/currencies")
 
+    def _make_body_handler(self, method, path, body, length=None):
+        """Обработчик с телом формы для POST/PUT/DELETE."""
+        import io
+
+        handler = self._make_handler(path)
+        handler.headers = {"Content-Length": str(len(body)) if length is None else length}
+        handler.rfile = io.BytesIO(body)
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+        getattr(handler, f"do_{method}")()
+        return handler
+
+    def test_currency_delete_post_form(self):
+        """POST /currency/delete с id в теле формы удаляет валюту и делает редирект."""
+        handler = self._make_body_handler("POST", "/currency/delete", b"id=2")
+
+        self.myapp.currency_controller.delete_currency.assert_called_once_with(2)
+        handler.send_response.assert_called_once_with(303)
+        handler.send_header.assert_any_call("Location", "/currencies")
+
+    def test_currency_put_and_delete_by_path(self):
+        """PUT /currency/USD и DELETE /currency/3 отвечают 204."""
+        handler = self._make_body_handler("PUT", "/currency/usd", b"value=101.5")
+        self.myapp.currency_controller.update_currency.assert_called_once_with("USD", 101.5)
+        handler.send_response.assert_called_once_with(204)
+
+        handler = self._make_body_handler("DELETE", "/currency/3", b"")
+        self.myapp.currency_controller.delete_currency.assert_called_once_with(3)
+        handler.send_response.assert_called_once_with(204)
+
+    def test_bad_content_length(self):
+        """Нечисловой или отрицательный Content-Length — 400 и закрытие соединения."""
+        for length in ("abc", "-1"):
+            with self.subTest(length=length):
+                handler = self._make_body_handler("POST", "/currency/delete", b"id=2", length)
+                args, kwargs = handler._send_html.call_args
+                self.assertEqual(kwargs.get("status"), 400)
+                self.assertIn(("Connection", "close"), handler._response_headers)
+        self.myapp.currency_controller.delete_currency.assert_not_called()
+
+    def test_method_not_allowed(self):
+        """POST на страницу только для чтения — 405 с заголовком Allow."""
+        handler = self._make_body_handler("POST", "/users", b"")
+
+        args, kwargs = handler._send_html.call_args
+        self.assertEqual(kwargs.get("status"), 405)
+        self.assertIn(("Allow", "GET"), handler._response_headers)
+        self.myapp.db_controller.get_users.assert_not_called()
+
+    def test_page_cache_and_etag(self):
+        """Повторный GET берётся из кэша, совпавший If-None-Match даёт 304."""
+        self.myapp.db_controller.get_users.return_value = []
+        self.myapp.template_users.render.return_value = "<html>users</html>"
+
+        first = self._make_handler("/users")
+        first.do_GET()
+        second = self._make_handler("/users")
+        second.do_GET()
+
+        self.myapp.template_users.render.assert_called_once()
+        second._send_html.assert_called_once_with("<html>users</html>")
+        etag = dict(second._response_headers)["ETag"]
+        # Одна версия отдаётся и сжатой, и несжатой — ETag только слабый
+        self.assertTrue(etag.startswith('W/"'))
+
+        # If-None-Match сравнивается слабо: совпадает и форма без W/
+        for if_none_match in (etag, etag[2:], f'"other", {etag}'):
+            handler = self._make_handler("/users")
+            handler.headers = {"If-None-Match": if_none_match}
+            handler.send_response = MagicMock()
+            handler.send_header = MagicMock()
+            handler.end_headers = MagicMock()
+            handler.do_GET()
+            handler.send_response.assert_called_once_with(304)
+            handler.send_header.assert_any_call("Vary", "Accept-Encoding")
+            handler._send_html.assert_not_called()
+
+        # Запись в БД сбрасывает кэш и меняет ETag
+        self.myapp.page_cache.invalidate()
+        handler = self._make_handler("/users")
+        handler.headers = {"If-None-Match": etag}
+        handler.do_GET()
+        self.assertEqual(self.myapp.template_users.render.call_count, 2)
+        self.assertNotEqual(dict(handler._response_headers)["ETag"], etag)
+
+    def test_keep_alive_and_gzip(self):
+        """HTTP/1.1: два запроса в одном соединении, большое тело сжато gzip."""
+        import gzip
+        import http.client
+        import threading
+        from servers import make_server
+
+        class QuietHandler(self.myapp.SimpleHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+        big_page = "<html>" + "валюта " * 1000 + "</html>"
+        self.myapp.template_currencies.render.return_value = big_page
+        self.myapp.template_author.render.return_value = "<html>author</html>"
+
+        server = make_server(("127.0.0.1", 0), QuietHandler, mode="pool", workers=2)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        try:
+            conn.request("GET", "/currencies", headers={"Accept-Encoding": "gzip"})
+            response = conn.getresponse()
+            body = response.read()
+            sock = conn.sock
+            self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+            self.assertEqual(int(response.getheader("Content-Length")), len(body))
+            self.assertEqual(gzip.decompress(body).decode("utf-8"), big_page)
+
+            conn.request("GET", "/author", headers={"Accept-Encoding": "gzip"})
+            response = conn.getresponse()
+            self.assertEqual(response.read(), b"<html>author</html>")
+            self.assertIsNone(response.getheader("Content-Encoding"))
+            self.assertIs(conn.sock, sock)
+        finally:
+            conn.close()
+            server.shutdown()
+            server.server_close()
+
     def test_not_found_route(self):
         """Неизвестный маршрут возвращает 404."""
         handler = self._make_handler("/unknown")
@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+import sqlite3
+
+# Добавляем корень проекта в sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from controllers import CurrencyRatesCRUD
+from controllers.migrations import SCHEMA_VERSION, migrate, schema_version
+
+
+USD = {"num_code": "840", "char_code": "USD", "name": "Доллар США", "value": 90.0, "nominal": 1}
+
+
+class TestMigrations(unittest.TestCase):
+    """Тесты миграций схемы, индексов и UNIQUE(char_code)."""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _plan(self, sql: str, params=()) -> str:
+        rows = self.conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return " | ".join(row[-1] for row in rows)
+
+    def test_fresh_database_uses_indexes(self):
+        """Новая база сразу получает последнюю схему; запросы идут по индексам."""
+        crud = CurrencyRatesCRUD(self.conn)
+        self.assertEqual(schema_version(self.conn), SCHEMA_VERSION)
+        self.assertEqual(migrate(self.conn), 0)
+
+        self.assertIn("currency_char_code",
+                      self._plan("UPDATE currency SET value = ? WHERE char_code = ?", (1.0, "USD")))
+        plan = self._plan(
+            "SELECT c.id FROM user_currency uc JOIN currency c ON c.id = uc.currency_id "
+            "WHERE uc.user_id = ?", (1,)
+        )
+        self.assertIn("COVERING INDEX user_currency_user_id", plan)
+        self.assertNotIn("SCAN", plan)
+
+        crud.seed_test_data()
+        self.assertEqual(len(crud.get_user_with_currencies(1)["currencies"]), 2)
+
+    def test_duplicates_are_merged(self):
+        """Дубликаты кодов и подписок из старой схемы сливаются, подписки переносятся."""
+        migrate(self.conn, target=1)
+        self.conn.executemany(
+            "INSERT INTO currency(num_code, char_code, name, value, nominal) VALUES(?, ?, ?, ?, ?)",
+            [("840", "USD", "Доллар США", 90.0, 1), ("978", "EUR", "Евро", 91.0, 1),
+             ("840", "USD", "Доллар США", 90.0, 1)],
+        )
+        self.conn.executemany("INSERT INTO user(name) VALUES (?)", [("Иван",), ("Мария",)])
+        # Мария подписана на обе копии USD — после слияния подписка одна
+        self.conn.executemany("INSERT INTO user_currency(user_id, currency_id) VALUES(?, ?)",
+                              [(1, 2), (1, 3), (2, 1), (2, 3), (2, 3)])
+        self.conn.commit()
+
+        crud = CurrencyRatesCRUD(self.conn)
+        self.assertEqual(schema_version(self.conn), SCHEMA_VERSION)
+        self.assertEqual(sorted(r["id"] for r in crud._read()), [1, 2])
+        codes = [c["char_code"] for c in crud.get_user_with_currencies(1)["currencies"]]
+        self.assertEqual(sorted(codes), ["EUR", "USD"])
+        codes = [c["char_code"] for c in crud.get_user_with_currencies(2)["currencies"]]
+        self.assertEqual(codes, ["USD"])
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute(
+                "INSERT INTO currency(num_code, char_code, name) VALUES('840', 'USD', 'x')"
+            )
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute("INSERT INTO user_currency(user_id, currency_id) VALUES(2, 1)")
+
+    def test_create_and_upsert_do_not_duplicate(self):
+        """Повторный _create обновляет валюту; _upsert считает только изменения."""
+        crud = CurrencyRatesCRUD(self.conn)
+        crud._create([USD])
+        crud._create([{**USD, "value": 95.0}])
+        self.assertEqual([(r["char_code"], r["value"]) for r in crud._read()], [("USD", 95.0)])
+
+        self.assertEqual(crud._upsert([{**USD, "char_code": "usd", "value": 95.0}]), 0)
+        self.assertEqual(crud._upsert([USD, {**USD, "char_code": "EUR", "num_code": "978"}]), 2)
+        self.assertEqual(len(crud._read()), 2)
+
+        crud.seed_test_data()
+        values = {r["char_code"]: r["value"] for r in crud._read()}
+        self.assertEqual(values, {"USD": 90.0, "EUR": 90.0, "GBP": 100.0})
+
+    def test_newer_schema_is_rejected(self):
+        """База новее кода не открывается, неизвестная целевая версия — ошибка."""
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        with self.assertRaises(RuntimeError):
+            CurrencyRatesCRUD(self.conn)
+        with self.assertRaises(ValueError):
+            migrate(self.conn, target=SCHEMA_VERSION + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
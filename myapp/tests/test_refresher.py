@@ -0,0 +1,326 @@
+import unittest
+import sys
+import os
+import io
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Добавляем корень проекта в sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from controllers import CurrencyRatesCRUD
+from refresher import (
+    RatesRefresher,
+    apply_rates,
+    backfill_history,
+    import_valute_file,
+    load_snapshot,
+    load_valute_file,
+    save_snapshot,
+)
+from utils import ValuteTable, parse_valute
+from utils.currencies_api import ijson
+
+
+RATES = {
+    "USD": {"num_code": "840", "char_code": "USD", "name": "Доллар США", "value": 90.0, "nominal": 1},
+    "EUR": {"num_code": "978", "char_code": "EUR", "name": "Евро", "value": 91.0, "nominal": 1},
+}
+
+
+class TestRefresher(unittest.TestCase):
+    """Тесты снимка курсов и обновления БД."""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.crud = CurrencyRatesCRUD(self.conn)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot = Path(self.tmp.name) / "rates.json"
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_snapshot_round_trip(self):
+        """Снимок читается так же, как был записан; битый файл — пустой словарь."""
+        self.assertEqual(load_snapshot(self.snapshot), {})
+        save_snapshot(RATES, self.snapshot)
+        self.assertEqual(load_snapshot(self.snapshot), RATES)
+        self.snapshot.write_text("{не json", encoding="utf-8")
+        self.assertEqual(load_snapshot(self.snapshot), {})
+
+    def test_snapshot_skips_broken_entries(self):
+        """Записи без полей или с полями не того типа отбрасываются при чтении."""
+        broken = {
+            **RATES,
+            "GBP": {"char_code": "GBP", "value": 100.0},
+            "JPY": {**RATES["USD"], "char_code": "JPY", "value": "много"},
+            "CNY": None,
+        }
+        save_snapshot(broken, self.snapshot)
+        rates = load_snapshot(self.snapshot)
+        self.assertEqual(rates, RATES)
+        self.assertEqual(apply_rates(self.crud, rates), 2)
+
+    def test_apply_rates_writes_only_changes(self):
+        """Повторная запись тех же курсов ничего не меняет и не сбрасывает кэш."""
+        calls = []
+        self.crud.add_listener(lambda: calls.append(1))
+
+        self.assertEqual(apply_rates(self.crud, RATES), 2)
+        self.assertEqual(apply_rates(self.crud, RATES), 0)
+        changed = {**RATES, "USD": {**RATES["USD"], "value": 95.5}}
+        self.assertEqual(apply_rates(self.crud, changed), 1)
+
+        self.assertEqual(len(calls), 2)
+        values = {row["char_code"]: row["value"] for row in self.crud._read()}
+        self.assertEqual(values, {"USD": 95.5, "EUR": 91.0})
+
+    def test_seed_with_partial_snapshot(self):
+        """Снимок без части базовых валют не ломает тестовые данные."""
+        apply_rates(self.crud, {"USD": {**RATES["USD"], "value": 95.0}})
+        self.crud.seed_test_data()
+        values = {row["char_code"]: row["value"] for row in self.crud._read()}
+        self.assertEqual(values, {"USD": 95.0, "EUR": 91.0, "GBP": 100.0})
+        self.assertEqual(len(self.crud.get_user_with_currencies(2)["currencies"]), 2)
+
+
+class TestValuteTable(unittest.TestCase):
+    """Тесты колоночного разбора всего ответа daily_json.js."""
+
+    def test_parse_once_select_many(self):
+        """Одна таблица отдаёт и все валюты, и любое их подмножество."""
+        table = parse_valute({"Date": "2026-10-18", **valute(90.0)})
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.date, "2026-10-18")
+        self.assertEqual(list(table.as_rates(["eur", "XXX"])), ["EUR"])
+        self.assertEqual(table.as_rates(), {row["char_code"]: row for row in table.rows()})
+        with self.assertRaises(ValueError):
+            parse_valute({"Date": "2026-10-18"})
+
+    def test_append_normalises_code(self):
+        """Код, добавленный в нижнем регистре, находится так же, как после разбора."""
+        table = ValuteTable()
+        table.append("usd", "840", "Доллар США", 90.0, 1)
+        self.assertIn("USD", table)
+        self.assertEqual(list(table.as_rates(["USD"])), ["USD"])
+        self.assertEqual(table.rows()[0]["char_code"], "USD")
+
+    def test_import_file_plain_and_streaming(self):
+        """Файл архива загружается целиком и потоково с одинаковым результатом."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "daily_json.js"
+            path.write_text(json.dumps({"Date": "2026-10-18", **valute(90.0)}), encoding="utf-8")
+            plain = load_valute_file(path)
+            if ijson is not None:
+                streamed = load_valute_file(path, stream=True)
+                self.assertEqual(streamed.rows(), plain.rows())
+                self.assertEqual(streamed.date, plain.date)
+
+            conn = sqlite3.connect(":memory:")
+            crud = CurrencyRatesCRUD(conn)
+            self.assertEqual(import_valute_file(crud, path), 2)
+            self.assertEqual(import_valute_file(crud, path), 0)
+            conn.close()
+
+
+class TestRateHistory(unittest.TestCase):
+    """Тесты архива курсов currency_history и его заполнения из архива ЦБ."""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.crud = CurrencyRatesCRUD(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_record_and_range_queries(self):
+        """Повтор даты заменяет курс; статистика считается за единицу номинала."""
+        calls = []
+        self.crud.add_listener(lambda: calls.append(1))
+        self.crud._record_history("2026-10-16T11:30:00+03:00", [RATES["USD"]])
+        self.crud._record_history("2026-10-17", [{"char_code": "usd", "value": 80.0, "nominal": 1}])
+        self.crud._record_history("2026-10-17", [{"char_code": "USD", "value": 92.0, "nominal": 1}])
+        self.crud._record_history("2026-10-18", [{"char_code": "USD", "value": 940.0, "nominal": 10}])
+        self.assertEqual(calls, [])
+
+        history = self.crud.get_history("usd", "2026-10-17", "2026-10-18")
+        self.assertEqual([row["date"] for row in history], ["2026-10-17", "2026-10-18"])
+        self.assertEqual(history[0]["value"], 92.0)
+        self.assertEqual(
+            self.crud.get_history_stats("USD", "2026-10-01", "2026-10-31"),
+            {"count": 3, "min": 90.0, "max": 94.0, "avg": 92.0},
+        )
+        self.assertEqual(self.crud.get_history_stats("EUR", "2026-10-01", "2026-10-31")["count"], 0)
+        with self.assertRaises(ValueError):
+            self.crud.get_history("USD", "18.10.2026", "2026-10-31")
+
+    def test_backfill_from_archive_directory(self):
+        """Файлы архива из подкаталогов загружаются по своим датам, битые пропускаются."""
+        with tempfile.TemporaryDirectory() as tmp:
+            for day, usd in (("16", 90.0), ("17", 96.0)):
+                folder = Path(tmp) / "2026" / "10" / day
+                folder.mkdir(parents=True)
+                payload = {"Date": f"2026-10-{day}T11:30:00+03:00", **valute(usd)}
+                (folder / "daily_json.js").write_text(json.dumps(payload), encoding="utf-8")
+            (Path(tmp) / "broken.js").write_text("{", encoding="utf-8")
+
+            log = io.StringIO()
+            self.assertEqual(backfill_history(self.crud, tmp, handle=log), 4)
+            self.assertIn("broken.js", log.getvalue())
+
+        stats = self.crud.get_history_stats("USD", "2026-10-16", "2026-10-17")
+        self.assertEqual((stats["count"], stats["min"], stats["max"]), (2, 90.0, 96.0))
+        self.assertEqual(len(self.crud.get_history("EUR", "2026-01-01", "2026-12-31")), 2)
+
+
+class StandInAPI(BaseHTTPRequestHandler):
+    """Заглушка daily_json.js с ETag: при совпадении If-None-Match отвечает 304."""
+
+    payload = {}
+    version = 0
+    requests = []
+
+    def do_GET(self):
+        etag = f'"v{self.version}"'
+        type(self).requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(self.payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def valute(usd):
+    return {
+        "Valute": {
+            "USD": {"NumCode": "840", "CharCode": "USD", "Nominal": 1, "Name": "Доллар США", "Value": usd},
+            "EUR": {"NumCode": "978", "CharCode": "EUR", "Nominal": 1, "Name": "Евро", "Value": 91.0},
+        }
+    }
+
+
+class TestRatesRefresher(unittest.TestCase):
+    """Тесты периодического обновления с условными запросами."""
+
+    def setUp(self):
+        StandInAPI.payload = valute(90.0)
+        StandInAPI.version = 1
+        StandInAPI.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInAPI)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/daily_json.js"
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.crud = CurrencyRatesCRUD(self.conn)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.refresher = RatesRefresher(
+            self.crud, ["USD", "EUR"], url=self.url, interval=0.05,
+            snapshot_path=Path(self.tmp.name) / "rates.json", handle=io.StringIO(),
+        )
+
+    def tearDown(self):
+        self.refresher.stop(timeout=1)
+        self.server.shutdown()
+        self.server.server_close()
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_conditional_requests_and_changed_rates(self):
+        """304 не трогает БД; новая версия записывает только изменённый курс."""
+        calls = []
+        self.crud.add_listener(lambda: calls.append(1))
+
+        self.assertEqual(self.refresher.refresh(), 2)
+        self.assertIsNone(self.refresher.refresh())
+        self.assertEqual(StandInAPI.requests[1].get("If-None-Match"), '"v1"')
+        self.assertEqual(self.refresher.not_modified, 1)
+
+        StandInAPI.payload = valute(95.0)
+        StandInAPI.version = 2
+        self.assertEqual(self.refresher.refresh(), 1)
+        self.assertEqual(len(calls), 2)
+        values = {row["char_code"]: row["value"] for row in self.crud._read()}
+        self.assertEqual(values, {"USD": 95.0, "EUR": 91.0})
+
+    def test_refresh_updates_snapshot(self):
+        """Изменившиеся курсы попадают в снимок, неудачный опрос его не трогает."""
+        snapshot = Path(self.tmp.name) / "rates.json"
+        self.assertEqual(self.refresher.refresh(), 2)
+        self.assertEqual(set(load_snapshot(snapshot)), {"USD", "EUR"})
+        self.assertEqual(load_snapshot(snapshot)["USD"]["value"], 90.0)
+
+        StandInAPI.payload = {"Valute": {}}
+        StandInAPI.version = 2
+        self.assertIsNone(self.refresher.refresh())
+        self.assertEqual(self.refresher.errors, 1)
+        self.assertEqual(load_snapshot(snapshot)["USD"]["value"], 90.0)
+
+    def test_all_currencies(self):
+        """codes=None загружает все валюты ответа."""
+        StandInAPI.payload["Valute"]["JPY"] = {
+            "NumCode": "392", "CharCode": "JPY", "Nominal": 100, "Name": "Иен", "Value": 60.0,
+        }
+        refresher = RatesRefresher(
+            self.crud, None, url=self.url,
+            snapshot_path=Path(self.tmp.name) / "all.json", handle=io.StringIO(),
+        )
+        try:
+            self.assertEqual(refresher.refresh(), 3)
+        finally:
+            refresher.stop()
+        self.assertEqual({row["char_code"] for row in self.crud._read()}, {"USD", "EUR", "JPY"})
+
+    def test_refresh_records_history(self):
+        """Полученные курсы попадают в архив на дату ответа."""
+        StandInAPI.payload["Date"] = "2026-10-18T11:30:00+03:00"
+        self.refresher.refresh()
+        history = self.crud.get_history("USD", "2026-10-18", "2026-10-18")
+        self.assertEqual(history, [{"date": "2026-10-18", "value": 90.0, "nominal": 1}])
+
+    def test_background_schedule(self):
+        """start() опрашивает API по расписанию до stop()."""
+        self.refresher.start()
+        deadline = time.monotonic() + 5
+        while self.refresher.polls < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.refresher.stop(timeout=1)
+        self.assertGreaterEqual(self.refresher.polls, 3)
+        self.assertEqual(self.refresher.changed, 2)
+        self.assertEqual(len(self.crud._read()), 2)
+
+    def test_background_survives_errors(self):
+        """Ошибка после запроса (битая дата) считается, поток продолжает опрос."""
+        StandInAPI.payload["Date"] = "не дата"
+        self.refresher.start()
+        deadline = time.monotonic() + 5
+        while self.refresher.errors < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.refresher._thread.is_alive())
+        self.assertGreaterEqual(self.refresher.errors, 3)
+        self.assertIsNone(self.refresher.etag)
+
+        StandInAPI.payload = valute(95.0)
+        StandInAPI.version = 2
+        while self.refresher.etag != '"v2"' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.refresher.stop(timeout=1)
+        values = {row["char_code"]: row["value"] for row in self.crud._read()}
+        self.assertEqual(values["USD"], 95.0)
+        self.assertIn("Некорректная дата", self.refresher._handle.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
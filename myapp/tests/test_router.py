@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+
+# Добавляем корень проекта в sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from router import Request, Response, Router, html, redirect
+
+
+class TestRouter(unittest.TestCase):
+    """Тесты таблицы маршрутов без HTTP-сервера."""
+
+    def setUp(self):
+        self.router = Router()
+
+        @self.router.route("/items")
+        def items(request):
+            return html("items")
+
+        @self.router.route("/items/<int:item_id>", methods=("GET", "DELETE"))
+        def item(request, item_id):
+            return html(f"{request.method} {item_id!r}")
+
+        @self.router.route("/items/<name>", methods=("PUT",))
+        def item_by_name(request, name):
+            return redirect(f"/items?name={name}")
+
+    def test_exact_and_pattern_routes(self):
+        """Точный путь и шаблон с конвертером int."""
+        self.assertEqual(self.router.dispatch(Request("GET", "/items?x=1")).body, "items")
+        self.assertEqual(self.router.dispatch(Request("DELETE", "/items/42")).body, "DELETE 42")
+
+    def test_method_picks_matching_pattern(self):
+        """Из нескольких подходящих шаблонов выбирается тот, где есть метод."""
+        response = self.router.dispatch(Request("PUT", "/items/7"))
+        self.assertEqual(response, Response(303, None, (("Location", "/items?name=7"),)))
+
+    def test_not_found_and_method_not_allowed(self):
+        """Неизвестный путь — 404, известный с чужим методом — 405 и Allow."""
+        self.assertEqual(self.router.dispatch(Request("GET", "/nothing")).status, 404)
+        response = self.router.dispatch(Request("POST", "/items/abc"))
+        self.assertEqual(response.status, 405)
+        self.assertEqual(dict(response.headers)["Allow"], "PUT")
+
+    def test_params_are_parsed_lazily(self):
+        """Строка запроса и тело разбираются только при обращении к params."""
+        request = Request("POST", "/items?a=1&b=2", b"b=3")
+        self.assertNotIn("params", vars(request))
+        self.assertEqual(request.params, {"a": ["1"], "b": ["3"]})
+
+    def test_form_not_utf8(self):
+        """Тело формы не в UTF-8 — 400, даже если обработчик ловит ValueError."""
+        @self.router.route("/form", methods=("POST",))
+        def form(request):
+            try:
+                return html(request.params["name"][0])
+            except ValueError:
+                return html("ошибка")
+
+        self.assertEqual(self.router.dispatch(Request("POST", "/form", "name=Иван".encode())).body,
+                         "Иван")
+        response = self.router.dispatch(Request("POST", "/form", "name=Иван".encode("cp1251")))
+        self.assertEqual(response.status, 400)
+
+    def test_unknown_converter(self):
+        """Неизвестный конвертер в шаблоне — ValueError."""
+        with self.assertRaises(ValueError):
+            self.router.add("/x/<float:value>", lambda request, value: html(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import unittest
+import sys
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler
+from urllib.request import urlopen
+
+# Добавляем корень проекта в sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from controllers import CurrencyRatesCRUD, ThreadLocalConnection
+from servers import PooledHTTPServer, make_server
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Обработчик, который отвечает через 0.2 с и сообщает имя потока."""
+
+    def do_GET(self):
+        time.sleep(0.2)
+        body = threading.current_thread().name.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Обработчик с keep-alive и 5-секундным таймаутом простоя, как в myapp."""
+
+    protocol_version = "HTTP/1.1"
+    timeout = 5
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestServers(unittest.TestCase):
+    """Тесты режимов HTTP-сервера."""
+
+    def _fetch_parallel(self, server, n):
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=n) as clients:
+                names = list(clients.map(lambda _: urlopen(url, timeout=5).read(), range(n)))
+            return time.perf_counter() - start, names
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_pool_serves_requests_concurrently(self):
+        """Медленный запрос не задерживает остальные в режиме pool."""
+        server = make_server(("127.0.0.1", 0), SlowHandler, mode="pool", workers=4)
+        self.assertIsInstance(server, PooledHTTPServer)
+        elapsed, names = self._fetch_parallel(server, 4)
+        self.assertLess(elapsed, 0.6)
+        self.assertTrue(all(name.startswith(b"http") for name in names))
+
+    def test_pool_is_bounded(self):
+        """При workers=1 запросы обрабатываются по одному."""
+        server = make_server(("127.0.0.1", 0), SlowHandler, mode="pool", workers=1)
+        elapsed, names = self._fetch_parallel(server, 3)
+        self.assertGreaterEqual(elapsed, 0.6)
+        self.assertEqual(len(set(names)), 1)
+
+    def test_idle_keep_alive_does_not_block_pool(self):
+        """Простаивающие keep-alive соединения не держат потоки пула."""
+        server = make_server(("127.0.0.1", 0), KeepAliveHandler, mode="pool", workers=2)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        port = server.server_address[1]
+        idle = [HTTPConnection("127.0.0.1", port, timeout=5) for _ in range(2)]
+        try:
+            for conn in idle:
+                conn.request("GET", "/")
+                response = conn.getresponse()
+                self.assertEqual(response.read(), b"ok")
+                self.assertFalse(response.will_close)
+
+            start = time.perf_counter()
+            self.assertEqual(urlopen(f"http://127.0.0.1:{port}/", timeout=5).read(), b"ok")
+            self.assertLess(time.perf_counter() - start, 1)
+        finally:
+            for conn in idle:
+                conn.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_unknown_mode(self):
+        """Неизвестный режим — ValueError."""
+        with self.assertRaises(ValueError):
+            make_server(("127.0.0.1", 0), SlowHandler, mode="fibers")
+
+
+class TestThreadLocalConnection(unittest.TestCase):
+    """Тесты доступа к БД из нескольких потоков."""
+
+    def setUp(self):
+        uri = f"file:test_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        self.conn = ThreadLocalConnection(uri, uri=True)
+        self.crud = CurrencyRatesCRUD(self.conn)
+        self.crud.seed_test_data()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_each_thread_has_own_connection(self):
+        """Потоки получают разные соединения к одной базе."""
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(self.conn.get()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(seen[0], self.conn.get())
+
+    def test_concurrent_reads_and_writes(self):
+        """Одновременные чтения и обновления не падают и видны всем потокам."""
+        def work(i):
+            self.crud._update({"USD": float(i)})
+            return len(self.crud._read())
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            counts = list(pool.map(work, range(200)))
+
+        self.assertEqual(set(counts), {3})
+        values = {row["char_code"]: row["value"] for row in self.crud._read()}
+        self.assertIn(values["USD"], {float(i) for i in range(200)})
+
+    def test_reads_never_see_uncommitted_writes(self):
+        """Чтение ждёт конца записи и не видит откатанных изменений."""
+        started, release = threading.Event(), threading.Event()
+
+        def writer():
+            try:
+                with self.crud._transaction():
+                    self.crud._update({"USD": 1.0})
+                    started.set()
+                    release.wait(5)
+                    raise RuntimeError("откат")
+            except RuntimeError:
+                pass
+
+        write_thread = threading.Thread(target=writer)
+        write_thread.start()
+        started.wait(5)
+        rows = []
+        read_thread = threading.Thread(target=lambda: rows.extend(self.crud._read()))
+        read_thread.start()
+        read_thread.join(0.2)
+        self.assertTrue(read_thread.is_alive())
+
+        release.set()
+        write_thread.join(5)
+        read_thread.join(5)
+        values = {row["char_code"]: row["value"] for row in rows}
+        self.assertEqual(values["USD"], 90.0)
+
+    def test_writes_notify_listeners(self):
+        """Каждая успешная запись вызывает слушателей один раз, неудачная — нет."""
+        calls = []
+        self.crud.add_listener(lambda: calls.append(1))
+        self.crud._update({"USD": 95.0})
+        self.crud._create([{"num_code": "392", "char_code": "JPY", "name": "Иена",
+                            "value": 0.6, "nominal": 100}])
+        self.crud._delete(1)
+        self.assertEqual(len(calls), 3)
+
+        with self.assertRaises(Exception):
+            self.crud._create([{"num_code": "1"}])
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1 +1,7 @@
-from .currencies_api import get_currencies
\ No newline at end of file
+from .currencies_api import (
+    ValuteTable,
+    get_currencies,
+    parse_currencies,
+    parse_valute,
+    parse_valute_stream,
+)
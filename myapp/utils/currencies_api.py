@@ -1,44 +1,156 @@
 import sys
-from typing import List, Dict, Any
+from array import array
+from typing import IO, List, Dict, Any, Iterable
 
 import requests
 
+try:
+    import ijson
+except ImportError:  # ijson нужен только для потокового разбора (parse_valute_stream)
+    ijson = None
+
 
 def get_currencies(
     currency_codes: List[str],
     url: str = "https://www.cbr-xml-daily.ru/daily_json.js",
     handle=sys.stdout,
+    session: requests.Session | None = None,
 ) -> Dict[str, Any]:
     """
     Получает курсы валют с API ЦБ РФ.
     Возвращает словарь: код -> словарь с полями num_code, char_code, name, value, nominal.
+    session — общий requests.Session, чтобы переиспользовать соединение.
     """
     try:
-        response = requests.get(url, timeout=5)
+        response = (session or requests).get(url, timeout=5)
         response.raise_for_status()
-        data = response.json()
-
-        result: Dict[str, Any] = {}
-
-        if "Valute" not in data:
-            raise ValueError("В ответе API нет секции 'Valute'")
-
-        for code in currency_codes:
-            code = code.upper()
-            if code in data["Valute"]:
-                v = data["Valute"][code]
-                result[code] = {
-                    "num_code": v["NumCode"],
-                    "char_code": v["CharCode"],
-                    "name": v["Name"],
-                    "value": float(v["Value"]),
-                    "nominal": int(v["Nominal"]),
-                }
-        if not result:
-            raise ValueError("Не найдено ни одной запрошенной валюты")
-        return result
+        return parse_currencies(response.json(), currency_codes)
 
     except Exception as e:
         handle.write(f"Ошибка при запросе к API: {e}\n")
         # Можно вернуть пустой словарь — тогда дальше подставим тестовые данные
-        return {}
\ No newline at end of file
+        return {}
+
+
+def parse_currencies(data: Dict[str, Any], currency_codes: List[str]) -> Dict[str, Any]:
+    """
+    Выбирает из ответа daily_json.js валюты currency_codes.
+    ValueError, если в ответе нет секции Valute или ни одной из валют.
+    """
+    if "Valute" not in data:
+        raise ValueError("В ответе API нет секции 'Valute'")
+
+    result = parse_valute(data).as_rates(currency_codes)
+    if not result:
+        raise ValueError("Не найдено ни одной запрошенной валюты")
+    return result
+
+
+class ValuteTable:
+    """
+    Все валюты одного ответа daily_json.js в колоночном виде.
+
+    Коды, названия и курсы хранятся отдельными колонками (курсы и номиналы —
+    в array), поэтому таблица компактна и разбирается один раз, а любое
+    подмножество валют выбирается из неё без повторной загрузки.
+    """
+
+    __slots__ = ("date", "char_codes", "num_codes", "names", "values", "nominals", "_index")
+
+    def __init__(self, date: str | None = None):
+        self.date = date
+        self.char_codes: List[str] = []
+        self.num_codes: List[str] = []
+        self.names: List[str] = []
+        self.values = array("d")
+        self.nominals = array("l")
+        self._index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.char_codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code.upper() in self._index
+
+    def append(self, char_code: str, num_code: str, name: str, value: float, nominal: int) -> None:
+        # Коды хранятся в верхнем регистре, как их ищут __contains__ и as_rates
+        char_code = char_code.upper()
+        self._index[char_code] = len(self.char_codes)
+        self.char_codes.append(char_code)
+        self.num_codes.append(num_code)
+        self.names.append(name)
+        self.values.append(float(value))
+        self.nominals.append(int(nominal))
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Строки для CurrencyRatesCRUD._create/_upsert."""
+        return [
+            {
+                "num_code": num_code,
+                "char_code": char_code,
+                "name": name,
+                "value": value,
+                "nominal": nominal,
+            }
+            for char_code, num_code, name, value, nominal in zip(
+                self.char_codes, self.num_codes, self.names, self.values, self.nominals
+            )
+        ]
+
+    def as_rates(self, codes: Iterable[str] | None = None) -> Dict[str, Any]:
+        """Словарь код -> поля, как у get_currencies(); codes=None — все валюты."""
+        if codes is None:
+            positions = range(len(self))
+        else:
+            positions = [self._index[c] for c in (c.upper() for c in codes) if c in self._index]
+        return {
+            self.char_codes[i]: {
+                "num_code": self.num_codes[i],
+                "char_code": self.char_codes[i],
+                "name": self.names[i],
+                "value": self.values[i],
+                "nominal": self.nominals[i],
+            }
+            for i in positions
+        }
+
+
+def parse_valute(data: Dict[str, Any]) -> ValuteTable:
+    """Разбирает всю секцию Valute уже загруженного ответа за один проход."""
+    if "Valute" not in data:
+        raise ValueError("В ответе API нет секции 'Valute'")
+    table = ValuteTable(data.get("Date"))
+    for v in data["Valute"].values():
+        table.append(v["CharCode"], v["NumCode"], v["Name"], v["Value"], v["Nominal"])
+    return table
+
+
+def parse_valute_stream(fp: IO[bytes]) -> ValuteTable:
+    """
+    Потоковый разбор файла daily_json.js (нужен ijson).
+
+    Файл не загружается в память целиком: из событий парсера сразу
+    заполняются колонки таблицы. Подходит для больших архивов.
+    """
+    if ijson is None:
+        raise ImportError("parse_valute_stream requires ijson")
+    table = ValuteTable()
+    record: Dict[str, Any] = {}
+    seen_valute = False
+    for prefix, event, value in ijson.parse(fp):
+        if prefix == "Date" and event == "string":
+            table.date = value
+        elif prefix == "Valute":
+            seen_valute = True
+        elif prefix.startswith("Valute.") and event in ("string", "number"):
+            field = prefix.rsplit(".", 1)[1]
+            record[field] = value
+        elif event == "end_map" and prefix.startswith("Valute.") and prefix.count(".") == 1:
+            table.append(
+                record["CharCode"], record["NumCode"], record["Name"],
+                record["Value"], record["Nominal"],
+            )
+            record = {}
+    if not seen_valute:
+        raise ValueError("В ответе API нет секции 'Valute'")
+    return table